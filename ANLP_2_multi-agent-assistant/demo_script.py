@@ -4,6 +4,8 @@ Demo Script for Multi-Agent Research & Coding Assistant
 
 Running full Demo pipeline with 5 test queries.
 Shows work of all agents and tools.
+
+Usage: python demo_script.py [--offline]
 """
 
 import sys
@@ -14,6 +16,10 @@ from typing import Dict, Any
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+# --offline: use local stub LLM backend (no network), must be set before src.config is imported
+if "--offline" in sys.argv:
+    os.environ.setdefault("LLM_BACKEND", "offline")
+
 from src.main import run_query
 from src.tools.memory_manager import MemoryManager
 
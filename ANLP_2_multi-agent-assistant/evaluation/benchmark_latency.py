@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency benchmark
+
+Runs the demo_script.py cases and the labeled queries from
+evaluation/test_queries.md through the full graph on the offline LLM
+backend and reports p50/p95/p99 latency per node, per graph run and per
+query, plus graph orchestration overhead (graph time minus the time of
+the nodes on the critical path). Queries go through the public run_query
+API; session memory and the LLM cache live in a temporary directory.
+Results are written as JSON so runs can be compared across commits.
+
+Usage: python evaluation/benchmark_latency.py [--profile fast] [--repeats 3]
+       [--sequential] [--output benchmark_results.json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+
+def percentile(values: list, q: float) -> float:
+    """Percentile with linear interpolation
+
+    Args:
+        values: Sample values
+        q: Percentile in range 0..100
+
+    Returns:
+        Percentile value (0.0 for empty sample)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(values: list) -> dict:
+    """Latency summary in milliseconds
+
+    Args:
+        values: Latencies in seconds
+
+    Returns:
+        Dictionary with count, mean, p50, p95, p99 and max
+    """
+    ms = [v * 1000 for v in values]
+    return {
+        "count": len(ms),
+        "mean_ms": round(sum(ms) / len(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(max(ms), 3) if ms else 0.0,
+    }
+
+
+def critical_path(node_timings: dict, parallel: bool) -> float:
+    """Time spent in nodes on the critical path of one graph run
+
+    Args:
+        node_timings: {node: seconds} from metadata
+        parallel: Whether specialists ran in parallel
+
+    Returns:
+        Seconds
+    """
+    specialists = [t for node, t in node_timings.items() if node not in ("router", "supervisor")]
+    specialist_time = max(specialists, default=0.0) if parallel else sum(specialists)
+    return node_timings.get("router", 0.0) + specialist_time + node_timings.get("supervisor", 0.0)
+
+
+def git_commit() -> str:
+    """Current git commit hash (or "unknown")"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=os.path.dirname(__file__), text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="End-to-end per-node latency benchmark")
+    parser.add_argument("--profile", default="fast", help="Offline LLM latency profile")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per query")
+    parser.add_argument("--sequential", action="store_true", help="Run specialists one after another")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON results file")
+    args = parser.parse_args()
+
+    # Configure offline backend before src.config is imported; session memory and
+    # LLM cache go to a scratch directory so the user's own files are not touched
+    scratch = tempfile.TemporaryDirectory(prefix="benchmark_latency_")
+    backend = os.getenv("MEMORY_BACKEND", "json").lower()
+    os.environ["LLM_BACKEND"] = "offline"
+    os.environ["OFFLINE_LLM_PROFILE"] = args.profile
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+    os.environ["LLM_CACHE_PATH"] = os.path.join(scratch.name, "llm_cache.sqlite")
+    os.environ["MEMORY_PATH"] = os.path.join(
+        scratch.name, "session_memory.sqlite" if backend == "sqlite" else "session_memory")
+    os.environ["PARALLEL_AGENTS"] = "false" if args.sequential else "true"
+
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+    from src.config import PARALLEL_AGENTS
+    from src.main import run_query
+    from src.tools.memory_manager import get_session_pool
+    from demo_script import test_queries
+    from router_fast_path import load_markdown_queries
+
+    queries = [case['query'] for case in test_queries()] + [q for q, _ in load_markdown_queries()]
+    session_id = f"benchmark_{int(time.time())}"
+
+    node_samples = {}
+    graph_samples = []
+    query_samples = []
+    overhead_samples = []
+
+    with scratch:
+        # Warm-up run (imports, graph compilation, caches of the Python runtime)
+        run_query(queries[0], session_id)
+
+        for _ in range(args.repeats):
+            for query in queries:
+                query_start = time.perf_counter()
+                result = run_query(query, session_id)
+                query_samples.append(time.perf_counter() - query_start)
+
+                # Graph run: from the initial state to the final answer (without memory I/O)
+                metadata = result["metadata"]
+                graph_time = (datetime.fromisoformat(metadata["end_time"])
+                              - datetime.fromisoformat(metadata["start_time"])).total_seconds()
+                graph_samples.append(graph_time)
+
+                node_timings = metadata.get("node_timings", {})
+                for node, elapsed in node_timings.items():
+                    node_samples.setdefault(node, []).append(elapsed)
+                overhead_samples.append(max(0.0, graph_time - critical_path(node_timings, PARALLEL_AGENTS)))
+
+        # Persist buffered writes before the scratch directory is removed
+        get_session_pool().clear()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "config": {
+            "llm_profile": args.profile,
+            "parallel_agents": PARALLEL_AGENTS,
+            "repeats": args.repeats,
+            "queries": len(queries),
+        },
+        "nodes": {node: summarize(samples) for node, samples in sorted(node_samples.items())},
+        "graph": summarize(graph_samples),
+        "query": summarize(query_samples),
+        "orchestration_overhead": summarize(overhead_samples),
+    }
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Queries: {len(queries)} x {args.repeats} (profile: {args.profile}, parallel: {PARALLEL_AGENTS})")
+    print(f"{'stage':<26}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    rows = list(report["nodes"].items()) + [
+        ("graph", report["graph"]),
+        ("query (with memory I/O)", report["query"]),
+        ("orchestration overhead", report["orchestration_overhead"]),
+    ]
+    for name, stats in rows:
+        print(f"{name:<26}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
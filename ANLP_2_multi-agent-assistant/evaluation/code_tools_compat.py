@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Code analysis before/after check
+
+Runs the code_tools functions on sample code blocks and compares them
+with the outputs of the implementation before analyze_code (separate
+ast.parse calls and regex rules per function, captured in BEFORE).
+Outputs must be identical except for the documented behaviour changes
+in CHANGED, and every documented change must still show up.
+
+Usage: python evaluation/code_tools_compat.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools import code_tools
+
+FUNCTIONS = [
+    "validate_python_syntax",
+    "extract_function_signature",
+    "extract_class_info",
+    "suggest_improvements",
+    "count_complexity",
+]
+
+SAMPLES = {
+    # Same results before and after
+    "documented_function": '''def mean(values: list) -> float:
+    """Average of values"""
+    total = 0
+    for value in values:
+        total += value
+    if not values:
+        return 0.0
+    return total / len(values)
+''',
+    "lint_findings": '''counter = 0
+
+def bump(step):
+    global counter
+    try:
+        counter += step
+    except:
+        print("failed")
+    if step == None:
+        return 100
+    return counter
+''',
+    "syntax_error": '''def broken(x)
+    return x * 100
+''',
+    "class_with_methods": '''class Stack(list):
+    """LIFO stack"""
+
+    def push(self, item):
+        """Add item"""
+        self.append(item)
+
+    def peek(self):
+        """Top item"""
+        return self[-1]
+''',
+    # Changed: magic numbers are numeric literals >= 10 in code, not digits in strings, comments or fractions
+    "magic_numbers_in_text": '''def wait():
+    """Retry settings"""
+    timeout = "30 seconds"  # retried 15 times
+    ratio = 0.25
+    return timeout, ratio, 1000
+''',
+    # Changed: the docstring rule checks every function, not the presence of triple quotes anywhere
+    "docstring_per_function": '''def first(items):
+    """First item"""
+    return items[0]
+
+def last(items):
+    return items[-1]
+''',
+    # Changed: async functions and async for loops are counted, signatures keep "async def"
+    "async_function": '''async def fetch_all(client, urls: list) -> dict:
+    """Fetch urls"""
+    results = {}
+    async for response in client.stream(urls):
+        results[response.url] = response.status
+    return results
+''',
+    # Changed: subscripted return annotations are part of the signature
+    "annotated_return": '''def split(text: str, sep: str = ",") -> list[str]:
+    """Split text"""
+    return text.split(sep)
+''',
+    # Changed: print and None checks ignore strings and comments
+    "strings_and_comments": '''def describe(value):
+    """Describe value"""
+    # print(value) while debugging
+    return "compare with == None" if value else "empty"
+''',
+}
+
+# Outputs of the previous implementation on SAMPLES
+BEFORE = {
+    "documented_function": {
+        "validate_python_syntax": {'valid': True, 'error': None, 'line': None},
+        "extract_function_signature": 'def mean(values: list) -> float:',
+        "extract_class_info": {'class_name': None, 'methods': [], 'bases': []},
+        "suggest_improvements": [],
+        "count_complexity": {'lines_of_code': 8, 'functions': 1, 'classes': 0, 'loops': 1, 'conditionals': 1, 'complexity_score': 3},
+    },
+    "lint_findings": {
+        "validate_python_syntax": {'valid': True, 'error': None, 'line': None},
+        "extract_function_signature": 'def bump(step):',
+        "extract_class_info": {'class_name': None, 'methods': [], 'bases': []},
+        "suggest_improvements": ['💡 Consider using logging instead of print() for production code', 'Avoid global variables, use function parameters or classes', 'Specify concrete exception types instead of bare except', "Use 'is None' or 'is not None' instead of == / !=", 'Add docstring for function documentation', "Consider extracting 'magic numbers' (['100']) into constants"],
+        "count_complexity": {'lines_of_code': 10, 'functions': 1, 'classes': 0, 'loops': 0, 'conditionals': 1, 'complexity_score': 2},
+    },
+    "syntax_error": {
+        "validate_python_syntax": {'valid': False, 'error': "expected ':' (<unknown>, line 1)", 'line': 1},
+        "extract_function_signature": 'Function signature not found',
+        "extract_class_info": {'class_name': None, 'methods': [], 'bases': []},
+        "suggest_improvements": ["Consider extracting 'magic numbers' (['100']) into constants"],
+        "count_complexity": {'error': 'Cannot parse code'},
+    },
+    "class_with_methods": {
+        "validate_python_syntax": {'valid': True, 'error': None, 'line': None},
+        "extract_function_signature": 'def push(self, item):',
+        "extract_class_info": {'class_name': 'Stack', 'methods': ['push', 'peek'], 'bases': ['list']},
+        "suggest_improvements": [],
+        "count_complexity": {'lines_of_code': 8, 'functions': 2, 'classes': 1, 'loops': 0, 'conditionals': 0, 'complexity_score': 2},
+    },
+    "magic_numbers_in_text": {
+        "validate_python_syntax": {'valid': True, 'error': None, 'line': None},
+        "extract_function_signature": 'def wait():',
+        "extract_class_info": {'class_name': None, 'methods': [], 'bases': []},
+        "suggest_improvements": ["Consider extracting 'magic numbers' (['15', '25', '1000']) into constants"],
+        "count_complexity": {'lines_of_code': 5, 'functions': 1, 'classes': 0, 'loops': 0, 'conditionals': 0, 'complexity_score': 1},
+    },
+    "docstring_per_function": {
+        "validate_python_syntax": {'valid': True, 'error': None, 'line': None},
+        "extract_function_signature": 'def first(items):',
+        "extract_class_info": {'class_name': None, 'methods': [], 'bases': []},
+        "suggest_improvements": [],
+        "count_complexity": {'lines_of_code': 5, 'functions': 2, 'classes': 0, 'loops': 0, 'conditionals': 0, 'complexity_score': 2},
+    },
+    "async_function": {
+        "validate_python_syntax": {'valid': True, 'error': None, 'line': None},
+        "extract_function_signature": 'def fetch_all(client, urls: list) -> dict:',
+        "extract_class_info": {'class_name': None, 'methods': [], 'bases': []},
+        "suggest_improvements": [],
+        "count_complexity": {'lines_of_code': 6, 'functions': 0, 'classes': 0, 'loops': 0, 'conditionals': 0, 'complexity_score': 0},
+    },
+    "annotated_return": {
+        "validate_python_syntax": {'valid': True, 'error': None, 'line': None},
+        "extract_function_signature": 'Function signature not found',
+        "extract_class_info": {'class_name': None, 'methods': [], 'bases': []},
+        "suggest_improvements": [],
+        "count_complexity": {'lines_of_code': 3, 'functions': 1, 'classes': 0, 'loops': 0, 'conditionals': 0, 'complexity_score': 1},
+    },
+    "strings_and_comments": {
+        "validate_python_syntax": {'valid': True, 'error': None, 'line': None},
+        "extract_function_signature": 'def describe(value):',
+        "extract_class_info": {'class_name': None, 'methods': [], 'bases': []},
+        "suggest_improvements": ['💡 Consider using logging instead of print() for production code', "Use 'is None' or 'is not None' instead of == / !="],
+        "count_complexity": {'lines_of_code': 3, 'functions': 1, 'classes': 0, 'loops': 0, 'conditionals': 0, 'complexity_score': 1},
+    },
+}
+
+# (sample, function) -> documented behaviour change
+CHANGED = {
+    ("magic_numbers_in_text", "suggest_improvements"):
+        "magic numbers are numeric literals >= 10, digits in strings, comments and fractions are ignored",
+    ("docstring_per_function", "suggest_improvements"):
+        "docstring suggestion fires if any function lacks a docstring",
+    ("async_function", "extract_function_signature"):
+        "async functions keep the async prefix",
+    ("async_function", "count_complexity"):
+        "async functions and async for loops are counted",
+    ("annotated_return", "extract_function_signature"):
+        "any return annotation is understood, parameters are rendered by ast.unparse",
+    ("strings_and_comments", "suggest_improvements"):
+        "print() and == None checks ignore strings and comments",
+}
+
+
+def main():
+    """Main function"""
+    failures = []
+    for name, code in SAMPLES.items():
+        analysis = code_tools.analyze_code(code)
+        for function in FUNCTIONS:
+            before = BEFORE[name][function]
+            after = getattr(code_tools, function)(code)
+            if getattr(code_tools, function)(code, analysis) != after:
+                failures.append(f"{name}/{function}: result differs when the analysis is reused")
+            reason = CHANGED.get((name, function))
+            if after == before:
+                if reason:
+                    failures.append(f"{name}/{function}: documented change not observed ({reason})")
+                continue
+            print(f"{name}/{function}: {reason or 'UNEXPECTED CHANGE'}")
+            print(f"  before: {before!r}")
+            print(f"  after:  {after!r}")
+            if not reason:
+                failures.append(f"{name}/{function}: output changed")
+
+    unchanged = len(SAMPLES) * len(FUNCTIONS) - len(CHANGED)
+    print(f"\n{len(SAMPLES)} samples x {len(FUNCTIONS)} functions: {len(CHANGED)} documented changes, "
+          f"{unchanged} identical outputs expected")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+LLM cache bypass check
+
+Runs a multi-agent query (three parallel specialists) twice with the
+offline LLM backend and a fresh LLM cache: once to fill the cache (all
+four calls, Supervisor synthesis included, must be stored), then inside
+llm_cache.bypass(). The bypassed run must not hit or write the cache in
+any node. A second check runs a bypassed and a normal arun_query
+concurrently on one event loop - the bypass must not leak into the
+normal request.
+
+Usage: python evaluation/llm_cache_bypass.py
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+QUERY = "Find sources on asyncio, write a Python example and plan the migration"
+ROUTING = {
+    "classification": "research",
+    "agents": ["research_specialist", "coding_helper", "planner"],
+    "source": "preset",
+}
+
+
+def main():
+    """Main function"""
+    directory = tempfile.mkdtemp(prefix="llm_cache_bypass_")
+    os.environ["LLM_BACKEND"] = "offline"
+    os.environ["OFFLINE_LLM_PROFILE"] = "instant"
+    os.environ["LLM_CACHE_ENABLED"] = "true"
+    os.environ["LLM_CACHE_PATH"] = os.path.join(directory, "llm_cache.sqlite")
+    os.environ["MEMORY_PATH"] = os.path.join(directory, "sessions")
+    os.environ["PARALLEL_AGENTS"] = "true"
+
+    from src.config import llm_cache
+    from src.main import _run_query, arun_query
+
+    failures = []
+    try:
+        # Fill the cache (three specialists and the Supervisor), then repeat the same query with bypass
+        _run_query(QUERY, "bypass_fill", routing_info=dict(ROUTING))
+        stats = llm_cache.stats()
+        print(f"first run: {stats['entries']} cache entries")
+        if stats["entries"] != len(ROUTING["agents"]) + 1:
+            failures.append(f"expected {len(ROUTING['agents']) + 1} cached calls, got {stats['entries']}")
+        with llm_cache.bypass():
+            _run_query(QUERY, "bypass_fill", routing_info=dict(ROUTING))
+        after = llm_cache.stats()
+        print(f"parallel nodes: hits {stats['hits']} -> {after['hits']}, entries {stats['entries']} -> {after['entries']}")
+        if after["hits"] != stats["hits"] or after["entries"] != stats["entries"]:
+            failures.append("bypass did not cover parallel specialist nodes")
+
+        # Concurrent requests on one event loop: only the bypassed one skips the cache
+        async def bypassed():
+            with llm_cache.bypass():
+                await asyncio.sleep(0)
+                return await arun_query(QUERY, "bypass_async")
+
+        async def cached():
+            return await arun_query(QUERY, "cached_async")
+
+        async def both():
+            return await asyncio.gather(bypassed(), cached())
+
+        hits = llm_cache.stats()["hits"]
+        asyncio.run(both())
+        hits = llm_cache.stats()["hits"] - hits
+        print(f"concurrent arun_query: {hits} cache hit(s) in the non-bypassed request")
+        if hits == 0:
+            failures.append("bypass leaked into a concurrent request")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Multi-process session memory stress test
+
+Starts N writer processes that add queries to the same sessions of one
+shared memory store (plus reader processes that keep loading them) and
+reports write throughput for each N. Afterwards the store is checked:
+every writer's queries must be counted exactly once (no lost writes),
+readers must never have failed to load a session, and each writer's
+loaded memory (caught up with the other writers' events) must match the
+store.
+
+Usage: python evaluation/memory_stress.py [--backend json] [--writers 1,2,4,8]
+       [--writes 200] [--sessions 1] [--readers 1] [--output memory_stress.json]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _store(backend: str, path: str):
+    """Open store of the stress run"""
+    from src.tools.memory_store import create_store
+    return create_store(backend, path)
+
+
+def writer(worker: int, backend: str, path: str, writes: int, sessions: int, start, finished) -> None:
+    """Writer process - adds queries round-robin to the shared sessions
+
+    Args:
+        worker: Worker number (stored as agent_route, so writes can be counted per worker)
+        backend: Memory backend
+        path: Store path
+        writes: Queries to add
+        sessions: Number of shared sessions
+        start: Barrier all processes wait on before writing
+        finished: Barrier writers wait on before checking their memory
+    """
+    from src.tools.memory_manager import MemoryManager
+
+    store = _store(backend, path)
+    managers = [MemoryManager(f"stress_{i}", store=store) for i in range(sessions)]
+    start.wait()
+    for i in range(writes):
+        managers[i % sessions].add_query(f"query {i} from writer {worker}", agent_route=f"writer_{worker}")
+
+    # Loaded memory must equal the stored session (same queries in the same order; sqlite
+    # sessions load only the newest MEMORY_LOAD_WINDOW queries, the rest is counted)
+    finished.wait()
+    for manager in managers:
+        manager.refresh()
+        stored = store.load(manager.session_id)
+        loaded = [q.model_dump() for q in manager.memory.queries]
+        tail = [q.model_dump() for q in stored.queries[len(stored.queries) - len(loaded):]] if loaded else []
+        total = manager.memory.unloaded_queries + len(loaded)
+        if loaded != tail or total != len(stored.queries):
+            print(f"writer {worker}: memory of {manager.session_id} diverged from the store")
+            sys.exit(1)
+    store.close()
+
+
+def reader(backend: str, path: str, sessions: int, start, done, errors) -> None:
+    """Reader process - loads sessions until writers finish, counting failed loads
+
+    Args:
+        backend: Memory backend
+        path: Store path
+        sessions: Number of shared sessions
+        start: Barrier all processes wait on before writing
+        done: Event set by the parent when all writers finished
+        errors: Shared counter of failed loads
+    """
+    store = _store(backend, path)
+    start.wait()
+    i = 0
+    while not done.is_set():
+        try:
+            store.load(f"stress_{i % sessions}")
+        except Exception:
+            with errors.get_lock():
+                errors.value += 1
+        i += 1
+    store.close()
+
+
+def run(backend: str, writers: int, writes: int, sessions: int, readers: int) -> dict:
+    """One stress run on a fresh store
+
+    Args:
+        backend: Memory backend
+        writers: Number of writer processes
+        writes: Queries per writer
+        sessions: Number of shared sessions
+        readers: Number of reader processes
+
+    Returns:
+        Dictionary with throughput and consistency results
+    """
+    from src.tools.memory_manager import MemoryManager
+
+    directory = tempfile.mkdtemp(prefix="memory_stress_")
+    path = os.path.join(directory, "sessions.sqlite" if backend == "sqlite" else "sessions")
+    try:
+        start = multiprocessing.Barrier(writers + readers + 1)
+        finished = multiprocessing.Barrier(writers)
+        done = multiprocessing.Event()
+        errors = multiprocessing.Value("i", 0)
+        writer_procs = [
+            multiprocessing.Process(target=writer, args=(w, backend, path, writes, sessions, start, finished))
+            for w in range(writers)
+        ]
+        reader_procs = [
+            multiprocessing.Process(target=reader, args=(backend, path, sessions, start, done, errors))
+            for _ in range(readers)
+        ]
+        for proc in writer_procs + reader_procs:
+            proc.start()
+
+        start.wait()
+        started = time.perf_counter()
+        for proc in writer_procs:
+            proc.join()
+        elapsed = time.perf_counter() - started
+        done.set()
+        for proc in reader_procs:
+            proc.join()
+
+        # Every writer's queries must be stored exactly once
+        store = _store(backend, path)
+        counts = {}
+        for i in range(sessions):
+            summary = MemoryManager(f"stress_{i}", store=store).get_session_summary()
+            for route, count in summary["queries_by_agent"].items():
+                counts[route] = counts.get(route, 0) + count
+        store.close()
+        stored = sum(counts.values())
+        mismatched = [w for w in range(writers) if counts.get(f"writer_{w}", 0) != writes]
+
+        return {
+            "writers": writers,
+            "writes": writers * writes,
+            "seconds": round(elapsed, 3),
+            "writes_per_sec": round(writers * writes / elapsed, 1),
+            "stored": stored,
+            "lost": writers * writes - stored,
+            "mismatched_writers": mismatched,
+            "failed_reads": errors.value,
+            "ok": stored == writers * writes and not mismatched and not errors.value
+                  and all(proc.exitcode == 0 for proc in writer_procs + reader_procs),
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Multi-process session memory stress test")
+    parser.add_argument("--backend", default="json", choices=["json", "sqlite"], help="Memory backend")
+    parser.add_argument("--writers", default="1,2,4,8", help="Comma-separated writer process counts")
+    parser.add_argument("--writes", type=int, default=200, help="Queries per writer")
+    parser.add_argument("--sessions", type=int, default=1, help="Sessions shared by all writers")
+    parser.add_argument("--readers", type=int, default=1, help="Concurrent reader processes")
+    parser.add_argument("--output", default=None, help="JSON results file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"Backend: {args.backend}, {args.writes} writes per writer, {args.sessions} session(s), "
+          f"{args.readers} reader(s)")
+    print(f"{'writers':>8}{'writes/s':>12}{'seconds':>10}{'lost':>8}{'failed reads':>14}{'ok':>6}")
+    for writers in [int(n) for n in args.writers.split(",")]:
+        result = run(args.backend, writers, args.writes, args.sessions, args.readers)
+        results.append(result)
+        print(f"{writers:>8}{result['writes_per_sec']:>12.1f}{result['seconds']:>10.2f}"
+              f"{result['lost']:>8}{result['failed_reads']:>14}{str(result['ok']):>6}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"backend": args.backend, "runs": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    sys.exit(0 if all(result["ok"] for result in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
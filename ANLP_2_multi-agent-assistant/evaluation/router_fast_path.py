@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Router fast-path evaluation
+
+Runs the local query classifier over the labeled queries from
+evaluation/test_queries.md and the demo_script.py cases and reports
+hit rate (share of queries settled without the LLM) and accuracy.
+
+Usage: python evaluation/router_fast_path.py [--threshold 0.9]
+"""
+
+import argparse
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.config import ROUTER_FAST_PATH_THRESHOLD
+from src.tools.query_classifier import classify_query
+from demo_script import test_queries
+
+TEST_QUERIES_FILE = os.path.join(os.path.dirname(__file__), 'test_queries.md')
+
+
+def load_markdown_queries(path: str = TEST_QUERIES_FILE) -> list:
+    """Load labeled queries from the fast-path table in test_queries.md
+
+    Args:
+        path: Markdown file path
+
+    Returns:
+        List of (query, expected_category) pairs
+    """
+    cases = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            match = re.match(r'^\|\s*\d+\s*\|\s*(.+?)\s*\|\s*(research|coding|planning|general)\s*\|', line)
+            if match:
+                cases.append((match.group(1), match.group(2)))
+    return cases
+
+
+def evaluate(cases: list, threshold: float) -> dict:
+    """Evaluate fast path on labeled queries
+
+    Args:
+        cases: List of (query, expected_category) pairs
+        threshold: Confidence threshold for skipping the LLM
+
+    Returns:
+        Dictionary with hit rate and accuracy metrics
+    """
+    hits = 0
+    correct_hits = 0
+    correct_all = 0
+    misses = []
+
+    for query, expected in cases:
+        result = classify_query(query)
+        is_correct = result['classification'] == expected
+        correct_all += is_correct
+
+        if result['confidence'] >= threshold:
+            hits += 1
+            correct_hits += is_correct
+            if not is_correct:
+                misses.append((query, expected, result['classification']))
+
+    total = len(cases)
+    return {
+        "total": total,
+        "fast_path_hits": hits,
+        "hit_rate": hits / total if total else 0.0,
+        "fast_path_accuracy": correct_hits / hits if hits else 0.0,
+        "local_accuracy_all": correct_all / total if total else 0.0,
+        "wrong_fast_path": misses,
+    }
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Router fast-path evaluation")
+    parser.add_argument("--threshold", type=float, default=ROUTER_FAST_PATH_THRESHOLD)
+    args = parser.parse_args()
+
+    datasets = {
+        "test_queries.md": load_markdown_queries(),
+        "demo_script.py": [(c['query'], c['expected_category']) for c in test_queries()],
+    }
+
+    print(f"Threshold: {args.threshold}")
+    for name, cases in datasets.items():
+        report = evaluate(cases, args.threshold)
+        print(f"\n{name}: {report['total']} queries")
+        print(f"   Hit rate: {report['hit_rate']:.0%} ({report['fast_path_hits']}/{report['total']})")
+        print(f"   Fast-path accuracy: {report['fast_path_accuracy']:.0%}")
+        print(f"   Local accuracy (all queries): {report['local_accuracy_all']:.0%}")
+        for query, expected, actual in report['wrong_fast_path']:
+            print(f"   ❌ {query[:60]} - expected {expected}, got {actual}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,19 @@
 # Agents Package
-from .router import router_node
-from .research_specialist import research_specialist_node
-from .coding_helper import coding_helper_node
-from .planner import planner_node
-from .supervisor import supervisor_node
+from .router import router_node, arouter_node
+from .research_specialist import research_specialist_node, aresearch_specialist_node
+from .coding_helper import coding_helper_node, acoding_helper_node
+from .planner import planner_node, aplanner_node
+from .supervisor import supervisor_node, asupervisor_node
 
 __all__ = [
     'router_node',
     'research_specialist_node', 
     'coding_helper_node',
     'planner_node',
-    'supervisor_node'
+    'supervisor_node',
+    'arouter_node',
+    'aresearch_specialist_node',
+    'acoding_helper_node',
+    'aplanner_node',
+    'asupervisor_node'
 ]
-
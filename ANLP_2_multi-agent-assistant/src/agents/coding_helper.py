@@ -1,15 +1,18 @@
 # Coding Helper Agent - helps with code
+import asyncio
 import re
-from src.config import llm
+from src.config import llm, CODE_ANALYSIS_CACHE_PATH, CODE_ANALYSIS_CACHE_SIZE
 from src.models import AgentState
-from src.tools.code_tools import (
-    validate_python_syntax, 
-    suggest_improvements, 
-    extract_function_signature,
-    count_complexity
-)
+from src.tools.code_analysis_cache import CodeAnalysisCache, normalize_code
+from src.tools.code_tools import analyze_code
 from langchain_core.messages import HumanMessage, SystemMessage
 
+# Signatures listed per code block in the analysis context
+MAX_SIGNATURES = 10
+
+# Analysis result and rendered section per normalized code block, shared across sessions
+analysis_cache = CodeAnalysisCache(CODE_ANALYSIS_CACHE_SIZE, CODE_ANALYSIS_CACHE_PATH or None)
+
 CODING_PROMPT = """You are Coding Helper - programming expert in multi-agent system.
 
 ## Your specialization:
@@ -42,19 +45,81 @@ CODING_PROMPT = """You are Coding Helper - programming expert in multi-agent sys
 """
 
 
-def coding_helper_node(state: AgentState) -> AgentState:
-    """Coding Helper node - processes code questions
+def _analyze_block(code: str) -> dict:
+    """Run code analysis tools on one code block
 
     Args:
-        state: Current agent system state
+        code: Normalized code block
 
     Returns:
-        Updated state with coding helper answer
+        Analysis result dictionary
+    """
+    # Syntax check, signatures, complexity and suggestions in one parse
+    analysis = analyze_code(code)
+    signatures = [function['signature'] for function in analysis['functions']]
+    return {
+        "syntax_valid": analysis['valid'],
+        "syntax_error": analysis['error'],
+        "error_line": analysis['line'],
+        "function_signature": signatures[0] if signatures else None,
+        "function_signatures": signatures,
+        "classes": analysis['classes'],
+        "improvements": analysis['improvements'],
+        "complexity": analysis['complexity']
+    }
+
+
+def _render_block(result: dict) -> list:
+    """Analysis context lines of one code block (without its header)
+
+    Args:
+        result: Result of _analyze_block
+
+    Returns:
+        List of lines
+    """
+    lines = []
+    if result['syntax_valid']:
+        lines.append("  ✅ Syntax is correct")
+    else:
+        lines.append(f"  ❌ Syntax error: {result['syntax_error']}")
+        if result['error_line']:
+            lines.append(f"     Line: {result['error_line']}")
+
+    signatures = result['function_signatures']
+    if len(signatures) == 1:
+        lines.append(f"  📝 Signature: {signatures[0]}")
+    elif signatures:
+        lines.append(f"  📝 Signatures ({len(signatures)}):")
+        for signature in signatures[:MAX_SIGNATURES]:
+            lines.append(f"     - {signature}")
+        if len(signatures) > MAX_SIGNATURES:
+            lines.append(f"     ... and {len(signatures) - MAX_SIGNATURES} more")
+
+    if result['improvements']:
+        lines.append("  💡 Suggestions:")
+        for imp in result['improvements']:
+            lines.append(f"     - {imp}")
+
+    if 'complexity_score' in result.get('complexity', {}):
+        lines.append(f"  📊 Complexity: {result['complexity']['complexity_score']}")
+    return lines
+
+
+def _prepare_coding(state: AgentState) -> list:
+    """Analyze code from query and build LLM messages
+
+    Args:
+        state: Current agent system state (tool calls are logged into it)
+
+    Returns:
+        List of messages for LLM
     """
     user_input = state['user_input']
 
     # Extract code from query (support for different formats)
-    code_blocks = re.findall(r'```(?:python)?\s*(.*?)```', user_input, re.DOTALL)
+    # (indentation of the first line is kept - normalize_code dedents the whole block)
+    code_blocks = re.findall(r'```(?:python)?[ \t]*\n?(.*?)```', user_input, re.DOTALL)
 
     # Also search for code without blocks (simple one-liners)
     if not code_blocks:
@@ -63,79 +128,45 @@ def coding_helper_node(state: AgentState) -> AgentState:
         if potential_code:
             code_blocks = [user_input]
     
-    analysis_results = []
-    
+    analysis_sections = []
+
     for i, code in enumerate(code_blocks):
-        code = code.strip()
+        code = normalize_code(code)
         if not code:
             continue
 
-        # Syntax check
-        syntax_check = validate_python_syntax(code)
-
-        # Improvement suggestions
-        improvements = suggest_improvements(code)
-
-        # Function signature (if exists)
-        signature = extract_function_signature(code)
-
-        # Complexity metrics
-        complexity = count_complexity(code)
-        
-        result = {
-            "code_block": i + 1,
-            "syntax_valid": syntax_check['valid'],
-            "syntax_error": syntax_check.get('error'),
-            "error_line": syntax_check.get('line'),
-            "function_signature": signature if signature != "Function signature not found" else None,
-            "improvements": improvements,
-            "complexity": complexity
-        }
-        analysis_results.append(result)
-        
-        # Log tool calls
+        # Same code pasted again (in any session) reuses its analysis
+        cache_key = analysis_cache.key(code)
+        cached = analysis_cache.get(cache_key)
+        cache_hit = cached is not None
+        if not cache_hit:
+            result = _analyze_block(code)
+            cached = {"result": result, "section": _render_block(result)}
+            analysis_cache.put(cache_key, cached)
+        result = cached["result"]
+        analysis_sections.append([f"\n**Code block #{i + 1}:**"] + cached["section"])
+
+        # Log tool call
         state['tool_calls_log'].append({
             "agent": "coding_helper",
-            "tool": "validate_python_syntax",
+            "tool": "analyze_code",
             "code_block": i + 1,
-            "valid": syntax_check['valid']
+            "valid": result['syntax_valid'],
+            "functions": len(result['function_signatures']),
+            "suggestions_count": len(result['improvements']),
+            "cache_hit": cache_hit,
+            "cache_stats": analysis_cache.stats()
         })
 
-        if improvements:
-            state['tool_calls_log'].append({
-                "agent": "coding_helper",
-                "tool": "suggest_improvements",
-                "code_block": i + 1,
-                "suggestions_count": len(improvements)
-            })
-
     # Form analysis context
-    if analysis_results:
+    if analysis_sections:
         analysis_lines = ["Automatic code analysis results:"]
-        for result in analysis_results:
-            analysis_lines.append(f"\n**Code block #{result['code_block']}:**")
-            if result['syntax_valid']:
-                analysis_lines.append("  ✅ Syntax is correct")
-            else:
-                analysis_lines.append(f"  ❌ Syntax error: {result['syntax_error']}")
-                if result['error_line']:
-                    analysis_lines.append(f"     Line: {result['error_line']}")
-            
-            if result['function_signature']:
-                analysis_lines.append(f"  📝 Signature: {result['function_signature']}")
-            
-            if result['improvements']:
-                analysis_lines.append("  💡 Suggestions:")
-                for imp in result['improvements']:
-                    analysis_lines.append(f"     - {imp}")
-            
-            if 'complexity_score' in result.get('complexity', {}):
-                analysis_lines.append(f"  📊 Complexity: {result['complexity']['complexity_score']}")
-        
+        for section in analysis_sections:
+            analysis_lines.extend(section)
         analysis_context = "\n".join(analysis_lines)
     else:
         analysis_context = "No code found for analysis in the query."
-    
+
     # Create prompt with context
     prompt_with_context = CODING_PROMPT.format(analysis_context=analysis_context)
     
@@ -144,10 +175,42 @@ def coding_helper_node(state: AgentState) -> AgentState:
         HumanMessage(content=f"Answer the Question: {user_input}")
     ]
     
+    return messages
+
+
+def coding_helper_node(state: AgentState) -> AgentState:
+    """Coding Helper node - processes code questions
+
+    Args:
+        state: Current agent system state
+
+    Returns:
+        Updated state with coding helper answer
+    """
+    messages = _prepare_coding(state)
     response = llm.invoke(messages)
-    
+
     # Save Answer
     state['intermediate_responses']['coding_helper'] = response.content
-    
+
+    return state
+
+
+async def acoding_helper_node(state: AgentState) -> AgentState:
+    """Async Coding Helper node (llm.ainvoke)
+
+    Args:
+        state: Current agent system state
+
+    Returns:
+        Updated state with coding helper answer
+    """
+    # Code parsing and the analysis cache (SQLite) block - keep them off the event loop
+    messages = await asyncio.to_thread(_prepare_coding, state)
+    response = await llm.ainvoke(messages)
+
+    # Save Answer
+    state['intermediate_responses']['coding_helper'] = response.content
+
     return state
 
@@ -1,6 +1,8 @@
 # Planning Agent - helps with planning
-from src.config import llm
-from src.models import AgentState, SessionMemory
+import asyncio
+from src.config import llm, PLANNER_HISTORY_TURNS
+from src.models import AgentState
+from src.tools.memory_manager import format_similar_queries
 from langchain_core.messages import HumanMessage, SystemMessage
 
 PLANNER_PROMPT = """You are Planning Agent - planning expert and task decomposition.
@@ -49,72 +51,36 @@ Structure the plan as follows:
 """
 
 
-def _retrieve_history_from_memory(memory: SessionMemory, last_n: int = 5) -> str:
-    """Get last N queries from SessionMemory
-
-    Args:
-        memory: SessionMemory object
-        last_n: Number of last queries
-
-    Returns:
-        Formatted string with query history
-    """
-    recent = memory.queries[-last_n:] if memory.queries else []
-    if not recent:
-        return "Query history is empty"
-    return "\n".join([f"- [{q.timestamp}] ({q.agent_route or 'unknown'}): {q.text}" for q in recent])
-
-
-def _get_context_for_agent_from_memory(memory: SessionMemory, agent_name: str, max_items: int = 3) -> str:
-    """Get relevant context for agent from SessionMemory
-
-    Args:
-        memory: SessionMemory object
-        agent_name: Agent name
-        max_items: Maximum context items
-
-    Returns:
-        Context for agent
-    """
-    # Get queries processed by this agent
-    agent_queries = [q for q in memory.queries if q.agent_route == agent_name]
-    recent = agent_queries[-max_items:] if agent_queries else []
-
-    if not recent:
-        return f"First interaction with agent {agent_name}"
-
-    context_lines = [f"Previous queries to {agent_name}:"]
-    for q in recent:
-        context_lines.append(f"  - {q.text}")
-
-    return "\n".join(context_lines)
-
-
-def planner_node(state: AgentState) -> AgentState:
-    """Planning Agent node - creates plans and decomposes tasks
+def _prepare_planning(state: AgentState) -> list:
+    """Collect history context, log memory tool calls and build LLM messages
 
     Args:
         state: Current agent system state
 
     Returns:
-        Updated state with plan
+        List of messages for LLM
     """
     user_input = state['user_input']
     
-    memory = state.get('memory')
-    if memory is None:
-        from src.models import SessionMemory
-        memory = SessionMemory(session_id=state.get('metadata', {}).get('session_id', 'default'))
-
-    # Get history from state memory
-    history = _retrieve_history_from_memory(memory, last_n=3)
-
-    # Also get context specific to planner
-    agent_context = _get_context_for_agent_from_memory(memory, 'planner', max_items=2)
+    # Session memory is shared with concurrent requests - read it through its manager (locked)
+    memory_manager = state.get('memory_manager')
+    if memory_manager is not None:
+        # Latest turns are always shown (follow-ups often share no words with them);
+        # related earlier turns are added on top
+        history = memory_manager.retrieve_history(last_n=PLANNER_HISTORY_TURNS)
+        shown = {(q.timestamp, q.text) for q in memory_manager.recent_queries(PLANNER_HISTORY_TURNS)}
+        similar = [(q, score) for q, score in memory_manager.similar_queries(user_input, top_k=3 + len(shown))
+                   if (q.timestamp, q.text) not in shown][:3]
+        # Also get context specific to planner
+        agent_context = memory_manager.get_context_for_agent('planner', max_items=2)
+    else:
+        # Graph run without session memory
+        similar, history, agent_context = [], "Query history is empty", "First interaction with agent planner"
 
     # Form history context
     if history and history != "Query history is empty":
-        history_context = f"Recent queries history:\n{history}\n\nPlanning context:\n{agent_context}"
+        history_context = (f"Related earlier queries:\n{format_similar_queries(similar)}\n\n"
+                           f"Previous queries:\n{history}\n\nPlanning context:\n{agent_context}")
     else:
         history_context = "This is the first query in the session. No history."
     
@@ -126,25 +92,55 @@ def planner_node(state: AgentState) -> AgentState:
         HumanMessage(content=f"Create a plan for: {user_input}")
     ]
     
-    response = llm.invoke(messages)
-    
-    # Save Answer
-    state['intermediate_responses']['planner'] = response.content
-    
     # Log tool calls
     state['tool_calls_log'].append({
         "agent": "planner",
-        "tool": "memory.retrieve_history",
-        "retrieved_items": 3,
+        "tool": "memory.search_history",
+        "retrieved_items": len(similar),
         "history_available": history != "Query history is empty"
     })
-    
+
     state['tool_calls_log'].append({
         "agent": "planner",
         "tool": "memory.get_context_for_agent",
         "agent_name": "planner"
     })
-    
-    
+
+    return messages
+
+
+def planner_node(state: AgentState) -> AgentState:
+    """Planning Agent node - creates plans and decomposes tasks
+
+    Args:
+        state: Current agent system state
+
+    Returns:
+        Updated state with plan
+    """
+    messages = _prepare_planning(state)
+    response = llm.invoke(messages)
+
+    # Save Answer
+    state['intermediate_responses']['planner'] = response.content
+
     return state
 
+
+async def aplanner_node(state: AgentState) -> AgentState:
+    """Async Planning Agent node (llm.ainvoke)
+
+    Args:
+        state: Current agent system state
+
+    Returns:
+        Updated state with plan
+    """
+    # Memory reads take the session lock (and may query the store) - keep them off the event loop
+    messages = await asyncio.to_thread(_prepare_planning, state)
+    response = await llm.ainvoke(messages)
+
+    # Save Answer
+    state['intermediate_responses']['planner'] = response.content
+
+    return state
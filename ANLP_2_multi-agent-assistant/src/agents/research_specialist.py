@@ -1,5 +1,6 @@
 # Research Specialist Agent - answers theoretical questions
-from src.config import llm
+import asyncio
+from src.config import llm, KB_RETRIEVAL_MODE
 from src.models import AgentState
 from src.tools.knowledge_base import query_knowledge_base
 from langchain_core.messages import HumanMessage, SystemMessage
@@ -36,19 +37,19 @@ RESEARCH_PROMPT = """You are Research Specialist - expert on theoretical questio
 """
 
 
-def research_specialist_node(state: AgentState) -> AgentState:
-    """Research Specialist node - processes theoretical queries
+def _prepare_research(state: AgentState) -> tuple:
+    """Search Knowledge Base and build LLM messages
 
     Args:
         state: Current agent system state
 
     Returns:
-        Updated state with research specialist answer
+        Tuple (messages, kb_result, kb_found)
     """
     user_input = state['user_input']
 
     # Search in Knowledge Base
-    kb_result = query_knowledge_base(user_input)
+    kb_result = query_knowledge_base(user_input, mode=KB_RETRIEVAL_MODE)
     kb_found = kb_result != "Information not found in KB"
 
     # Form context from KB
@@ -56,7 +57,7 @@ def research_specialist_node(state: AgentState) -> AgentState:
         kb_context = f"Found in knowledge base:\n{kb_result}"
     else:
         kb_context = "No direct matches in knowledge base. Use your knowledge."
-    
+
     # Create prompt with context
     prompt_with_context = RESEARCH_PROMPT.format(kb_context=kb_context)
 
@@ -64,20 +65,60 @@ def research_specialist_node(state: AgentState) -> AgentState:
         SystemMessage(content=prompt_with_context),
         HumanMessage(content=f"Answer the question: {user_input}")
     ]
+    return messages, kb_result, kb_found
 
-    response = llm.invoke(messages)
 
+def _save_research_answer(state: AgentState, answer: str, kb_result: str, kb_found: bool) -> AgentState:
+    """Save research answer and log KB tool call
+
+    Args:
+        state: Current agent system state
+        answer: LLM answer
+        kb_result: Knowledge Base search result
+        kb_found: Whether KB returned matches
+
+    Returns:
+        Updated state
+    """
     # Save Answer in intermediate_responses
-    state['intermediate_responses']['research_specialist'] = response.content
-    
+    state['intermediate_responses']['research_specialist'] = answer
+
     # Log tool call
     state['tool_calls_log'].append({
         "agent": "research_specialist",
         "tool": "knowledge_base.query",
-        "input": user_input,
+        "input": state['user_input'],
         "result_found": kb_found,
         "kb_result_preview": kb_result[:100] if kb_found else None
     })
-    
+
     return state
 
+
+def research_specialist_node(state: AgentState) -> AgentState:
+    """Research Specialist node - processes theoretical queries
+
+    Args:
+        state: Current agent system state
+
+    Returns:
+        Updated state with research specialist answer
+    """
+    messages, kb_result, kb_found = _prepare_research(state)
+    response = llm.invoke(messages)
+    return _save_research_answer(state, response.content, kb_result, kb_found)
+
+
+async def aresearch_specialist_node(state: AgentState) -> AgentState:
+    """Async Research Specialist node (llm.ainvoke)
+
+    Args:
+        state: Current agent system state
+
+    Returns:
+        Updated state with research specialist answer
+    """
+    # KB index load/build and ranking block - keep them off the event loop
+    messages, kb_result, kb_found = await asyncio.to_thread(_prepare_research, state)
+    response = await llm.ainvoke(messages)
+    return _save_research_answer(state, response.content, kb_result, kb_found)
@@ -1,8 +1,11 @@
 # Router Agent - classifies and routes queries
+import hashlib
 import json
 import re
-from src.config import llm
+from src.config import llm, ROUTER_FAST_PATH_THRESHOLD, ROUTER_CACHE_SIZE, ROUTER_CACHE_TTL
 from src.models import AgentState
+from src.tools.lru_cache import LRUCache
+from src.tools.query_classifier import classify_query
 from langchain_core.messages import HumanMessage, SystemMessage
 
 ROUTER_PROMPT = """You are Router Agent in multi-agent system. Your only task is to classify user query and select appropriate agents.
@@ -52,60 +55,276 @@ Answer: {"classification": "planning", "agents": ["planner"]}
 """
 
 
-def router_node(state: AgentState) -> AgentState:
-    """Router node in graph - classifies query and selects agents
+VALID_CLASSIFICATIONS = ["research", "coding", "planning", "general"]
+VALID_AGENTS = ["research_specialist", "coding_helper", "planner", "supervisor"]
+
+# Cache of LLM routing decisions: normalized query -> (classification, agents)
+routing_cache = LRUCache(max_size=ROUTER_CACHE_SIZE, ttl=ROUTER_CACHE_TTL)
+
+_CODE_BLOCK_RE = re.compile(r'```.*?(?:```|$)', re.DOTALL)
+
+
+def normalize_query(user_input: str) -> str:
+    """Build routing cache key from user query
+
+    Code blocks are replaced with their hash, the rest is lowercased
+    and whitespace-collapsed.
 
     Args:
-        state: Current agent system state
+        user_input: User query
 
     Returns:
-        Updated state with classification and agent list
+        Normalized query
     """
-    messages = [
-        SystemMessage(content=ROUTER_PROMPT),
-        HumanMessage(content=f"Classify this query: {state['user_input']}")
-    ]
+    def _hash_block(match: re.Match) -> str:
+        digest = hashlib.sha1(match.group().strip('`').strip().encode('utf-8')).hexdigest()
+        return f" <code:{digest[:16]}> "
+
+    text = _CODE_BLOCK_RE.sub(_hash_block, user_input)
+    return " ".join(text.lower().split())
+
+
+def _extract_json(response_text: str) -> dict:
+    """Find first JSON object in LLM response
 
-    response = llm.invoke(messages)
-    response_text = response.content
+    Tolerates text, markdown fences and nested braces around the object.
 
-    # Try to extract JSON from response
+    Args:
+        response_text: Raw LLM response
+
+    Returns:
+        Parsed JSON object
+    """
+    decoder = json.JSONDecoder()
+    for match in re.finditer(r'\{', response_text):
+        try:
+            result, _ = decoder.raw_decode(response_text, match.start())
+        except json.JSONDecodeError:
+            continue
+        if isinstance(result, dict):
+            return result
+    raise json.JSONDecodeError("No JSON object found", response_text, 0)
+
+
+def _parse_router_response(response_text: str) -> tuple:
+    """Parse and validate Router LLM response
+
+    Args:
+        response_text: Raw LLM response
+
+    Returns:
+        Tuple (classification, agents), falls back to general/supervisor
+    """
     try:
-        # Search for JSON in response
-        json_match = re.search(r'\{[^}]+\}', response_text)
-        if json_match:
-            result = json.loads(json_match.group())
-        else:
-            result = json.loads(response_text)
+        result = _extract_json(response_text)
 
         classification = result.get("classification", "general")
         agents = result.get("agents", ["supervisor"])
 
         # Validate classification
-        valid_classifications = ["research", "coding", "planning", "general"]
-        if classification not in valid_classifications:
+        if classification not in VALID_CLASSIFICATIONS:
             classification = "general"
 
         # Validate agents
-        valid_agents = ["research_specialist", "coding_helper", "planner", "supervisor"]
-        agents = [a for a in agents if a in valid_agents]
+        agents = [a for a in agents if a in VALID_AGENTS]
         if not agents:
             agents = ["supervisor"]
 
-        state["classification"] = classification
-        state["classified_agents"] = agents
+        return classification, agents
 
     except (json.JSONDecodeError, KeyError, TypeError):
         # Fallback on parsing error
-        state["classification"] = "general"
-        state["classified_agents"] = ["supervisor"]
+        return "general", ["supervisor"]
 
-    # Log routing
-    state["metadata"]["routing_info"] = {
-        "classification": state["classification"],
-        "agents": state["classified_agents"],
+
+def _local_decision(user_input: str) -> tuple:
+    """Try to route query without the LLM (fast path, then routing cache)
+
+    Args:
+        user_input: User query
+
+    Returns:
+        Tuple (fast_result, decision, cache_key); decision is
+        (classification, agents, source) or None if the LLM is needed
+    """
+    # Fast path - local rules and Naive Bayes model
+    fast_result = classify_query(user_input)
+    if fast_result["confidence"] >= ROUTER_FAST_PATH_THRESHOLD:
+        return fast_result, (fast_result["classification"], fast_result["agents"], "fast_path"), None
+
+    cache_key = normalize_query(user_input)
+    cached = routing_cache.get(cache_key)
+    if cached is not None:
+        return fast_result, (cached[0], list(cached[1]), "cache"), cache_key
+
+    return fast_result, None, cache_key
+
+
+def _router_messages(user_input: str) -> list:
+    """Build Router LLM messages
+
+    Args:
+        user_input: User query
+
+    Returns:
+        List of messages for LLM
+    """
+    return [
+        SystemMessage(content=ROUTER_PROMPT),
+        HumanMessage(content=f"Classify this query: {user_input}")
+    ]
+
+
+def _llm_decision(response_text: str, cache_key: str) -> tuple:
+    """Parse Router LLM response and remember decision in routing cache
+
+    Args:
+        response_text: Raw LLM response
+        cache_key: Normalized query
+
+    Returns:
+        Tuple (classification, agents, source)
+    """
+    classification, agents = _parse_router_response(response_text)
+    routing_cache.put(cache_key, (classification, tuple(agents)))
+    return classification, agents, "llm"
+
+
+def _routing_info(fast_result: dict, decision: tuple, response_text: str) -> dict:
+    """Build routing info for state metadata
+
+    Args:
+        fast_result: Local classifier result
+        decision: Tuple (classification, agents, source)
+        response_text: Raw LLM response ("" if LLM was not called)
+
+    Returns:
+        Routing info dictionary
+    """
+    classification, agents, source = decision
+    return {
+        "classification": classification,
+        "agents": agents,
+        "source": source,
+        "fast_path_confidence": round(fast_result["confidence"], 3),
+        "fast_path_rules": fast_result["matched_rules"],
+        "cache_hit": source == "cache",
+        "cache_stats": routing_cache.stats(),
         "raw_response": response_text[:200]  # First 200 characters for debugging
     }
-    
+
+
+def _save_routing(state: AgentState, routing_info: dict) -> AgentState:
+    """Save routing decision and routing info into state
+
+    Args:
+        state: Current agent system state
+        routing_info: Routing info dictionary
+
+    Returns:
+        Updated state
+    """
+    state["classification"] = routing_info["classification"]
+    state["classified_agents"] = list(routing_info["agents"])
+
+    # Log routing
+    state["metadata"]["routing_info"] = routing_info
+
     return state
 
+
+def classify_batch(queries: list, max_concurrency: int = 4) -> list:
+    """Route many queries at once - LLM classifications go in one llm.batch call
+
+    Args:
+        queries: List of user queries
+        max_concurrency: Maximum parallel LLM requests inside the batch
+
+    Returns:
+        List of routing info dictionaries in input order
+        (None where the LLM call failed - the Router node will retry it)
+    """
+    results = [None] * len(queries)
+    pending = {}  # cache_key -> (query, fast_result, [indices])
+
+    for i, user_input in enumerate(queries):
+        fast_result, decision, cache_key = _local_decision(user_input)
+        if decision is not None:
+            results[i] = _routing_info(fast_result, decision, "")
+        elif cache_key in pending:
+            pending[cache_key][2].append(i)
+        else:
+            pending[cache_key] = (user_input, fast_result, [i])
+
+    if not pending:
+        return results
+
+    batch = list(pending.items())
+    responses = llm.batch(
+        [_router_messages(user_input) for _, (user_input, _, _) in batch],
+        config={"max_concurrency": max_concurrency},
+        return_exceptions=True
+    )
+
+    for (cache_key, (_, fast_result, indices)), response in zip(batch, responses):
+        if isinstance(response, Exception):
+            continue
+        decision = _llm_decision(response.content, cache_key)
+        for i in indices:
+            results[i] = _routing_info(fast_result, decision, response.content)
+
+    return results
+
+
+def router_node(state: AgentState) -> AgentState:
+    """Router node in graph - classifies query and selects agents
+
+    High-confidence queries are settled by the local classifier, ambiguous
+    ones are looked up in the routing cache and only then sent to the LLM.
+
+    Args:
+        state: Current agent system state
+
+    Returns:
+        Updated state with classification and agent list
+    """
+    # Already routed in advance (classify_batch in run_queries)
+    preset = state["metadata"].get("routing_info")
+    if preset:
+        return _save_routing(state, preset)
+
+    user_input = state['user_input']
+    fast_result, decision, cache_key = _local_decision(user_input)
+    response_text = ""
+
+    if decision is None:
+        response = llm.invoke(_router_messages(user_input))
+        response_text = response.content
+        decision = _llm_decision(response_text, cache_key)
+
+    return _save_routing(state, _routing_info(fast_result, decision, response_text))
+
+
+async def arouter_node(state: AgentState) -> AgentState:
+    """Async Router node (llm.ainvoke)
+
+    Args:
+        state: Current agent system state
+
+    Returns:
+        Updated state with classification and agent list
+    """
+    preset = state["metadata"].get("routing_info")
+    if preset:
+        return _save_routing(state, preset)
+
+    user_input = state['user_input']
+    fast_result, decision, cache_key = _local_decision(user_input)
+    response_text = ""
+
+    if decision is None:
+        response = await llm.ainvoke(_router_messages(user_input))
+        response_text = response.content
+        decision = _llm_decision(response_text, cache_key)
+
+    return _save_routing(state, _routing_info(fast_result, decision, response_text))
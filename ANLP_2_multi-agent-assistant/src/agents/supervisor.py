@@ -1,5 +1,6 @@
 # Supervisor Agent - coordinates and synthesizes responses
-from src.config import llm
+from typing import Optional
+from src.config import llm, llm_cache, SUPERVISOR_PASSTHROUGH, SUPERVISOR_PASSTHROUGH_FORMAT
 from src.models import AgentState
 from langchain_core.messages import HumanMessage, SystemMessage
 
@@ -49,14 +50,71 @@ Query: {user_query}
 """
 
 
-def supervisor_node(state: AgentState) -> AgentState:
-    """Supervisor node - synthesizes final answer
+def format_answer(text: str) -> str:
+    """Cheap local formatting pass for pass-through answers
+
+    Trims trailing whitespace, collapses runs of blank lines outside
+    code blocks and closes an unterminated code fence.
+
+    Args:
+        text: Specialist answer
+
+    Returns:
+        Formatted answer
+    """
+    lines = []
+    in_code = False
+    blank_run = 0
+
+    for line in text.replace('\r\n', '\n').strip().split('\n'):
+        line = line.rstrip()
+        if line.lstrip().startswith('```'):
+            in_code = not in_code
+        if not line and not in_code:
+            blank_run += 1
+            if blank_run > 1:
+                continue
+        else:
+            blank_run = 0
+        lines.append(line)
+
+    if in_code:
+        lines.append('```')
+
+    return '\n'.join(lines)
+
+
+def _single_specialist_answer(state: AgentState) -> Optional[str]:
+    """Answer to pass through when exactly one specialist contributed
 
     Args:
         state: Current agent system state
 
     Returns:
-        Updated state with final answer
+        Specialist answer or None if synthesis is needed
+    """
+    if not SUPERVISOR_PASSTHROUGH:
+        return None
+
+    responses = [
+        response for agent, response in state['intermediate_responses'].items()
+        if agent != 'supervisor'
+    ]
+    if len(responses) != 1 or not responses[0].strip():
+        return None
+
+    answer = responses[0]
+    return format_answer(answer) if SUPERVISOR_PASSTHROUGH_FORMAT else answer
+
+
+def _prepare_supervisor(state: AgentState) -> list:
+    """Build synthesis (or direct answer) messages
+
+    Args:
+        state: Current agent system state
+
+    Returns:
+        List of messages for LLM
     """
     user_input = state['user_input']
     intermediate_responses = state['intermediate_responses']
@@ -90,13 +148,81 @@ def supervisor_node(state: AgentState) -> AgentState:
         HumanMessage(content="Form the final Answer for the user.")
     ]
 
-    response = llm.invoke(messages)
+    return messages
+
+
+def _use_cache() -> bool:
+    """Whether the Supervisor call should go through llm_cache (stream()/astream() bypass LangChain caches)"""
+    return llm_cache is not None and not llm_cache.bypassed
+
 
+def _save_final_answer(state: AgentState, answer: str) -> AgentState:
+    """Save final answer into state
+
+    Args:
+        state: Current agent system state
+        answer: Final answer text
+
+    Returns:
+        Updated state
+    """
     # Save the final Answer
-    state['final_answer'] = response.content
+    state['final_answer'] = answer
 
     # Also save in intermediate for completeness
-    state['intermediate_responses']['supervisor'] = response.content
-    
+    state['intermediate_responses']['supervisor'] = answer
+
     return state
 
+
+def supervisor_node(state: AgentState) -> AgentState:
+    """Supervisor node - synthesizes final answer
+
+    Args:
+        state: Current agent system state
+
+    Returns:
+        Updated state with final answer
+    """
+    # Single specialist - no synthesis call needed
+    answer = _single_specialist_answer(state)
+    if answer is not None:
+        state['metadata']['supervisor_mode'] = "passthrough"
+        return _save_final_answer(state, answer)
+
+    state['metadata']['supervisor_mode'] = "synthesis" if state['intermediate_responses'] else "direct"
+    messages = _prepare_supervisor(state)
+
+    if _use_cache():
+        # invoke() checks llm_cache first and still streams tokens to stream_query on a miss
+        answer = llm.invoke(messages).content
+    else:
+        # Stream completion so token events reach stream_query as they arrive
+        answer = "".join(chunk.content for chunk in llm.stream(messages))
+
+    return _save_final_answer(state, answer)
+
+
+async def asupervisor_node(state: AgentState) -> AgentState:
+    """Async Supervisor node (llm.astream, the streaming form of llm.ainvoke)
+
+    Args:
+        state: Current agent system state
+
+    Returns:
+        Updated state with final answer
+    """
+    answer = _single_specialist_answer(state)
+    if answer is not None:
+        state['metadata']['supervisor_mode'] = "passthrough"
+        return _save_final_answer(state, answer)
+
+    state['metadata']['supervisor_mode'] = "synthesis" if state['intermediate_responses'] else "direct"
+    messages = _prepare_supervisor(state)
+
+    if _use_cache():
+        answer = (await llm.ainvoke(messages)).content
+    else:
+        answer = "".join([chunk.content async for chunk in llm.astream(messages)])
+
+    return _save_final_answer(state, answer)
@@ -9,10 +9,90 @@ LITELLM_BASE_URL = os.getenv("LITELLM_BASE_URL", "http://a6k2.dgx:34000/v1")
 API_KEY = os.getenv("LITELLM_API_KEY", "sk-pNtjvNgR-9llKvVyq3fbPw")
 MODEL_NAME = os.getenv("MODEL_NAME", "qwen3-32b")
 
-llm = ChatOpenAI(
-    model=MODEL_NAME,
-    base_url=LITELLM_BASE_URL,
-    api_key=API_KEY,
-    temperature=0.7,
-)
+# Run classified specialists concurrently (fan-out) instead of one after another
+PARALLEL_AGENTS = os.getenv("PARALLEL_AGENTS", "true").lower() in ("1", "true", "yes")
+
+# Local classifier confidence needed to skip the LLM Router call (> 1.0 disables fast path)
+ROUTER_FAST_PATH_THRESHOLD = float(os.getenv("ROUTER_FAST_PATH_THRESHOLD", "0.9"))
+
+# Routing decision cache (size 0 disables, TTL in seconds)
+ROUTER_CACHE_SIZE = int(os.getenv("ROUTER_CACHE_SIZE", "1024"))
+ROUTER_CACHE_TTL = float(os.getenv("ROUTER_CACHE_TTL", "3600"))
+
+# Code analysis cache shared by all sessions (size 0 disables; path - optional SQLite file to persist it)
+CODE_ANALYSIS_CACHE_SIZE = int(os.getenv("CODE_ANALYSIS_CACHE_SIZE", "512"))
+CODE_ANALYSIS_CACHE_PATH = os.getenv("CODE_ANALYSIS_CACHE_PATH", "")
+
+# Single specialist answer becomes the final answer without a Supervisor LLM call
+SUPERVISOR_PASSTHROUGH = os.getenv("SUPERVISOR_PASSTHROUGH", "true").lower() in ("1", "true", "yes")
+# Apply local formatting pass (whitespace cleanup, unclosed code fences) to pass-through answers
+SUPERVISOR_PASSTHROUGH_FORMAT = os.getenv("SUPERVISOR_PASSTHROUGH_FORMAT", "true").lower() in ("1", "true", "yes")
+
+# Knowledge Base retrieval for Research Specialist: bm25 | semantic | hybrid
+KB_RETRIEVAL_MODE = os.getenv("KB_RETRIEVAL_MODE", "hybrid")
+# Directory of Markdown/JSONL documents to use instead of the built-in KB (empty = built-in)
+KB_SOURCE_DIR = os.getenv("KB_SOURCE_DIR", "")
+# Prebuilt index artifact for KB_SOURCE_DIR (passage store + indexes, rebuilt when stale)
+KB_INDEX_DIR = os.getenv("KB_INDEX_DIR", ".kb_index")
+# Poll KB_SOURCE_DIR every N seconds and hot-swap a rebuilt index (0 disables; for long-running servers)
+KB_RELOAD_INTERVAL = float(os.getenv("KB_RELOAD_INTERVAL", "0"))
+
+# Planner history context: latest queries always shown (similar earlier turns are added on top)
+PLANNER_HISTORY_TURNS = int(os.getenv("PLANNER_HISTORY_TURNS", "3"))
+
+# Session memory storage: "json" (snapshot + journal file per session) or "sqlite" (indexed tables)
+MEMORY_BACKEND = os.getenv("MEMORY_BACKEND", "json").lower()
+# Session directory (json) or database file (sqlite)
+MEMORY_PATH = os.getenv("MEMORY_PATH", "session_memory.sqlite" if MEMORY_BACKEND == "sqlite" else "session_memory")
+# Journal events before they are compacted into the session snapshot (json, 0 disables compaction)
+MEMORY_COMPACT_EVENTS = int(os.getenv("MEMORY_COMPACT_EVENTS", "200"))
+# Write-behind: memory writes are buffered and flushed in batches (with fsync) by a background thread
+MEMORY_WRITE_BEHIND = os.getenv("MEMORY_WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+# Durability window - maximum seconds a write stays in the buffer
+MEMORY_FLUSH_INTERVAL = float(os.getenv("MEMORY_FLUSH_INTERVAL", "1.0"))
+# Buffered events that trigger an immediate flush
+MEMORY_FLUSH_MAX_EVENTS = int(os.getenv("MEMORY_FLUSH_MAX_EVENTS", "100"))
+# Retention: newest queries/notes kept as full records, older ones are folded into counts (0 - keep all)
+MEMORY_MAX_QUERIES = int(os.getenv("MEMORY_MAX_QUERIES", "1000"))
+MEMORY_MAX_NOTES = int(os.getenv("MEMORY_MAX_NOTES", "1000"))
+# Newest queries loaded with a session from indexed stores (sqlite); older ones stay in the
+# database until a similar-history search needs them (0 - load all)
+MEMORY_LOAD_WINDOW = int(os.getenv("MEMORY_LOAD_WINDOW", "100"))
+# Loaded sessions kept in memory between queries (LRU, 0 disables the session pool)
+MEMORY_POOL_SIZE = int(os.getenv("MEMORY_POOL_SIZE", "256"))
+# Seconds without queries after which a pooled session is flushed and dropped
+MEMORY_IDLE_TIMEOUT = float(os.getenv("MEMORY_IDLE_TIMEOUT", "600"))
+
+# Persistent LLM response cache (identical model + parameters + messages)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite")
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "256"))
+
+llm_cache = None
+if LLM_CACHE_ENABLED:
+    from src.llm_cache import SQLiteLLMCache
+    llm_cache = SQLiteLLMCache(LLM_CACHE_PATH, max_bytes=int(LLM_CACHE_MAX_MB * 1024 * 1024))
+
+# LLM backend: "litellm" (OpenAI-compatible endpoint) or "offline" (local stub, no network)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "litellm").lower()
+OFFLINE_LLM_PROFILE = os.getenv("OFFLINE_LLM_PROFILE", "realistic")  # instant|fast|realistic|slow
+OFFLINE_LLM_ERROR_RATE = float(os.getenv("OFFLINE_LLM_ERROR_RATE", "0"))
+OFFLINE_LLM_SEED = int(os.getenv("OFFLINE_LLM_SEED", "42"))
+
+if LLM_BACKEND == "offline":
+    from src.offline_llm import OfflineChatModel
+    llm = OfflineChatModel(
+        profile=OFFLINE_LLM_PROFILE,
+        error_rate=OFFLINE_LLM_ERROR_RATE,
+        seed=OFFLINE_LLM_SEED,
+        cache=llm_cache,
+    )
+else:
+    llm = ChatOpenAI(
+        model=MODEL_NAME,
+        base_url=LITELLM_BASE_URL,
+        api_key=API_KEY,
+        temperature=0.7,
+        cache=llm_cache,
+    )
 
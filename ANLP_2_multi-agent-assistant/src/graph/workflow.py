@@ -1,11 +1,152 @@
 # LangGraph definition - entire multi-agent system workflow
+import time
+from functools import wraps
+from typing import Awaitable, Callable, List, Optional
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
+from src.config import PARALLEL_AGENTS
 from src.models import AgentState
-from src.agents.router import router_node
-from src.agents.research_specialist import research_specialist_node
-from src.agents.coding_helper import coding_helper_node
-from src.agents.planner import planner_node
-from src.agents.supervisor import supervisor_node
+from src.agents.router import router_node, arouter_node
+from src.agents.research_specialist import research_specialist_node, aresearch_specialist_node
+from src.agents.coding_helper import coding_helper_node, acoding_helper_node
+from src.agents.planner import planner_node, aplanner_node
+from src.agents.supervisor import supervisor_node, asupervisor_node
+
+# Agent-to-node mapping
+AGENT_TO_NODE = {
+    "research_specialist": "research_specialist",
+    "coding_helper": "coding_helper",
+    "planner": "planner",
+    "supervisor": "supervisor"
+}
+
+# Specialist nodes that can run between Router and Supervisor
+SPECIALIST_NODES = ["research_specialist", "coding_helper", "planner"]
+
+# State keys combined by reducers (see AgentState) - nodes return only their own part
+MERGED_KEYS = ("intermediate_responses", "tool_calls_log", "metadata")
+
+
+def _diff_state(before: AgentState, after: AgentState) -> dict:
+    """Build partial state update from state before and after node execution
+
+    Args:
+        before: State passed to the node
+        after: State returned by the node
+
+    Returns:
+        Dictionary with only changed keys (merged keys contain only new items)
+    """
+    update = {
+        key: value for key, value in after.items()
+        if key not in MERGED_KEYS and value is not before.get(key)
+    }
+
+    old_responses = before.get("intermediate_responses") or {}
+    responses = {
+        agent: response for agent, response in after["intermediate_responses"].items()
+        if old_responses.get(agent) is not response
+    }
+    if responses:
+        update["intermediate_responses"] = responses
+
+    if after["tool_calls_log"]:
+        update["tool_calls_log"] = after["tool_calls_log"]
+
+    old_metadata = before.get("metadata") or {}
+    metadata = {
+        key: value for key, value in after["metadata"].items()
+        if old_metadata.get(key) is not value
+    }
+    if metadata:
+        update["metadata"] = metadata
+
+    return update
+
+
+def _private_state(state: AgentState) -> dict:
+    """Copy state so the node gets its own merged containers
+
+    Args:
+        state: State passed by LangGraph
+
+    Returns:
+        Shallow copy with fresh intermediate_responses, tool_calls_log and metadata
+    """
+    local_state = dict(state)
+    local_state["intermediate_responses"] = dict(state.get("intermediate_responses") or {})
+    local_state["tool_calls_log"] = []
+    local_state["metadata"] = dict(state.get("metadata") or {})
+    return local_state
+
+
+def _timed_update(state: AgentState, result: AgentState, name: str, elapsed: float) -> dict:
+    """Diff node result and record node execution time in metadata["node_timings"]"""
+    update = _diff_state(state, result)
+    update.setdefault("metadata", {})["node_timings"] = {name: elapsed}
+    return update
+
+
+def as_state_update(node: Callable[[AgentState], AgentState], name: Optional[str] = None) -> Callable[[AgentState], dict]:
+    """Adapt agent node to return partial state update
+
+    Agents mutate and return the whole state. When several agents run in the
+    same step, LangGraph needs only their contributions, so the node works on
+    private copies of the merged containers and the wrapper returns the diff.
+    Node execution time (seconds) is added to metadata["node_timings"].
+
+    Args:
+        node: Agent node function
+        name: Node name for timings (defaults to function name)
+
+    Returns:
+        Node function returning partial state update
+    """
+    name = name or node.__name__
+
+    @wraps(node)
+    def wrapper(state: AgentState) -> dict:
+        start = time.perf_counter()
+        result = node(_private_state(state))
+        return _timed_update(state, result, name, time.perf_counter() - start)
+
+    return wrapper
+
+
+def as_async_state_update(node: Callable[[AgentState], Awaitable[AgentState]],
+                          name: Optional[str] = None) -> Callable[[AgentState], Awaitable[dict]]:
+    """Async counterpart of as_state_update
+
+    Args:
+        node: Async agent node function
+        name: Node name for timings (defaults to function name)
+
+    Returns:
+        Async node function returning partial state update
+    """
+    name = name or node.__name__
+
+    @wraps(node)
+    async def wrapper(state: AgentState) -> dict:
+        start = time.perf_counter()
+        result = await node(_private_state(state))
+        return _timed_update(state, result, name, time.perf_counter() - start)
+
+    return wrapper
+
+
+def _agent_node(name: str, node: Callable, anode: Callable) -> RunnableLambda:
+    """Build graph node usable from both graph.invoke and graph.ainvoke
+
+    Args:
+        name: Node name
+        node: Sync agent node
+        anode: Async agent node
+
+    Returns:
+        Runnable with sync and async implementations
+    """
+    return RunnableLambda(as_state_update(node, name), afunc=as_async_state_update(anode, name), name=name)
 
 
 def route_after_classification(state: AgentState) -> str:
@@ -25,15 +166,7 @@ def route_after_classification(state: AgentState) -> str:
     # Get first agent to execute
     first_agent = classified_agents[0]
 
-    # Mapping to node names
-    agent_to_node = {
-        "research_specialist": "research_specialist",
-        "coding_helper": "coding_helper",
-        "planner": "planner",
-        "supervisor": "supervisor"
-    }
-
-    return agent_to_node.get(first_agent, "supervisor")
+    return AGENT_TO_NODE.get(first_agent, "supervisor")
 
 
 def route_to_next_agent(state: AgentState) -> str:
@@ -47,86 +180,108 @@ def route_to_next_agent(state: AgentState) -> str:
     """
     classified_agents = state.get('classified_agents', [])
     intermediate_responses = state.get('intermediate_responses', {})
-    
-    # Agent-to-node mapping
-    agent_to_node = {
-        "research_specialist": "research_specialist",
-        "coding_helper": "coding_helper",
-        "planner": "planner",
-        "supervisor": "supervisor"
-    }
 
     # Find first agent that hasn't been executed yet (no response in intermediate_responses)
     for agent in classified_agents:
-        if agent not in intermediate_responses and agent in agent_to_node:
-            return agent_to_node[agent]
+        if agent not in intermediate_responses and agent in AGENT_TO_NODE:
+            return AGENT_TO_NODE[agent]
 
     # All agents executed (all have responses), route to supervisor
     return "supervisor"
 
 
-def create_workflow() -> StateGraph:
+def route_to_specialists(state: AgentState) -> List[str]:
+    """Fan-out routing - selects all classified specialists to run in parallel
+
+    Args:
+        state: Current state with classification results
+
+    Returns:
+        Names of specialist nodes, or supervisor if no specialist was selected
+    """
+    nodes = []
+    for agent in state.get('classified_agents', []):
+        node = AGENT_TO_NODE.get(agent)
+        if node in SPECIALIST_NODES and node not in nodes:
+            nodes.append(node)
+
+    return nodes or ["supervisor"]
+
+
+def next_nodes(state: AgentState, node: str, parallel: Optional[bool] = None) -> List[str]:
+    """Nodes the workflow runs after given node (used for progress events)
+
+    Args:
+        state: State after node execution
+        node: Name of finished node
+        parallel: Fan-out mode (defaults to PARALLEL_AGENTS)
+
+    Returns:
+        List of next node names
+    """
+    if parallel is None:
+        parallel = PARALLEL_AGENTS
+
+    if node == "router":
+        return route_to_specialists(state) if parallel else [route_after_classification(state)]
+    if node in SPECIALIST_NODES:
+        return ["supervisor"] if parallel else [route_to_next_agent(state)]
+    return []
+
+
+def create_workflow(parallel: Optional[bool] = None) -> StateGraph:
     """Creates and compiles LangGraph workflow
 
+    Args:
+        parallel: Run classified specialists concurrently (defaults to PARALLEL_AGENTS)
+
     Returns:
         Compiled workflow graph
     """
+    if parallel is None:
+        parallel = PARALLEL_AGENTS
+
     # Create graph with typed state
     workflow = StateGraph(AgentState)
 
     # Add nodes (Agents)
-    workflow.add_node("router", router_node)
-    workflow.add_node("research_specialist", research_specialist_node)
-    workflow.add_node("coding_helper", coding_helper_node)
-    workflow.add_node("planner", planner_node)
-    workflow.add_node("supervisor", supervisor_node)
+    # (each node has sync and async implementation - for invoke and ainvoke)
+    workflow.add_node("router", _agent_node("router", router_node, arouter_node))
+    workflow.add_node("research_specialist", _agent_node(
+        "research_specialist", research_specialist_node, aresearch_specialist_node))
+    workflow.add_node("coding_helper", _agent_node("coding_helper", coding_helper_node, acoding_helper_node))
+    workflow.add_node("planner", _agent_node("planner", planner_node, aplanner_node))
+    workflow.add_node("supervisor", _agent_node("supervisor", supervisor_node, asupervisor_node))
 
     # Set entry point - everything starts with Router
     workflow.set_entry_point("router")
 
-    # Conditional routing after Router
-    workflow.add_conditional_edges(
-        "router",
-        route_after_classification,
-        {
-            "research_specialist": "research_specialist",
-            "coding_helper": "coding_helper",
-            "planner": "planner",
-            "supervisor": "supervisor"
-        }
-    )
-
-    # After each specialized agent -> route to next agent or supervisor
-    workflow.add_conditional_edges(
-        "research_specialist",
-        route_to_next_agent,
-        {
-            "research_specialist": "research_specialist",
-            "coding_helper": "coding_helper",
-            "planner": "planner",
-            "supervisor": "supervisor"
-        }
-    )
-    workflow.add_conditional_edges(
-        "coding_helper",
-        route_to_next_agent,
-        {
-            "research_specialist": "research_specialist",
-            "coding_helper": "coding_helper",
-            "planner": "planner",
-            "supervisor": "supervisor"
-        }
-    )
-    workflow.add_conditional_edges(
-        "planner",
-        route_to_next_agent,
-        {
-            "research_specialist": "research_specialist",
-            "coding_helper": "coding_helper",
-            "planner": "planner",
-            "supervisor": "supervisor"
-        }
-    )
+    if parallel:
+        # Fan-out: all classified specialists run in the same step
+        workflow.add_conditional_edges(
+            "router",
+            route_to_specialists,
+            AGENT_TO_NODE
+        )
+
+        # Fan-in: Supervisor starts once every started specialist has answered
+        for node in SPECIALIST_NODES:
+            workflow.add_edge(node, "supervisor")
+    else:
+        # Conditional routing after Router
+        workflow.add_conditional_edges(
+            "router",
+            route_after_classification,
+            AGENT_TO_NODE
+        )
+
+        # After each specialized agent -> route to next agent or supervisor
+        for node in SPECIALIST_NODES:
+            workflow.add_conditional_edges(
+                node,
+                route_to_next_agent,
+                AGENT_TO_NODE
+            )
 
     # Supervisor -> END (completion)
     workflow.add_edge("supervisor", END)
@@ -155,4 +310,3 @@ def reset_graph():
     """Reset singleton instance (for testing)"""
     global _graph_instance
     _graph_instance = None
-
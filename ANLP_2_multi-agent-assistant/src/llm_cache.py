@@ -0,0 +1,174 @@
+# Persistent LLM response cache (SQLite) for the shared chat model
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import warnings
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Sequence
+
+from langchain_core._api import LangChainBetaWarning
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+# dumps()/loads() warn about their beta status on every call
+warnings.filterwarnings("ignore", message=r"The function `(dumps|loads)` is in beta", category=LangChainBetaWarning)
+
+
+class SQLiteLLMCache(BaseCache):
+    """LangChain cache backed by SQLite with size-based LRU eviction
+
+    Entries are keyed by a hash of the model string (model name and
+    generation parameters, as built by LangChain) and the serialized
+    message list. Pass the instance as `cache=` to a chat model.
+    """
+
+    def __init__(self, path: str = ".llm_cache.sqlite", max_bytes: int = 256 * 1024 * 1024):
+        """Open (or create) cache database
+
+        Args:
+            path: SQLite database file
+            max_bytes: Maximum total size of cached responses
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Context variable - LangGraph copies the context into node threads and tasks
+        self._bypass = ContextVar(f"llm_cache_bypass_{id(self)}", default=False)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at)")
+        self._total_bytes = self._query_total_bytes()
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        """Hash model string and prompt into cache key"""
+        return hashlib.sha256(f"{llm_string}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def _query_total_bytes(self) -> int:
+        """Total size of stored responses"""
+        with self._lock:
+            row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        return row[0]
+
+    @property
+    def bypassed(self) -> bool:
+        """Whether cache is bypassed in the current context"""
+        return self._bypass.get()
+
+    @contextmanager
+    def bypass(self):
+        """Context manager - skip cache lookups and writes in the current context
+
+        Covers graph nodes started inside the block (including parallel
+        specialists) but not concurrent requests of other tasks.
+        """
+        token = self._bypass.set(True)
+        try:
+            yield
+        finally:
+            self._bypass.reset(token)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        """Look up cached generations
+
+        Args:
+            prompt: Serialized messages
+            llm_string: Serialized model name and parameters
+
+        Returns:
+            Cached generations or None
+        """
+        if self.bypassed:
+            return None
+
+        key = self._key(prompt, llm_string)
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            with self._conn:
+                self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+
+        try:
+            return [loads(item, allowed_objects="core") for item in json.loads(row[0])]
+        except Exception:
+            # Entry written by an incompatible LangChain version
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        """Store generations and evict least recently used entries over the size limit
+
+        Args:
+            prompt: Serialized messages
+            llm_string: Serialized model name and parameters
+            return_val: Generations returned by the model
+        """
+        if self.bypassed:
+            return
+
+        key = self._key(prompt, llm_string)
+        value = json.dumps([dumps(generation) for generation in return_val])
+        size = len(value.encode("utf-8"))
+        now = time.time()
+
+        with self._lock, self._conn:
+            old = self._conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until cache fits into 90% of max_bytes (lock held)"""
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute("SELECT key, size FROM llm_cache ORDER BY accessed_at").fetchall()
+        expired = []
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            expired.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", expired)
+
+    def clear(self, **kwargs) -> None:
+        """Remove all cached responses and reset statistics"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Get cache statistics
+
+        Returns:
+            Dictionary with hits, misses, hit_rate, entries and size
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "entries": entries,
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
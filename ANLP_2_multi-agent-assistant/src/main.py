@@ -1,33 +1,33 @@
 # Entry point - launching multi-agent system
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
-from src.models import AgentState, SessionMemory
-from src.graph.workflow import get_graph
-from src.tools.memory_manager import MemoryManager
+from typing import Iterator, Optional
+from src.models import AgentState, merge_dicts
+from src.graph.workflow import get_graph, next_nodes, SPECIALIST_NODES
+from src.agents.router import classify_batch
+from src.tools.memory_manager import MemoryManager, get_session_pool
 
 
-def run_query(user_input: str, session_id: str = "default", verbose: bool = False) -> dict:
-    """Main function - runs query through multi-agent system
+def _initial_state(user_input: str, session_id: str, memory_manager: MemoryManager,
+                   routing_info: Optional[dict] = None) -> AgentState:
+    """Prepare initial graph state
 
     Args:
         user_input: User query
-        session_id: Session identifier for memory
-        verbose: Output detailed information about process
+        session_id: Session identifier
+        memory_manager: Manager of the loaded session memory
+        routing_info: Routing decided in advance (Router node then skips classification)
 
     Returns:
-        Dictionary with query processing results
+        Initial AgentState
     """
-    # Initialize session memory
-    memory_manager = MemoryManager(session_id)
-    session_memory = memory_manager.memory
-
-    # Prepare initial state
-    initial_state: AgentState = {
+    state = {
         "user_input": user_input,
         "classification": None,
         "classified_agents": [],
         "intermediate_responses": {},
-        "memory": session_memory,
+        "memory_manager": memory_manager,
         "final_answer": "",
         "tool_calls_log": [],
         "metadata": {
@@ -35,32 +35,22 @@ def run_query(user_input: str, session_id: str = "default", verbose: bool = Fals
             "start_time": datetime.now().isoformat()
         }
     }
-    
-    if verbose:
-        print(f"\n{'='*60}")
-        print(f"🚀 Starting query: {user_input[:50]}...")
-        print(f"📍 Session ID: {session_id}")
-        print(f"{'='*60}\n")
+    if routing_info:
+        state["metadata"]["routing_info"] = routing_info
+    return state
 
-    # Get graph and run
-    graph = get_graph()
-    result_state = graph.invoke(initial_state)
 
-    # Add completion time
-    result_state["metadata"]["end_time"] = datetime.now().isoformat()
+def _build_result(user_input: str, session_id: str, result_state: AgentState) -> dict:
+    """Form query result from final graph state
 
-    # Save query to memory
-    memory_manager.add_query(user_input, agent_route=result_state.get('classification'))
-    
-    if verbose:
-        print(f"\n{'='*60}")
-        print(f"✅ Query processed")
-        print(f"📊 Classification: {result_state.get('classification')}")
-        print(f"🤖 Agents: {result_state.get('classified_agents')}")
-        print(f"🔧 Tool calls: {len(result_state.get('tool_calls_log', []))}")
-        print(f"{'='*60}\n")
+    Args:
+        user_input: User query
+        session_id: Session identifier
+        result_state: Final graph state
 
-    # Form result
+    Returns:
+        Dictionary with query processing results
+    """
     return {
         "question": user_input,
         "classification": result_state.get('classification'),
@@ -73,6 +63,243 @@ def run_query(user_input: str, session_id: str = "default", verbose: bool = Fals
     }
 
 
+def _apply_update(state: AgentState, update: dict) -> None:
+    """Apply partial node update to state (same merge rules as AgentState reducers)
+
+    Args:
+        state: State to update in place
+        update: Partial update returned by a node
+    """
+    for key, value in (update or {}).items():
+        if key == "tool_calls_log":
+            state[key] = state.get(key, []) + value
+        elif key in ("intermediate_responses", "metadata"):
+            state[key] = merge_dicts(state.get(key), value)
+        else:
+            state[key] = value
+
+
+def _print_start(user_input: str, session_id: str) -> None:
+    """Print query start banner (verbose mode)"""
+    print(f"\n{'='*60}")
+    print(f"🚀 Starting query: {user_input[:50]}...")
+    print(f"📍 Session ID: {session_id}")
+    print(f"{'='*60}\n")
+
+
+def _print_summary(result_state: AgentState) -> None:
+    """Print query processing summary (verbose mode)"""
+    print(f"\n{'='*60}")
+    print(f"✅ Query processed")
+    print(f"📊 Classification: {result_state.get('classification')}")
+    print(f"🤖 Agents: {result_state.get('classified_agents')}")
+    print(f"🔧 Tool calls: {len(result_state.get('tool_calls_log', []))}")
+    print(f"{'='*60}\n")
+
+
+def run_query(user_input: str, session_id: str = "default", verbose: bool = False) -> dict:
+    """Main function - runs query through multi-agent system
+
+    Args:
+        user_input: User query
+        session_id: Session identifier for memory
+        verbose: Output detailed information about process
+
+    Returns:
+        Dictionary with query processing results
+    """
+    return _run_query(user_input, session_id, verbose)
+
+
+def _run_query(user_input: str, session_id: str, verbose: bool = False,
+               routing_info: Optional[dict] = None) -> dict:
+    """Run one query through the graph (optionally with routing decided in advance)
+
+    Args:
+        user_input: User query
+        session_id: Session identifier for memory
+        verbose: Output detailed information about process
+        routing_info: Preset routing from classify_batch
+
+    Returns:
+        Dictionary with query processing results
+    """
+    # Session memory (kept loaded between queries by the session pool)
+    memory_manager = get_session_pool().get(session_id)
+
+    # Prepare initial state
+    initial_state = _initial_state(user_input, session_id, memory_manager, routing_info)
+
+    if verbose:
+        _print_start(user_input, session_id)
+
+    # Get graph and run
+    graph = get_graph()
+    result_state = graph.invoke(initial_state)
+
+    # Add completion time
+    result_state["metadata"]["end_time"] = datetime.now().isoformat()
+
+    # Save query to memory
+    memory_manager.add_query(user_input, agent_route=result_state.get('classification'),
+                             answer=result_state.get('final_answer'))
+
+    if verbose:
+        _print_summary(result_state)
+
+    # Form result
+    return _build_result(user_input, session_id, result_state)
+
+
+def run_queries(inputs: list, max_concurrency: int = 4, session_id: str = "default") -> list:
+    """Batch API - processes many queries with a bounded worker pool
+
+    Router classifications that need the LLM are sent in one llm.batch call.
+    Queries of the same session run in input order on one worker, so each
+    query sees the memory written by the previous one; different sessions
+    run concurrently.
+
+    Args:
+        inputs: List of query strings or dicts {"query": str, "session_id": str}
+        max_concurrency: Maximum number of queries processed at the same time
+        session_id: Session for inputs without explicit session_id
+
+    Returns:
+        List of run_query results in input order; failed items are
+        {"question", "session_id", "error"}
+    """
+    items = [
+        (item, session_id) if isinstance(item, str)
+        else (item["query"], item.get("session_id", session_id))
+        for item in inputs
+    ]
+    results = [None] * len(items)
+
+    # Group router classifications into one batch
+    try:
+        routings = classify_batch([query for query, _ in items], max_concurrency=max_concurrency)
+    except Exception:
+        routings = [None] * len(items)
+
+    # Per-session queues keep session order
+    sessions = {}
+    for i, (_, item_session) in enumerate(items):
+        sessions.setdefault(item_session, []).append(i)
+
+    def run_session(indices: list) -> None:
+        for i in indices:
+            query, item_session = items[i]
+            try:
+                results[i] = _run_query(query, item_session, routing_info=routings[i])
+            except Exception as e:
+                results[i] = {"question": query, "session_id": item_session, "error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as pool:
+        list(pool.map(run_session, sessions.values()))
+
+    return results
+
+
+async def arun_query(user_input: str, session_id: str = "default", verbose: bool = False) -> dict:
+    """Async version of run_query - runs graph with graph.ainvoke
+
+    LLM calls are awaited and memory file I/O runs in worker threads,
+    so one event loop can serve many concurrent sessions.
+
+    Args:
+        user_input: User query
+        session_id: Session identifier for memory
+        verbose: Output detailed information about process
+
+    Returns:
+        Dictionary with query processing results
+    """
+    memory_manager = await asyncio.to_thread(get_session_pool().get, session_id)
+    initial_state = _initial_state(user_input, session_id, memory_manager)
+
+    if verbose:
+        _print_start(user_input, session_id)
+
+    graph = get_graph()
+    result_state = await graph.ainvoke(initial_state)
+
+    result_state["metadata"]["end_time"] = datetime.now().isoformat()
+
+    await asyncio.to_thread(
+        memory_manager.add_query, user_input, agent_route=result_state.get('classification'),
+        answer=result_state.get('final_answer')
+    )
+
+    if verbose:
+        _print_summary(result_state)
+
+    return _build_result(user_input, session_id, result_state)
+
+
+def stream_query(user_input: str, session_id: str = "default") -> Iterator[dict]:
+    """Streaming version of run_query - yields progress events as they happen
+
+    Events (dictionaries with "type" key), in order:
+        routing          - classification, agents, source
+        agent_started    - agent (one per specialist)
+        agent_finished   - agent, response
+        token            - content (Supervisor answer chunk; a pass-through
+                           or LLM-cached answer arrives as a single chunk)
+        final            - result (same dictionary as run_query returns)
+
+    Args:
+        user_input: User query
+        session_id: Session identifier for memory
+
+    Yields:
+        Event dictionaries
+    """
+    memory_manager = get_session_pool().get(session_id)
+    state = _initial_state(user_input, session_id, memory_manager)
+    started = set()
+    streamed_tokens = False
+
+    graph = get_graph()
+    for mode, payload in graph.stream(state, stream_mode=["updates", "messages"]):
+        if mode == "messages":
+            chunk, chunk_metadata = payload
+            if chunk_metadata.get("langgraph_node") == "supervisor" and chunk.content:
+                streamed_tokens = True
+                yield {"type": "token", "content": chunk.content}
+            continue
+
+        for node, update in payload.items():
+            _apply_update(state, update)
+
+            if node == "router":
+                yield {
+                    "type": "routing",
+                    "classification": state.get('classification'),
+                    "agents": state.get('classified_agents', []),
+                    "source": state["metadata"].get("routing_info", {}).get("source")
+                }
+            elif node in SPECIALIST_NODES:
+                yield {
+                    "type": "agent_finished",
+                    "agent": node,
+                    "response": state['intermediate_responses'].get(node, "")
+                }
+
+            for next_node in next_nodes(state, node):
+                if next_node in SPECIALIST_NODES and next_node not in started:
+                    started.add(next_node)
+                    yield {"type": "agent_started", "agent": next_node}
+
+    # Pass-through answers are not generated by the LLM - send them as one chunk
+    if not streamed_tokens and state.get('final_answer'):
+        yield {"type": "token", "content": state['final_answer']}
+
+    state["metadata"]["end_time"] = datetime.now().isoformat()
+    memory_manager.add_query(user_input, agent_route=state.get('classification'), answer=state.get('final_answer'))
+
+    yield {"type": "final", "result": _build_result(user_input, session_id, state)}
+
+
 def interactive_mode():
     """Launch interactive mode for testing"""
     print("\n" + "="*60)
@@ -82,7 +309,7 @@ def interactive_mode():
     print("Commands: 'history' - show history, 'clear' - clear\n")
     
     session_id = f"interactive_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-    memory_manager = MemoryManager(session_id)
+    memory_manager = get_session_pool().get(session_id)
     
     while True:
         try:
@@ -105,14 +332,30 @@ def interactive_mode():
                 print("🗑️ History cleared")
                 continue
 
-            # Process query
-            result = run_query(user_input, session_id=session_id, verbose=True)
-            
-            print(f"\n{'─'*60}")
-            print(f"📋 Classification: {result['classification']}")
-            print(f"🤖 Agents: {', '.join(result['agents_involved'])}")
-            print(f"{'─'*60}")
-            print(f"\n📝 Answer:\n{result['final_answer']}")
+            # Process query - print Supervisor tokens as they arrive
+            result = None
+            printed_answer_header = False
+            for event in stream_query(user_input, session_id=session_id):
+                if event["type"] == "routing":
+                    print(f"\n{'─'*60}")
+                    print(f"📋 Classification: {event['classification']}")
+                    print(f"🤖 Agents: {', '.join(event['agents'])}")
+                    print(f"{'─'*60}")
+                elif event["type"] == "agent_started":
+                    print(f"⏳ {event['agent']} is working...")
+                elif event["type"] == "agent_finished":
+                    print(f"✔️ {event['agent']} finished")
+                elif event["type"] == "token":
+                    if not printed_answer_header:
+                        print("\n📝 Answer:")
+                        printed_answer_header = True
+                    print(event["content"], end="", flush=True)
+                elif event["type"] == "final":
+                    result = event["result"]
+            print()
+
+            if not printed_answer_header:
+                print(f"\n📝 Answer:\n{result['final_answer']}")
 
             if result['tool_calls']:
                 print(f"\n🔧 Tools used ({len(result['tool_calls'])}):")
@@ -1,6 +1,9 @@
 # State definition for LangGraph
-from typing import TypedDict, List, Optional, Any
-from pydantic import BaseModel
+import operator
+from collections import deque
+from itertools import islice
+from typing import TypedDict, List, Optional, Any, Annotated
+from pydantic import BaseModel, PrivateAttr
 
 
 class Query(BaseModel):
@@ -8,6 +11,7 @@ class Query(BaseModel):
     text: str
     timestamp: str
     agent_route: Optional[str] = None
+    answer: Optional[str] = None  # final answer (truncated), used for history recall
 
 
 class SessionMemory(BaseModel):
@@ -16,6 +20,160 @@ class SessionMemory(BaseModel):
     queries: List[Query] = []
     user_profile: dict = {}
     notes: List[str] = []
+    # Aggregates of older queries/notes folded away by the retention policy (see trim)
+    archived_queries: int = 0
+    archived_routes: dict = {}  # agent_route ("unknown" if none) -> archived query count
+    archived_notes: int = 0
+    # Older stored queries not loaded with the session (see MemoryStore.load_versioned);
+    # they are counted in archived_queries/archived_routes until loaded
+    unloaded_queries: int = 0
+
+    # Indexes over queries, built on first use and kept in sync by add_query/trim:
+    # agent_route -> deque of its queries (oldest first), and HistoryIndex of query turns
+    _route_index: Any = PrivateAttr(default=None)
+    _history_index: Any = PrivateAttr(default=None)
+    _indexed_queries: Any = PrivateAttr(default=None)
+    _indexed_count: int = PrivateAttr(default=0)
+
+    def add_query(self, query: Query) -> None:
+        """Append query and update the indexes
+
+        Args:
+            query: Query to append
+        """
+        self._check_indexes()
+        self.queries.append(query)
+        self._indexed_count += 1
+        if self._route_index is not None:
+            self._route_index.setdefault(query.agent_route, deque()).append(query)
+        if self._history_index is not None:
+            from src.tools.history_index import turn_text
+            self._history_index.add(turn_text(query.text, query.answer))
+
+    def recent_queries(self, n: int, agent_route: Optional[str] = None) -> list:
+        """Last n queries (optionally of one agent), oldest first - O(n) via the route index
+
+        Args:
+            n: Maximum number of queries
+            agent_route: Only queries processed by this agent
+
+        Returns:
+            List of Query
+        """
+        if n <= 0:
+            return []
+        if agent_route is None:
+            return self.queries[-n:]
+        route_queries = self._routes().get(agent_route)
+        if not route_queries:
+            return []
+        return list(islice(reversed(route_queries), n))[::-1]
+
+    def similar_queries(self, text: str, top_k: int = 3, min_score: float = 0.1) -> list:
+        """Past queries most similar to text (query and answer n-grams, cosine similarity)
+
+        Args:
+            text: Text to compare with (usually the current query)
+            top_k: Maximum number of results
+            min_score: Minimum similarity to include
+
+        Returns:
+            List of (Query, score) sorted by score descending
+        """
+        self._check_indexes()
+        if self._history_index is None:
+            from src.tools.history_index import HistoryIndex, turn_text
+            self._history_index = HistoryIndex()
+            for query in self.queries:
+                self._history_index.add(turn_text(query.text, query.answer))
+        return [(self.queries[turn], score) for turn, score in self._history_index.search(text, top_k, min_score)]
+
+    def route_counts(self) -> dict:
+        """Number of queries per route, including archived ones
+
+        Returns:
+            Dictionary agent_route ("unknown" if none) -> count
+        """
+        counts = dict(self.archived_routes)
+        for route, route_queries in self._routes().items():
+            if route_queries:
+                key = route or "unknown"
+                counts[key] = counts.get(key, 0) + len(route_queries)
+        return counts
+
+    def trim(self, max_queries: int = 0, max_notes: int = 0) -> None:
+        """Keep the newest queries/notes and fold older ones into the archive aggregates
+
+        Args:
+            max_queries: Queries to keep (0 - unlimited)
+            max_notes: Notes to keep (0 - unlimited)
+        """
+        if max_queries > 0 and self.unloaded_queries:
+            # The store drops its oldest rows first - unloaded ones are already counted as archived
+            stored = self.unloaded_queries + len(self.queries)
+            self.unloaded_queries -= min(self.unloaded_queries, max(0, stored - max_queries))
+
+        drop = len(self.queries) - max_queries
+        if max_queries > 0 and drop > 0:
+            self._check_indexes()
+            routes = dict(self.archived_routes)
+            for query in self.queries[:drop]:
+                key = query.agent_route or "unknown"
+                routes[key] = routes.get(key, 0) + 1
+                if self._route_index is not None:
+                    # Dropped queries are the oldest of their route
+                    self._route_index[query.agent_route].popleft()
+            if self._history_index is not None:
+                self._history_index.drop_oldest(drop)
+            del self.queries[:drop]
+            self._indexed_count = len(self.queries)
+            self.archived_routes = routes
+            self.archived_queries += drop
+
+        drop = len(self.notes) - max_notes
+        if max_notes > 0 and drop > 0:
+            del self.notes[:drop]
+            self.archived_notes += drop
+
+    def _check_indexes(self) -> None:
+        """Drop indexes that no longer cover queries (list replaced or edited directly)"""
+        if self._indexed_queries is not self.queries or self._indexed_count != len(self.queries):
+            self._route_index = None
+            self._history_index = None
+            self._indexed_queries = self.queries
+            self._indexed_count = len(self.queries)
+
+    def _routes(self) -> dict:
+        """Route index (built on first use)"""
+        self._check_indexes()
+        if self._route_index is None:
+            index = {}
+            for query in self.queries:
+                index.setdefault(query.agent_route, deque()).append(query)
+            self._route_index = index
+        return self._route_index
+
+
+def merge_dicts(left: dict, right: dict) -> dict:
+    """State reducer - merges partial dict updates from (parallel) nodes
+
+    Nested dictionaries are merged recursively, so parallel nodes can
+    add their own keys to e.g. metadata["node_timings"].
+
+    Args:
+        left: Current channel value
+        right: Update written by a node
+
+    Returns:
+        New dictionary with keys from right taking priority
+    """
+    merged = dict(left or {})
+    for key, value in (right or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_dicts(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
 
 
 class AgentState(TypedDict):
@@ -23,9 +181,8 @@ class AgentState(TypedDict):
     user_input: str
     classification: Optional[str]  # research|coding|planning|general
     classified_agents: List[str]
-    intermediate_responses: dict  # {agent_name: response}
-    memory: Any  # SessionMemory (use Any for TypedDict compatibility)
+    intermediate_responses: Annotated[dict, merge_dicts]  # {agent_name: response}
+    memory_manager: Any  # MemoryManager of the session (use Any for TypedDict compatibility) - locked memory access
     final_answer: str
-    tool_calls_log: List[dict]
-    metadata: dict  # timestamps, routing info, etc.
-
+    tool_calls_log: Annotated[List[dict], operator.add]
+    metadata: Annotated[dict, merge_dicts]  # timestamps, routing info, etc.
@@ -0,0 +1,243 @@
+# Offline LLM backend - deterministic stub answers with simulated latency
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+# Latency profiles: time to first token (lognormal mean/std, seconds) and streaming rate
+LATENCY_PROFILES = {
+    "instant": {"latency_mean": 0.0, "latency_std": 0.0, "tokens_per_second": 0.0},
+    "fast": {"latency_mean": 0.05, "latency_std": 0.02, "tokens_per_second": 400.0},
+    "realistic": {"latency_mean": 0.6, "latency_std": 0.3, "tokens_per_second": 50.0},
+    "slow": {"latency_mean": 2.0, "latency_std": 1.0, "tokens_per_second": 15.0},
+}
+
+
+class OfflineLLMError(RuntimeError):
+    """Injected backend failure (simulates timeouts / 5xx from the endpoint)"""
+
+
+def _agent_of(system_prompt: str) -> str:
+    """Detect which agent prompt is being answered
+
+    Args:
+        system_prompt: System message content
+
+    Returns:
+        Agent name
+    """
+    markers = {
+        "You are Router Agent": "router",
+        "You are Research Specialist": "research_specialist",
+        "You are Coding Helper": "coding_helper",
+        "You are Planning Agent": "planner",
+    }
+    for marker, agent in markers.items():
+        if marker in system_prompt:
+            return agent
+    return "supervisor"
+
+
+def _router_answer(query: str) -> str:
+    """Valid Router JSON for the query (local classifier decides)"""
+    # Imported lazily - src.tools imports modules that may import src.config
+    from src.tools.query_classifier import classify_query
+
+    result = classify_query(query)
+    return json.dumps({"classification": result["classification"], "agents": result["agents"]})
+
+
+def _canned_answer(agent: str, query: str, system_prompt: str) -> str:
+    """Deterministic text answer for a specialist or the Supervisor
+
+    Args:
+        agent: Agent name
+        query: User message content
+        system_prompt: System message content
+
+    Returns:
+        Answer text
+    """
+    topic = query.split(":", 1)[-1].strip().splitlines()[0][:120] if query.strip() else "the question"
+
+    if agent == "research_specialist":
+        kb_note = ("The knowledge base provided relevant context."
+                   if "Found in knowledge base" in system_prompt
+                   else "No knowledge base entries matched, so this answer is based on general knowledge.")
+        return (
+            f"## Overview\n\n{topic} is best understood by looking at its components, "
+            f"how they interact and the trade-offs involved.\n\n"
+            f"## Key Points\n\n1. Definition and purpose\n2. Typical patterns and examples\n"
+            f"3. Advantages and limitations\n\n{kb_note}"
+        )
+    if agent == "coding_helper":
+        return (
+            f"Here is a solution for: {topic}\n\n"
+            "```python\ndef solve(data: list) -> list:\n"
+            "    \"\"\"Process input data\"\"\"\n"
+            "    return [item for item in data if item is not None]\n```\n\n"
+            "The function filters missing values with a list comprehension. "
+            "Add type checks and logging for production use."
+        )
+    if agent == "planner":
+        return (
+            f"### 🎯 Goal Understanding\n{topic}\n\n"
+            "### 📋 Action Plan\n1. **Step 1**: Gather requirements\n"
+            "   - Success criterion: requirements document approved\n"
+            "   - Time estimate: 2 days\n"
+            "2. **Step 2**: Design and implement\n"
+            "   - Success criterion: working prototype\n"
+            "   - Time estimate: 1 week\n\n"
+            "### ⚠️ Risks and Recommendations\nScope creep - fix the scope early.\n\n"
+            "### ✅ Completion Criteria\nAll steps delivered and reviewed."
+        )
+    # Supervisor - user query is embedded in the system prompt
+    match = re.search(r"(?:## Original User query:|Query:)\s*(.+)", system_prompt)
+    user_query = match.group(1).strip()[:120] if match else topic
+    sections = len(re.findall(r"^### ", system_prompt, re.MULTILINE))
+    return (
+        f"## Answer\n\nCombined answer to \"{user_query}\" based on "
+        f"{sections or 'no'} specialist contribution(s).\n\n"
+        "**Summary:** the key points above answer the question."
+    )
+
+
+class OfflineChatModel(BaseChatModel):
+    """Local stub chat model for benchmarks, load tests and offline demos
+
+    Answers every agent prompt deterministically (valid JSON for the Router,
+    canned text for specialists and Supervisor) and simulates latency,
+    streaming rate and random failures.
+    """
+
+    profile: str = "realistic"
+    latency_mean: Optional[float] = None  # seconds, overrides profile
+    latency_std: Optional[float] = None
+    tokens_per_second: Optional[float] = None
+    error_rate: float = 0.0
+    seed: Optional[int] = None
+
+    _rng: Any = PrivateAttr(default=None)
+    _rng_lock: Any = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        """Initialize random generator for latency and error sampling"""
+        super().model_post_init(__context)
+        self._rng = random.Random(self.seed)
+        self._rng_lock = threading.Lock()
+
+    @property
+    def _llm_type(self) -> str:
+        return "offline-stub"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"profile": self.profile, "error_rate": self.error_rate}
+
+    def _setting(self, name: str) -> float:
+        """Explicit setting or value from latency profile"""
+        value = getattr(self, name)
+        return value if value is not None else LATENCY_PROFILES[self.profile][name]
+
+    def _sample_latency(self) -> float:
+        """Sample time to first token from lognormal distribution
+
+        Returns:
+            Latency in seconds
+        """
+        mean = self._setting("latency_mean")
+        std = self._setting("latency_std")
+        if mean <= 0:
+            return 0.0
+        sigma2 = math.log(1 + (std / mean) ** 2)
+        with self._rng_lock:
+            return self._rng.lognormvariate(math.log(mean) - sigma2 / 2, math.sqrt(sigma2))
+
+    def _maybe_fail(self) -> None:
+        """Raise injected error with probability error_rate"""
+        if self.error_rate > 0:
+            with self._rng_lock:
+                failed = self._rng.random() < self.error_rate
+            if failed:
+                raise OfflineLLMError("Injected offline LLM failure")
+
+    def _token_delay(self) -> float:
+        """Delay between streamed tokens"""
+        rate = self._setting("tokens_per_second")
+        return 1.0 / rate if rate > 0 else 0.0
+
+    @staticmethod
+    def _answer(messages: List[BaseMessage]) -> str:
+        """Deterministic answer for the message list"""
+        system_prompt = "\n".join(str(m.content) for m in messages if m.type == "system")
+        query = "\n".join(str(m.content) for m in messages if m.type == "human")
+
+        agent = _agent_of(system_prompt)
+        if agent == "router":
+            return _router_answer(query.split("Classify this query:", 1)[-1].strip())
+        return _canned_answer(agent, query, system_prompt)
+
+    @staticmethod
+    def _tokens(text: str) -> List[str]:
+        """Split answer into stream tokens (words with trailing whitespace)"""
+        return re.findall(r"\S+\s*|\s+", text)
+
+    @staticmethod
+    def _message_id(messages: List[BaseMessage]) -> str:
+        """Stable response id derived from prompt"""
+        digest = hashlib.sha1("".join(str(m.content) for m in messages).encode("utf-8")).hexdigest()
+        return f"offline-{digest[:12]}"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        text = self._answer(messages)
+        time.sleep(self._sample_latency() + self._token_delay() * len(self._tokens(text)))
+        self._maybe_fail()
+        message = AIMessage(content=text, id=self._message_id(messages))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        text = self._answer(messages)
+        await asyncio.sleep(self._sample_latency() + self._token_delay() * len(self._tokens(text)))
+        self._maybe_fail()
+        message = AIMessage(content=text, id=self._message_id(messages))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self._sample_latency())
+        self._maybe_fail()
+        delay = self._token_delay()
+        for i, token in enumerate(self._tokens(self._answer(messages))):
+            if i and delay:
+                time.sleep(delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                       **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self._sample_latency())
+        self._maybe_fail()
+        delay = self._token_delay()
+        for i, token in enumerate(self._tokens(self._answer(messages))):
+            if i and delay:
+                await asyncio.sleep(delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
@@ -1,11 +1,12 @@
 # Tools Package
 from .knowledge_base import query_knowledge_base, get_code_example
-from .code_tools import validate_python_syntax, extract_function_signature, suggest_improvements
+from .code_tools import analyze_code, validate_python_syntax, extract_function_signature, suggest_improvements
 from .memory_manager import MemoryManager
 
 __all__ = [
     'query_knowledge_base',
     'get_code_example',
+    'analyze_code',
     'validate_python_syntax',
     'extract_function_signature',
     'suggest_improvements',
@@ -0,0 +1,143 @@
+# Content-addressed cache of code analysis results (in-process LRU, optional SQLite persistence)
+import hashlib
+import json
+import sqlite3
+import textwrap
+import threading
+from typing import Any, Optional
+
+from src.tools.lru_cache import LRUCache
+
+# Bump when analysis rules or rendering change - persisted entries of older versions are ignored
+ANALYSIS_VERSION = 1
+
+
+def normalize_code(code: str) -> str:
+    """Normalize pasted code: line endings, trailing whitespace, common indentation, blank edges
+
+    Args:
+        code: Code block
+
+    Returns:
+        Normalized code (what gets analyzed and hashed)
+    """
+    lines = [line.rstrip() for line in code.replace("\r\n", "\n").replace("\r", "\n").split("\n")]
+    return textwrap.dedent("\n".join(lines)).strip("\n")
+
+
+class CodeAnalysisCache:
+    """Analysis results keyed by a hash of the normalized code block
+
+    Shared by all sessions of the process. With a path, entries are also
+    written to SQLite (keeping the newest max_disk_entries), so they
+    survive restarts.
+    """
+
+    def __init__(self, max_size: int = 512, path: Optional[str] = None, max_disk_entries: int = 10000):
+        """Initialize cache
+
+        Args:
+            max_size: Maximum entries in memory (0 disables the cache)
+            path: SQLite file for persistence (None - memory only)
+            max_disk_entries: Maximum persisted entries
+        """
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._memory = LRUCache(max_size=max_size)
+        self._lock = threading.Lock()
+        self._conn = None
+        if path and max_size > 0:
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS code_analysis ("
+                    "id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL UNIQUE, value TEXT NOT NULL)"
+                )
+
+    @staticmethod
+    def key(code: str) -> str:
+        """Cache key of normalized code
+
+        Args:
+            code: Normalized code (see normalize_code)
+
+        Returns:
+            Hex digest
+        """
+        return hashlib.sha256(f"{ANALYSIS_VERSION}\n{code}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get cached value (memory first, then disk)
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None
+        """
+        if self._memory.max_size <= 0:
+            return None
+        value = self._memory.get(key)
+        if value is None and self._conn is not None:
+            with self._lock:
+                row = self._conn.execute("SELECT value FROM code_analysis WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                value = json.loads(row[0])
+                self._memory.put(key, value)
+                with self._lock:
+                    self.disk_hits += 1
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store value (JSON-serializable when persistence is enabled)
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        if self._memory.max_size <= 0:
+            return
+        self._memory.put(key, value)
+        if self._conn is not None:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO code_analysis (key, value) VALUES (?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False))
+                )
+                self._conn.execute(
+                    "DELETE FROM code_analysis WHERE id <= (SELECT MAX(id) FROM code_analysis) - ?",
+                    (self.max_disk_entries,)
+                )
+
+    def clear(self) -> None:
+        """Remove all entries (memory and disk) and reset statistics"""
+        self._memory.clear()
+        with self._lock:
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM code_analysis")
+            self.hits = self.misses = self.disk_hits = 0
+
+    def stats(self) -> dict:
+        """Get cache statistics
+
+        Returns:
+            Dictionary with hits, misses, hit_rate, disk_hits, size and max_size
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "disk_hits": self.disk_hits,
+                "size": len(self._memory),
+                "max_size": self._memory.max_size,
+            }
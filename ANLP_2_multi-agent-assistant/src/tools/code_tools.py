@@ -3,152 +3,273 @@ import ast
 import re
 from typing import Optional
 
+# Lines longer than this are reported by the lint rules
+MAX_LINE_LENGTH = 100
 
-def validate_python_syntax(code: str) -> dict:
+_SIGNATURE_RE = re.compile(r'def\s+(\w+)\s*\((.*?)\)\s*(?:->\s*(\w+))?\s*:', re.DOTALL)
+_MAGIC_NUMBER_RE = re.compile(r'(?<!["\'\w])\b(\d{2,})\b(?!["\'\w])')
+
+
+class _CodeAnalyzer(ast.NodeVisitor):
+    """Collects functions, classes, complexity counters and lint facts in one walk"""
+
+    _dispatch = {}  # node type -> visit method (NodeVisitor looks it up per node)
+
+    def __init__(self):
+        self.functions = []
+        self.classes = []
+        self.loops = 0
+        self.conditionals = 0
+        self.uses_print = False
+        self.uses_global = False
+        self.bare_except = False
+        self.none_comparison = False
+        self.missing_docstring = False
+        self.magic_numbers = []
+
+    def visit(self, node: ast.AST) -> None:
+        method = self._dispatch.get(type(node))
+        if method is None:
+            method = getattr(type(self), f"visit_{type(node).__name__}", type(self).generic_visit)
+            self._dispatch[type(node)] = method
+        method(self, node)
+
+    def generic_visit(self, node: ast.AST) -> None:
+        for field in node._fields:
+            value = getattr(node, field, None)
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        self.visit(item)
+            elif isinstance(value, ast.AST):
+                self.visit(value)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+        signature = f"{prefix} {node.name}({ast.unparse(node.args)})"
+        if node.returns is not None:
+            signature += f" -> {ast.unparse(node.returns)}"
+        has_docstring = ast.get_docstring(node, clean=False) is not None
+        self.functions.append({
+            "name": node.name,
+            "signature": signature + ":",
+            "line": node.lineno,
+            "has_docstring": has_docstring,
+        })
+        if not has_docstring:
+            self.missing_docstring = True
+        self.generic_visit(node)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self.classes.append({
+            "class_name": node.name,
+            "methods": [n.name for n in node.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))],
+            "bases": [ast.unparse(base) for base in node.bases],
+        })
+        self.generic_visit(node)
+
+    def visit_For(self, node: ast.AST) -> None:
+        self.loops += 1
+        self.generic_visit(node)
+
+    visit_AsyncFor = visit_While = visit_For
+
+    def visit_If(self, node: ast.If) -> None:
+        self.conditionals += 1
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        if isinstance(node.func, ast.Name) and node.func.id == "print":
+            self.uses_print = True
+        self.generic_visit(node)
+
+    def visit_Global(self, node: ast.Global) -> None:
+        self.uses_global = True
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler) -> None:
+        if node.type is None:
+            self.bare_except = True
+        self.generic_visit(node)
+
+    def visit_Compare(self, node: ast.Compare) -> None:
+        operands = [node.left] + node.comparators
+        for op, left, right in zip(node.ops, operands, operands[1:]):
+            if isinstance(op, (ast.Eq, ast.NotEq)) and any(
+                isinstance(side, ast.Constant) and side.value is None for side in (left, right)
+            ):
+                self.none_comparison = True
+        self.generic_visit(node)
+
+    def visit_Constant(self, node: ast.Constant) -> None:
+        value = node.value
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and abs(value) >= 10:
+            self.magic_numbers.append(str(value))
+
+
+def _regex_signatures(code: str) -> list:
+    """Function signatures found by regex (for code that does not parse)"""
+    functions = []
+    for match in _SIGNATURE_RE.finditer(code):
+        signature = f"def {match.group(1)}({match.group(2).strip()})"
+        if match.group(3):
+            signature += f" -> {match.group(3)}"
+        functions.append({
+            "name": match.group(1),
+            "signature": signature + ":",
+            "line": code.count("\n", 0, match.start()) + 1,
+            "has_docstring": None,
+        })
+    return functions
+
+
+def _text_lint(code: str) -> dict:
+    """Lint facts from raw text (for code that does not parse)"""
+    return {
+        "uses_print": "print(" in code,
+        "uses_global": "global " in code,
+        "bare_except": re.search(r'except\s*:', code) is not None,
+        "none_comparison": "== None" in code or "!= None" in code,
+        "missing_docstring": bool(_SIGNATURE_RE.search(code)) and '"""' not in code and "'''" not in code,
+        "magic_numbers": _MAGIC_NUMBER_RE.findall(code),
+    }
+
+
+def _suggestions(lint: dict, long_lines: list) -> list:
+    """Improvement suggestions from lint facts"""
+    suggestions = []
+    if lint["uses_print"]:
+        suggestions.append("💡 Consider using logging instead of print() for production code")
+    if lint["uses_global"]:
+        suggestions.append("Avoid global variables, use function parameters or classes")
+    if lint["bare_except"]:
+        suggestions.append("Specify concrete exception types instead of bare except")
+    if lint["none_comparison"]:
+        suggestions.append("Use 'is None' or 'is not None' instead of == / !=")
+    if long_lines:
+        suggestions.append(f"📏 Lines {long_lines[:3]} exceed {MAX_LINE_LENGTH} characters, consider splitting")
+    if lint["missing_docstring"]:
+        suggestions.append("Add docstring for function documentation")
+    if lint["magic_numbers"]:
+        suggestions.append(f"Consider extracting 'magic numbers' ({lint['magic_numbers'][:3]}) into constants")
+    return suggestions
+
+
+def analyze_code(code: str) -> dict:
+    """Analyze Python code with one parse and one AST walk
+
+    Code that does not parse still gets regex-based signatures and lint
+    suggestions; complexity is then reported as an error.
+
+    Args:
+        code: Line with Python code for analysis
+
+    Returns:
+        Dictionary with valid, error, line (syntax status), functions (name,
+        signature, line, has_docstring for every function), classes (class_name,
+        methods, bases), complexity and improvements
+    """
+    lines = code.split('\n')
+    long_lines = [i + 1 for i, line in enumerate(lines) if len(line) > MAX_LINE_LENGTH]
+
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        return {
+            "valid": False,
+            "error": str(e),
+            "line": e.lineno,
+            "functions": _regex_signatures(code),
+            "classes": [],
+            "complexity": {"error": "Cannot parse code"},
+            "improvements": _suggestions(_text_lint(code), long_lines),
+        }
+
+    analyzer = _CodeAnalyzer()
+    analyzer.visit(tree)
+    lines_of_code = len([l for l in lines if l.strip() and not l.strip().startswith('#')])
+    return {
+        "valid": True,
+        "error": None,
+        "line": None,
+        "functions": analyzer.functions,
+        "classes": analyzer.classes,
+        "complexity": {
+            "lines_of_code": lines_of_code,
+            "functions": len(analyzer.functions),
+            "classes": len(analyzer.classes),
+            "loops": analyzer.loops,
+            "conditionals": analyzer.conditionals,
+            "complexity_score": analyzer.loops + analyzer.conditionals + len(analyzer.functions)  # Simplified metric
+        },
+        "improvements": _suggestions(vars(analyzer), long_lines),
+    }
+
+
+def validate_python_syntax(code: str, analysis: Optional[dict] = None) -> dict:
     """Validate Python code syntax
 
     Args:
         code: Line with Python code to check
+        analysis: analyze_code() result to reuse
 
     Returns:
         Dictionary with result: valid (bool), error (str|None), line (int|None)
     """
-    try:
-        ast.parse(code)
-        return {"valid": True, "error": None, "line": None}
-    except SyntaxError as e:
-        return {"valid": False, "error": str(e), "line": e.lineno}
+    analysis = analysis or analyze_code(code)
+    return {"valid": analysis["valid"], "error": analysis["error"], "line": analysis["line"]}
 
 
-def extract_function_signature(code: str) -> str:
+def extract_function_signature(code: str, analysis: Optional[dict] = None) -> str:
     """Extract function signature from code
 
     Args:
         code: Line with function code
+        analysis: analyze_code() result to reuse
 
     Returns:
-        Function signature or error message
+        Signature of the first function or error message
     """
-    match = re.search(r'def\s+(\w+)\s*\((.*?)\)\s*(?:->\s*(\w+))?\s*:', code, re.DOTALL)
-    if match:
-        name = match.group(1)
-        params = match.group(2).strip()
-        return_type = match.group(3)
-        signature = f"def {name}({params})"
-        if return_type:
-            signature += f" -> {return_type}"
-        signature += ":"
-        return signature
-    return "Function signature not found"
-
-
-def extract_class_info(code: str) -> dict:
+    functions = (analysis or analyze_code(code))["functions"]
+    return functions[0]["signature"] if functions else "Function signature not found"
+
+
+def extract_class_info(code: str, analysis: Optional[dict] = None) -> dict:
     """Extract class information from code
 
     Args:
         code: Line with class code
+        analysis: analyze_code() result to reuse
 
     Returns:
-        Dictionary with class name and methods
+        Dictionary with class name and methods (of the first class)
     """
-    try:
-        tree = ast.parse(code)
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                methods = [n.name for n in node.body if isinstance(n, ast.FunctionDef)]
-                return {
-                    "class_name": node.name,
-                    "methods": methods,
-                    "bases": [ast.unparse(base) for base in node.bases] if node.bases else []
-                }
-    except SyntaxError:
-        pass
-    return {"class_name": None, "methods": [], "bases": []}
-
-
-def suggest_improvements(code: str) -> list:
+    classes = (analysis or analyze_code(code))["classes"]
+    return dict(classes[0]) if classes else {"class_name": None, "methods": [], "bases": []}
+
+
+def suggest_improvements(code: str, analysis: Optional[dict] = None) -> list:
     """Suggest code improvements (simple rules)
 
     Args:
         code: Line with code for analysis
+        analysis: analyze_code() result to reuse
 
     Returns:
         List of improvement suggestions
     """
-    suggestions = []
-
-    # Check for print usage instead of logging
-    if "print(" in code:
-        suggestions.append("💡 Consider using logging instead of print() for production code")
-
-    # Check for global variables
-    if "global " in code:
-        suggestions.append("Avoid global variables, use function parameters or classes")
-
-    # Check for bare except
-    if re.search(r'except\s*:', code):
-        suggestions.append("Specify concrete exception types instead of bare except")
-
-    # Check for == None usage
-    if "== None" in code or "!= None" in code:
-        suggestions.append("Use 'is None' or 'is not None' instead of == / !=")
+    return list((analysis or analyze_code(code))["improvements"])
 
-    # Check for long lines
-    lines = code.split('\n')
-    long_lines = [i + 1 for i, line in enumerate(lines) if len(line) > 100]
-    if long_lines:
-        suggestions.append(f"📏 Lines {long_lines[:3]} exceed 100 characters, consider splitting")
-
-    # Check for missing docstring
-    if re.search(r'def\s+\w+\s*\([^)]*\)\s*:', code):
-        if '"""' not in code and "'''" not in code:
-            suggestions.append("Add docstring for function documentation")
-
-    # Check for magic numbers usage
-    magic_numbers = re.findall(r'(?<!["\'\w])\b(\d{2,})\b(?!["\'\w])', code)
-    if magic_numbers:
-        suggestions.append(f"Consider extracting 'magic numbers' ({magic_numbers[:3]}) into constants")
-    
-    return suggestions
 
-
-def count_complexity(code: str) -> dict:
+def count_complexity(code: str, analysis: Optional[dict] = None) -> dict:
     """Assess code complexity
 
     Args:
         code: Line with code for analysis
+        analysis: analyze_code() result to reuse
 
     Returns:
         Dictionary with complexity metrics
     """
-    try:
-        tree = ast.parse(code)
-        
-        functions = 0
-        classes = 0
-        loops = 0
-        conditionals = 0
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                functions += 1
-            elif isinstance(node, ast.ClassDef):
-                classes += 1
-            elif isinstance(node, (ast.For, ast.While)):
-                loops += 1
-            elif isinstance(node, ast.If):
-                conditionals += 1
-        
-        lines = len([l for l in code.split('\n') if l.strip() and not l.strip().startswith('#')])
-        
-        return {
-            "lines_of_code": lines,
-            "functions": functions,
-            "classes": classes,
-            "loops": loops,
-            "conditionals": conditionals,
-            "complexity_score": loops + conditionals + functions  # Simplified metric
-        }
-    except SyntaxError:
-        return {"error": "Cannot parse code"}
-
+    return dict((analysis or analyze_code(code))["complexity"])
@@ -0,0 +1,111 @@
+# Incremental similarity index over the turns of one session
+import numpy as np
+
+from src.tools.kb_index import hashed_features
+
+# Hashed feature space of turn vectors (column ids fit in uint16)
+HISTORY_FEATURES = 2 ** 16
+# Answer prefix indexed with each turn - the query text carries most of the signal
+HISTORY_ANSWER_CHARS = 300
+
+
+def turn_text(text: str, answer: str = None) -> str:
+    """Indexed text of a turn - query plus answer prefix"""
+    return f"{text}\n{answer[:HISTORY_ANSWER_CHARS]}" if answer else text
+
+
+class HistoryIndex:
+    """Hashed n-gram vectors of session turns with cosine similarity search
+
+    Turns are appended as rows of a growable CSR matrix (uint16 feature
+    ids, float32 weights). Weighting follows SMART lnc.ltc: turn vectors
+    use log TF without IDF, so stored rows never change when turns are
+    added or dropped; the query vector gets IDF from the current turns at
+    search time. A search touches only entries of the query's features,
+    with vectorized NumPy operations.
+    """
+
+    def __init__(self):
+        self.num_turns = 0
+        self._cols = np.zeros(1024, dtype=np.uint16)
+        self._vals = np.zeros(1024, dtype=np.float32)
+        self._indptr = np.zeros(65, dtype=np.int64)
+
+    def add(self, text: str) -> None:
+        """Append turn (becomes the last row)
+
+        Args:
+            text: Turn text (see turn_text)
+        """
+        counts = hashed_features(text, HISTORY_FEATURES)
+        start = int(self._indptr[self.num_turns])
+        end = start + len(counts)
+        if end > len(self._cols):
+            capacity = max(end, 2 * len(self._cols))
+            self._cols = np.resize(self._cols, capacity)
+            self._vals = np.resize(self._vals, capacity)
+        if self.num_turns + 2 > len(self._indptr):
+            self._indptr = np.resize(self._indptr, 2 * len(self._indptr))
+
+        if counts:
+            weights = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+            self._cols[start:end] = np.fromiter(counts.keys(), dtype=np.uint16, count=len(counts))
+            self._vals[start:end] = weights / np.linalg.norm(weights)
+        self.num_turns += 1
+        self._indptr[self.num_turns] = end
+
+    def drop_oldest(self, n: int) -> None:
+        """Remove the first n turns (row ids shift down by n)
+
+        Args:
+            n: Number of turns
+        """
+        n = min(n, self.num_turns)
+        if n <= 0:
+            return
+        cut = int(self._indptr[n])
+        size = int(self._indptr[self.num_turns])
+        self._cols[:size - cut] = self._cols[cut:size]
+        self._vals[:size - cut] = self._vals[cut:size]
+        self._indptr[:self.num_turns - n + 1] = self._indptr[n:self.num_turns + 1] - cut
+        self.num_turns -= n
+
+    def search(self, query: str, top_k: int = 3, min_score: float = 0.0) -> list:
+        """Rank turns by cosine similarity to query
+
+        Args:
+            query: Query text
+            top_k: Maximum number of results
+            min_score: Minimum similarity to include
+
+        Returns:
+            List of (turn id, score) sorted by score descending
+        """
+        counts = hashed_features(query, HISTORY_FEATURES)
+        if not self.num_turns or not counts or top_k <= 0:
+            return []
+
+        features = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        lookup = np.full(HISTORY_FEATURES, -1, dtype=np.int32)
+        lookup[features] = np.arange(len(features), dtype=np.int32)
+
+        # Entries of query features and the turns they belong to
+        size = int(self._indptr[self.num_turns])
+        positions = lookup[self._cols[:size]]
+        hits = np.flatnonzero(positions >= 0)
+        if not len(hits):
+            return []
+        positions = positions[hits]
+        rows = np.searchsorted(self._indptr[:self.num_turns + 1], hits, side="right") - 1
+
+        # ltc query vector - document frequency counted over the current turns
+        doc_freq = np.bincount(positions, minlength=len(features))
+        idf = np.log((1.0 + self.num_turns) / (1.0 + doc_freq)) + 1.0
+        weights = (1.0 + np.log(np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))) * idf
+        weights /= np.linalg.norm(weights)
+
+        scores = np.bincount(rows, weights=self._vals[hits] * weights[positions], minlength=self.num_turns)
+        k = min(top_k, self.num_turns)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(turn), float(scores[turn])) for turn in top if scores[turn] > min_score]
@@ -0,0 +1,441 @@
+# Prebuilt Knowledge Base index artifact - offline build, staleness check, mmap loading
+#
+# Usage: python -m src.tools.kb_build --source docs/ [--output .kb_index] [--force]
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import Counter
+from typing import Iterator, Optional
+
+import numpy as np
+
+from src.config import KB_INDEX_DIR, KB_SOURCE_DIR
+from src.tools.kb_corpus import (
+    MAX_PASSAGE_CHARS, MmapCorpus, MmapStringTable, StringTableWriter, document_files, iter_file_passages,
+    write_corpus
+)
+from src.tools.kb_index import BM25Index, KBIndex, VectorIndex, hashed_features, tokenize
+from src.tools.memory_store import file_lock
+
+# Bump when the artifact layout or the tokenization/feature hashing changes
+INDEX_FORMAT_VERSION = 2
+
+MANIFEST_FILE = "manifest.json"
+
+# Build parameters stored in the manifest - a change makes the artifact stale
+BUILD_PARAMS = {"max_passage_chars": MAX_PASSAGE_CHARS, "n_features": 2 ** 18, "k1": 1.5, "b": 0.75}
+
+
+def _file_sha256(path: str) -> str:
+    """SHA-256 of file contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scan_corpus(source_dir: str, manifest: Optional[dict] = None) -> dict:
+    """Current corpus files with content hashes
+
+    Files whose size and mtime match the manifest keep its hash; only new or
+    modified files are read and hashed.
+
+    Args:
+        source_dir: Corpus directory
+        manifest: Manifest of an existing artifact
+
+    Returns:
+        {relative path: {"path", "size", "mtime_ns", "sha256"}} in ingestion order
+    """
+    known = (manifest or {}).get("files", {})
+    files = {}
+    for rel_path, path in document_files(source_dir):
+        stat = os.stat(path)
+        previous = known.get(rel_path)
+        if previous and previous["size"] == stat.st_size and previous["mtime_ns"] == stat.st_mtime_ns:
+            sha256 = previous["sha256"]
+        else:
+            sha256 = _file_sha256(path)
+        files[rel_path] = {"path": path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+    return files
+
+
+def content_hash(files: dict) -> str:
+    """Corpus content hash over file paths and file hashes
+
+    Args:
+        files: Result of scan_corpus
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    for rel_path, info in files.items():
+        digest.update(f"{rel_path}\0{info['sha256']}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _write_json(path: str, data: dict) -> None:
+    """Write JSON file atomically (temporary file unique per writer)"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _read_manifest(artifact_dir: str) -> Optional[dict]:
+    """Artifact manifest or None if missing/unreadable"""
+    try:
+        with open(os.path.join(artifact_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _save_arrays(artifact_dir: str, prefix: str, arrays: dict) -> None:
+    """Save arrays as <prefix>.<name>.npy"""
+    for name, array in arrays.items():
+        np.save(os.path.join(artifact_dir, f"{prefix}.{name}.npy"), np.ascontiguousarray(array))
+
+
+def _load_arrays(artifact_dir: str, prefix: str, names: tuple) -> dict:
+    """Memory-map arrays saved by _save_arrays"""
+    return {name: np.load(os.path.join(artifact_dir, f"{prefix}.{name}.npy"), mmap_mode="r") for name in names}
+
+
+class BuildCache:
+    """Per-file tokenization results kept between incremental rebuilds
+
+    Terms get ids in a shared dictionary; after each build, terms of removed
+    or changed files that no file uses any more are pruned (see prune). Each file holds its
+    postings and hashed features as flat int32/float32 arrays with file-local
+    document ids, so an index is assembled by concatenation and sorting.
+    """
+
+    def __init__(self):
+        self.terms = []
+        self.term_index = {}
+        self.files = {}  # relative path -> segment arrays
+
+    def segment(self, documents: list, n_features: int) -> dict:
+        """Tokenize documents of one file into segment arrays
+
+        Args:
+            documents: Indexed texts of the file's passages
+            n_features: Size of hashed feature space
+
+        Returns:
+            Dictionary of arrays (postings, features, doc lengths)
+        """
+        term_ids, term_docs, tfs, doc_lengths = [], [], [], []
+        feature_ids, feature_docs, feature_counts = [], [], []
+        for doc_id, text in enumerate(documents):
+            terms = Counter(tokenize(text))
+            doc_lengths.append(sum(terms.values()))
+            for term, tf in terms.items():
+                if term not in self.term_index:
+                    self.term_index[term] = len(self.terms)
+                    self.terms.append(term)
+                term_ids.append(self.term_index[term])
+                term_docs.append(doc_id)
+                tfs.append(tf)
+            features = hashed_features(text, n_features)
+            feature_ids.extend(features.keys())
+            feature_docs.extend([doc_id] * len(features))
+            feature_counts.extend(features.values())
+
+        return {
+            "num_docs": len(documents),
+            "doc_lengths": np.asarray(doc_lengths, dtype=np.int32),
+            "term_ids": np.asarray(term_ids, dtype=np.int32),
+            "term_docs": np.asarray(term_docs, dtype=np.int32),
+            "tfs": np.asarray(tfs, dtype=np.int32),
+            "feature_ids": np.asarray(feature_ids, dtype=np.int32),
+            "feature_docs": np.asarray(feature_docs, dtype=np.int32),
+            "feature_counts": np.asarray(feature_counts, dtype=np.float32),
+        }
+
+    def prune(self) -> None:
+        """Drop terms no file segment uses any more (term ids are renumbered)"""
+        used = np.unique(_concat(list(self.files.values()), "term_ids"))
+        if len(used) == len(self.terms):
+            return
+        remap = np.full(len(self.terms), -1, dtype=np.int32)
+        remap[used] = np.arange(len(used), dtype=np.int32)
+        for segment in self.files.values():
+            segment["term_ids"] = remap[segment["term_ids"]]
+        self.terms = [self.terms[i] for i in used]
+        self.term_index = {term: i for i, term in enumerate(self.terms)}
+
+
+def _concat(segments: list, key: str, offsets: list = None) -> np.ndarray:
+    """Concatenate segment arrays (adding document offsets)"""
+    if not segments:
+        return np.zeros(0, dtype=np.int32)
+    if offsets is None:
+        return np.concatenate([segment[key] for segment in segments])
+    return np.concatenate([segment[key] + offset for segment, offset in zip(segments, offsets)])
+
+
+def _stored_passages(corpus: MmapCorpus, start: int, end: int) -> Iterator[dict]:
+    """Passages of one source file from an existing corpus (no re-reading or re-chunking)"""
+    for doc_id in range(start, end):
+        category, key = corpus.topic(doc_id)
+        passage = corpus.source(doc_id)
+        passage.update(category=category, key=key, text=corpus.text(doc_id))
+        yield passage
+
+
+def artifact_lock(artifact_dir: str):
+    """Exclusive inter-process lock of an artifact directory
+
+    Hold it across staleness check, build and swap, so only one process
+    rebuilds the artifact and no process sees it missing during the swap.
+
+    Args:
+        artifact_dir: Artifact directory
+
+    Returns:
+        Context manager (lock file next to artifact_dir)
+    """
+    artifact_dir = os.path.abspath(artifact_dir)
+    os.makedirs(os.path.dirname(artifact_dir), exist_ok=True)
+    return file_lock(f"{artifact_dir}.lock")
+
+
+def build_index_artifact(source_dir: str, artifact_dir: str, previous: Optional[KBIndex] = None,
+                         keep_cache: bool = False) -> KBIndex:
+    """Build corpus and indexes and write them as a versioned artifact directory
+
+    With a previous index built by the same parameters, files whose content
+    hash is unchanged are copied from its passage store instead of being
+    re-chunked, and their tokenized segments (previous.build_cache) are
+    reused, so only new or modified files are tokenized. The artifact is
+    built next to artifact_dir and swapped in when complete, so readers
+    never see a partially written index. The caller holds
+    artifact_lock(artifact_dir).
+
+    Args:
+        source_dir: Directory with Markdown/text/JSONL documents
+        artifact_dir: Output directory
+        previous: Currently loaded index (incremental rebuild)
+        keep_cache: Attach BuildCache to the result for the next incremental rebuild
+
+    Returns:
+        Loaded KBIndex (memory-mapped)
+    """
+    start = time.perf_counter()
+    n_features = BUILD_PARAMS["n_features"]
+    reusable = {}
+    if previous is not None and previous.manifest.get("params") == BUILD_PARAMS:
+        reusable = previous.manifest.get("files", {})
+    cache = (previous.build_cache if previous is not None else None) or BuildCache()
+
+    files = scan_corpus(source_dir, previous.manifest if previous is not None else None)
+    segments = {}
+    stats = {"reused_files": 0, "rebuilt_files": 0}
+
+    def passages():
+        num_docs = 0
+        for rel_path, info in files.items():
+            stored = reusable.get(rel_path)
+            if stored and stored["sha256"] == info["sha256"]:
+                file_passages = _stored_passages(previous.corpus, stored["start"], stored["end"])
+                segment = cache.files.get(rel_path)
+                stats["reused_files"] += 1
+            else:
+                file_passages = iter_file_passages(info["path"], rel_path, BUILD_PARAMS["max_passage_chars"])
+                segment = None
+                stats["rebuilt_files"] += 1
+
+            documents = []
+            for passage in file_passages:
+                yield passage
+                if segment is None:
+                    documents.append(f"{passage['category']} {passage['key']} {passage['text']}")
+
+            if segment is None:
+                segment = cache.segment(documents, n_features)
+            segments[rel_path] = segment
+            info.update(start=num_docs, end=num_docs + segment["num_docs"])
+            num_docs += segment["num_docs"]
+
+    build_dir = f"{artifact_dir.rstrip(os.sep)}.build-{os.getpid()}"
+    shutil.rmtree(build_dir, ignore_errors=True)
+    corpus = write_corpus(passages(), build_dir)
+
+    # Assemble indexes from segments (document ids shifted by file offsets)
+    ordered = list(segments.values())
+    offsets = [info["start"] for info in files.values()]
+    bm25 = BM25Index.from_postings(
+        cache.terms, _concat(ordered, "term_ids"), _concat(ordered, "term_docs", offsets),
+        _concat(ordered, "tfs"), _concat(ordered, "doc_lengths"), k1=BUILD_PARAMS["k1"], b=BUILD_PARAMS["b"],
+    )
+    vectors = VectorIndex.from_features(
+        _concat(ordered, "feature_docs", offsets), _concat(ordered, "feature_ids"),
+        _concat(ordered, "feature_counts"), len(corpus), n_features,
+    )
+    cache.files = segments
+    cache.prune()
+
+    vocabulary = StringTableWriter(os.path.join(build_dir, "vocabulary"))
+    for term in bm25.vocabulary:
+        vocabulary.append(term)
+    vocabulary.close()
+    _save_arrays(build_dir, "bm25", bm25.arrays())
+    _save_arrays(build_dir, "vectors", vectors.arrays())
+
+    for info in files.values():
+        del info["path"]
+    manifest = {
+        "format_version": INDEX_FORMAT_VERSION,
+        "content_hash": content_hash(files),
+        "files": files,
+        "params": BUILD_PARAMS,
+        "num_passages": len(corpus),
+        "vocabulary_size": len(bm25.vocabulary),
+        "n_features": vectors.n_features,
+        "built_at": time.time(),
+        "build_seconds": round(time.perf_counter() - start, 3),
+        **stats,
+    }
+    corpus.close()
+    # Manifest is written last - an artifact without one is never loaded
+    _write_json(os.path.join(build_dir, MANIFEST_FILE), manifest)
+
+    # Swap directories (processes with the old files mapped keep reading them)
+    old_dir = f"{artifact_dir.rstrip(os.sep)}.old-{os.getpid()}"
+    if os.path.exists(artifact_dir):
+        os.replace(artifact_dir, old_dir)
+    os.replace(build_dir, artifact_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+    index = load_index_artifact(artifact_dir)
+    if index is None:
+        raise RuntimeError(f"Index artifact {artifact_dir} could not be loaded after build")
+    if keep_cache:
+        index.build_cache = cache
+    return index
+
+
+def load_index_artifact(artifact_dir: str) -> Optional[KBIndex]:
+    """Open artifact with memory-mapped arrays
+
+    Args:
+        artifact_dir: Artifact directory
+
+    Returns:
+        KBIndex or None if missing or written by another format version
+    """
+    manifest = _read_manifest(artifact_dir)
+    if not manifest or manifest.get("format_version") != INDEX_FORMAT_VERSION:
+        return None
+
+    corpus = MmapCorpus(artifact_dir)
+    params = manifest["params"]
+    bm25 = BM25Index.from_arrays(
+        MmapStringTable(os.path.join(artifact_dir, "vocabulary")),
+        _load_arrays(artifact_dir, "bm25", ("indptr", "doc_ids", "tfs", "doc_lengths")),
+        k1=params["k1"], b=params["b"],
+    )
+    vectors = VectorIndex.from_arrays(
+        _load_arrays(artifact_dir, "vectors", ("idf", "data", "indices", "indptr")), len(corpus)
+    )
+    return KBIndex(corpus, bm25, vectors, manifest)
+
+
+def is_stale(manifest: Optional[dict], source_dir: str, artifact_dir: Optional[str] = None) -> bool:
+    """Check artifact against the corpus
+
+    File sizes and mtimes are compared first; only changed files are hashed.
+    If their content is unchanged (files touched or copied) the stored sizes
+    and mtimes are refreshed in the manifest (and in artifact_dir).
+
+    Args:
+        manifest: Artifact manifest (None - missing artifact)
+        source_dir: Corpus directory
+        artifact_dir: Artifact directory (for manifest refresh)
+
+    Returns:
+        True if the artifact has to be rebuilt
+    """
+    if not manifest or manifest.get("format_version") != INDEX_FORMAT_VERSION:
+        return True
+    if manifest.get("params") != BUILD_PARAMS:
+        return True
+
+    stored = manifest.get("files", {})
+    files = scan_corpus(source_dir, manifest)
+    if files.keys() != stored.keys():
+        return True
+    if any(info["sha256"] != stored[rel_path]["sha256"] for rel_path, info in files.items()):
+        return True
+
+    touched = [rel_path for rel_path, info in files.items()
+               if (info["size"], info["mtime_ns"]) != (stored[rel_path]["size"], stored[rel_path]["mtime_ns"])]
+    if touched:
+        for rel_path in touched:
+            stored[rel_path].update(size=files[rel_path]["size"], mtime_ns=files[rel_path]["mtime_ns"])
+        if artifact_dir:
+            try:
+                _write_json(os.path.join(artifact_dir, MANIFEST_FILE), manifest)
+            except OSError:
+                pass
+    return False
+
+
+def load_or_build(source_dir: str, artifact_dir: str, previous: Optional[KBIndex] = None,
+                  keep_cache: bool = False, force: bool = False) -> KBIndex:
+    """Load artifact for corpus, rebuilding it first if missing or stale
+
+    Check, build and swap run under artifact_lock, so workers sharing the
+    artifact build it once and the others load the result.
+
+    Args:
+        source_dir: Corpus directory
+        artifact_dir: Artifact directory
+        previous: Currently loaded index (incremental rebuild)
+        keep_cache: Keep tokenized segments when rebuilding (see build_index_artifact)
+        force: Rebuild even if the artifact is up to date
+
+    Returns:
+        KBIndex
+    """
+    with artifact_lock(artifact_dir):
+        index = None
+        if not force and not is_stale(_read_manifest(artifact_dir), source_dir, artifact_dir):
+            index = load_index_artifact(artifact_dir)
+        return index or build_index_artifact(source_dir, artifact_dir, previous=previous, keep_cache=keep_cache)
+
+
+def main():
+    """Build the KB index artifact from the command line"""
+    parser = argparse.ArgumentParser(description="Build prebuilt Knowledge Base index artifact")
+    parser.add_argument("--source", default=KB_SOURCE_DIR, help="Corpus directory (KB_SOURCE_DIR)")
+    parser.add_argument("--output", default=KB_INDEX_DIR, help="Artifact directory (KB_INDEX_DIR)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the artifact is up to date")
+    args = parser.parse_args()
+
+    if not args.source:
+        parser.error("--source (or KB_SOURCE_DIR) is required")
+
+    with artifact_lock(args.output):
+        if not args.force and not is_stale(_read_manifest(args.output), args.source, args.output):
+            print(f"Index artifact {args.output} is up to date")
+            return
+        manifest = build_index_artifact(args.source, args.output).manifest
+    print(f"Built {args.output}: {manifest['num_passages']} passages, "
+          f"{manifest['vocabulary_size']} terms in {manifest['build_seconds']}s")
+
+    start = time.perf_counter()
+    load_index_artifact(args.output)
+    print(f"Load time: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
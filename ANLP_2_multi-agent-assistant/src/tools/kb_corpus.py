@@ -0,0 +1,313 @@
+# External Knowledge Base corpus - ingestion, chunking and mmap-backed passage store
+import json
+import mmap
+import os
+import re
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+# Passage size limit (characters) when splitting documents
+MAX_PASSAGE_CHARS = 1200
+
+DOCUMENT_EXTENSIONS = (".md", ".markdown", ".txt", ".jsonl")
+
+_HEADING_RE = re.compile(r"^#{1,6}\s+(.+?)\s*#*\s*$", re.MULTILINE)
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+
+
+def _slug(text: str) -> str:
+    """Topic key from heading text"""
+    return re.sub(r"[^\w]+", "_", text.strip().lower()).strip("_")[:60] or "section"
+
+
+def chunk_text(text: str, max_chars: int = MAX_PASSAGE_CHARS) -> list:
+    """Split Markdown/plain text into passages with character offsets
+
+    Sections start at headings; long sections are packed paragraph by
+    paragraph into passages of at most max_chars (a single longer
+    paragraph is cut at max_chars).
+
+    Args:
+        text: Document text
+        max_chars: Maximum passage length
+
+    Returns:
+        List of (heading, start, end) - passage is text[start:end]
+    """
+    # Section boundaries: document start and every heading
+    headings = [(m.start(), m.group(1)) for m in _HEADING_RE.finditer(text)]
+    if not headings or headings[0][0] > 0:
+        headings.insert(0, (0, ""))
+    bounds = headings + [(len(text), None)]
+
+    passages = []
+    for (start, heading), (end, _) in zip(bounds, bounds[1:]):
+        # Paragraph spans inside the section
+        spans = []
+        position = start
+        for separator in _PARAGRAPH_RE.finditer(text, start, end):
+            spans.append((position, separator.start()))
+            position = separator.end()
+        spans.append((position, end))
+
+        chunk_start = chunk_end = None
+        for span_start, span_end in spans:
+            if not text[span_start:span_end].strip():
+                continue
+            if chunk_start is not None and span_end - chunk_start > max_chars:
+                if span_end - span_start > max_chars:
+                    # Oversized paragraph - pending text (e.g. heading) stays with its first piece
+                    span_start = chunk_start
+                else:
+                    passages.append((heading, chunk_start, chunk_end))
+                chunk_start = None
+            # Cut oversized paragraphs
+            while span_end - span_start > max_chars:
+                passages.append((heading, span_start, span_start + max_chars))
+                span_start += max_chars
+            if chunk_start is None:
+                chunk_start = span_start
+            chunk_end = span_end
+        if chunk_start is not None:
+            passages.append((heading, chunk_start, chunk_end))
+
+    return passages
+
+
+def iter_file_passages(path: str, rel_path: str, max_chars: int = MAX_PASSAGE_CHARS) -> Iterator[dict]:
+    """Ingest one Markdown/text/JSONL document
+
+    JSONL lines are objects with "text" and optional "title" and "category".
+    Category defaults to rel_path without extension.
+
+    Args:
+        path: File path
+        rel_path: Path relative to the corpus directory (stored as source)
+        max_chars: Maximum passage length
+
+    Yields:
+        Passage dicts: category, key, text, source, line, start, end
+    """
+    category = os.path.splitext(rel_path)[0].replace(os.sep, "/")
+
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        if path.lower().endswith(".jsonl"):
+            for line_no, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if not isinstance(record, dict) or not record.get("text"):
+                    continue
+                text = str(record["text"])
+                title = str(record.get("title") or f"record_{line_no}")
+                for i, (_, start, end) in enumerate(chunk_text(text, max_chars)):
+                    yield {
+                        "category": str(record.get("category") or category),
+                        "key": _slug(title) + (f"_{i + 1}" if i else ""),
+                        "text": text[start:end].strip(),
+                        "source": rel_path, "line": line_no, "start": start, "end": end,
+                    }
+        else:
+            text = f.read()
+            seen = {}
+            for heading, start, end in chunk_text(text, max_chars):
+                key = _slug(heading) if heading else "intro"
+                seen[key] = seen.get(key, 0) + 1
+                yield {
+                    "category": category,
+                    "key": key + (f"_{seen[key]}" if seen[key] > 1 else ""),
+                    "text": text[start:end].strip(),
+                    "source": rel_path, "line": 0, "start": start, "end": end,
+                }
+
+
+def document_files(source_dir: str) -> list:
+    """Corpus documents in ingestion order
+
+    Args:
+        source_dir: Corpus directory (searched recursively)
+
+    Returns:
+        Sorted list of (relative path with "/" separators, absolute path)
+    """
+    files = []
+    for root, dirs, names in os.walk(source_dir):
+        for name in names:
+            if name.lower().endswith(DOCUMENT_EXTENSIONS):
+                path = os.path.join(root, name)
+                files.append((os.path.relpath(path, source_dir).replace(os.sep, "/"), path))
+    return sorted(files)
+
+
+def iter_directory_passages(source_dir: str, max_chars: int = MAX_PASSAGE_CHARS) -> Iterator[dict]:
+    """Ingest all documents in directory (see iter_file_passages)
+
+    Args:
+        source_dir: Corpus directory (searched recursively)
+        max_chars: Maximum passage length
+
+    Yields:
+        Passage dicts
+    """
+    for rel_path, path in document_files(source_dir):
+        yield from iter_file_passages(path, rel_path, max_chars)
+
+
+class StringTableWriter:
+    """Streams strings into one UTF-8 blob file plus int64 offset table"""
+
+    def __init__(self, prefix: str):
+        """Open output files
+
+        Args:
+            prefix: Path prefix (writes <prefix>.bin and <prefix>.offsets.npy)
+        """
+        self.prefix = prefix
+        self._file = open(f"{prefix}.bin", "wb")
+        self._offsets = [0]
+
+    def append(self, value: str) -> None:
+        """Append string"""
+        data = value.encode("utf-8")
+        self._file.write(data)
+        self._offsets.append(self._offsets[-1] + len(data))
+
+    def close(self) -> None:
+        """Flush blob and write offset table"""
+        self._file.close()
+        np.save(f"{self.prefix}.offsets.npy", np.asarray(self._offsets, dtype=np.int64))
+
+
+class MmapStringTable:
+    """Read-only string table - strings are decoded from a memory-mapped blob on access"""
+
+    def __init__(self, prefix: str):
+        """Map files written by StringTableWriter
+
+        Args:
+            prefix: Path prefix
+        """
+        self.offsets = np.load(f"{prefix}.offsets.npy", mmap_mode="r")
+        self._file = open(f"{prefix}.bin", "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self._data[int(self.offsets[i]):int(self.offsets[i + 1])].decode("utf-8")
+
+    def close(self) -> None:
+        """Unmap blob"""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+
+class InMemoryCorpus:
+    """Corpus over the built-in KB_DATA entries"""
+
+    def __init__(self, entries: list):
+        """
+        Args:
+            entries: List of (category, key, text)
+        """
+        self.entries = entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def text(self, i: int) -> str:
+        return self.entries[i][2]
+
+    def topic(self, i: int) -> tuple:
+        return self.entries[i][0], self.entries[i][1]
+
+    def source(self, i: int) -> Optional[dict]:
+        return None
+
+
+class MmapCorpus:
+    """Passage corpus stored on disk: passage texts and topics in mmap string tables,
+    source spans in an int64 array (source_id, line, start, end)"""
+
+    def __init__(self, corpus_dir: str):
+        """Open corpus written by build_corpus
+
+        Args:
+            corpus_dir: Directory with corpus files
+        """
+        self.corpus_dir = corpus_dir
+        self.texts = MmapStringTable(os.path.join(corpus_dir, "passages"))
+        self.topics = MmapStringTable(os.path.join(corpus_dir, "topics"))
+        self.spans = np.load(os.path.join(corpus_dir, "spans.npy"), mmap_mode="r")
+        with open(os.path.join(corpus_dir, "sources.json"), "r", encoding="utf-8") as f:
+            self.sources = json.load(f)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def text(self, i: int) -> str:
+        return self.texts[i]
+
+    def topic(self, i: int) -> tuple:
+        category, _, key = self.topics[i].rpartition("/")
+        return category, key
+
+    def source(self, i: int) -> dict:
+        source_id, line, start, end = (int(v) for v in self.spans[i])
+        return {"source": self.sources[source_id], "line": line, "start": start, "end": end}
+
+    def close(self) -> None:
+        """Release mapped files"""
+        self.texts.close()
+        self.topics.close()
+
+
+def write_corpus(passages: Iterable, corpus_dir: str) -> MmapCorpus:
+    """Write passages into on-disk corpus
+
+    Args:
+        passages: Iterable of passage dicts (see iter_file_passages)
+        corpus_dir: Output directory
+
+    Returns:
+        Opened MmapCorpus
+    """
+    os.makedirs(corpus_dir, exist_ok=True)
+    texts = StringTableWriter(os.path.join(corpus_dir, "passages"))
+    topics = StringTableWriter(os.path.join(corpus_dir, "topics"))
+    sources, source_ids, spans = [], {}, []
+
+    for passage in passages:
+        if passage["source"] not in source_ids:
+            source_ids[passage["source"]] = len(sources)
+            sources.append(passage["source"])
+        texts.append(passage["text"])
+        topics.append(f"{passage['category']}/{passage['key']}")
+        spans.append((source_ids[passage["source"]], passage["line"], passage["start"], passage["end"]))
+
+    texts.close()
+    topics.close()
+    np.save(os.path.join(corpus_dir, "spans.npy"), np.asarray(spans, dtype=np.int64).reshape(-1, 4))
+    with open(os.path.join(corpus_dir, "sources.json"), "w", encoding="utf-8") as f:
+        json.dump(sources, f, ensure_ascii=False)
+
+    return MmapCorpus(corpus_dir)
+
+
+def build_corpus(source_dir: str, corpus_dir: str, max_chars: int = MAX_PASSAGE_CHARS) -> MmapCorpus:
+    """Ingest directory into on-disk passage corpus
+
+    Args:
+        source_dir: Directory with Markdown/text/JSONL documents
+        corpus_dir: Output directory
+        max_chars: Maximum passage length
+
+    Returns:
+        Opened MmapCorpus
+    """
+    return write_corpus(iter_directory_passages(source_dir, max_chars), corpus_dir)
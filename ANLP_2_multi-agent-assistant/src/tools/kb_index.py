@@ -0,0 +1,425 @@
+# Retrieval indexes for the Knowledge Base
+import bisect
+import re
+import zlib
+from collections import Counter
+from functools import lru_cache
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+try:
+    from scipy import sparse
+except ImportError:  # scipy is optional - dense matrix is used without it
+    sparse = None
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can do does for from how i in into is it its me my of on or
+so that the their them then there these they this to was what when where which who why
+will with you your about should would could tell explain describe give show
+""".split())
+
+_WORD_RE = re.compile(r"[A-Za-z0-9]+")
+_CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def _normalize_token(token: str) -> str:
+    """Lowercase token and strip plural suffix (patterns -> pattern)"""
+    token = token.lower()
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        token = token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list:
+    """Split text into normalized search terms
+
+    Splits snake_case and CamelCase identifiers, drops stopwords.
+
+    Args:
+        text: Input text
+
+    Returns:
+        List of terms
+    """
+    terms = []
+    for word in _WORD_RE.findall(text.replace("_", " ")):
+        parts = _CAMEL_RE.findall(word) if not word.islower() else [word]
+        for part in parts:
+            term = _normalize_token(part)
+            if term not in STOPWORDS:
+                terms.append(term)
+    return terms
+
+
+class BM25Index:
+    """Inverted index with BM25 ranking
+
+    Posting lists are stored in CSR form (term -> slice of doc_ids/tfs via
+    indptr) over a sorted vocabulary, so an index can be saved as flat
+    arrays and memory-mapped back. Lookups touch only the posting lists of
+    the query terms.
+    """
+
+    def __init__(self, documents: Iterable, k1: float = 1.5, b: float = 0.75):
+        """Build index
+
+        Args:
+            documents: Iterable of document texts (document id = position)
+            k1: Term frequency saturation
+            b: Length normalization
+        """
+        self._build((Counter(tokenize(text)) for text in documents), k1, b)
+
+    @classmethod
+    def from_postings(cls, terms: Sequence, term_ids: np.ndarray, doc_ids: np.ndarray, tfs: np.ndarray,
+                      doc_lengths: np.ndarray, k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        """Build index from (term_id, doc_id, tf) triples in any order
+
+        Args:
+            terms: Term strings by term id (ids without postings are ignored)
+            term_ids: Term id per posting
+            doc_ids: Document id per posting
+            tfs: Term frequency per posting
+            doc_lengths: Number of terms per document
+            k1: Term frequency saturation
+            b: Length normalization
+
+        Returns:
+            BM25Index
+        """
+        index = cls.__new__(cls)
+        index._set_postings(terms, term_ids, doc_ids, tfs, doc_lengths, k1, b)
+        return index
+
+    def _build(self, term_counts: Iterable, k1: float, b: float) -> None:
+        """Build posting lists from per-document term counts"""
+        term_index = {}
+        terms, term_ids, doc_ids, tfs, doc_lengths = [], [], [], [], []
+
+        for doc_id, counts in enumerate(term_counts):
+            doc_lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                if term not in term_index:
+                    term_index[term] = len(terms)
+                    terms.append(term)
+                term_ids.append(term_index[term])
+                doc_ids.append(doc_id)
+                tfs.append(tf)
+
+        self._set_postings(terms, np.asarray(term_ids, dtype=np.int64), np.asarray(doc_ids, dtype=np.int32),
+                           np.asarray(tfs, dtype=np.int32), np.asarray(doc_lengths, dtype=np.int32), k1, b)
+
+    def _set_postings(self, terms: Sequence, term_ids: np.ndarray, doc_ids: np.ndarray, tfs: np.ndarray,
+                      doc_lengths: np.ndarray, k1: float, b: float) -> None:
+        """Sort postings into CSR form over the sorted vocabulary"""
+        used = sorted(np.unique(term_ids).tolist(), key=terms.__getitem__)
+        rank = np.zeros(len(terms), dtype=np.int64)
+        rank[used] = np.arange(len(used))
+        sorted_terms = rank[term_ids]
+
+        order = np.lexsort((doc_ids, sorted_terms))
+        indptr = np.zeros(len(used) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(np.bincount(sorted_terms, minlength=len(used)))
+
+        self._set_arrays([terms[i] for i in used], indptr, np.asarray(doc_ids[order], dtype=np.int32),
+                         np.asarray(tfs[order], dtype=np.int32), np.asarray(doc_lengths, dtype=np.int32), k1, b)
+
+    def _set_arrays(self, vocabulary: Sequence, indptr: np.ndarray, doc_ids: np.ndarray,
+                    tfs: np.ndarray, doc_lengths: np.ndarray, k1: float, b: float) -> None:
+        """Set index arrays and derived statistics"""
+        self.k1 = k1
+        self.b = b
+        self.vocabulary = vocabulary  # sorted terms (list or mmap string table)
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.doc_lengths = doc_lengths
+        self.num_docs = len(doc_lengths)
+        self.avg_doc_length = float(doc_lengths.mean()) if self.num_docs else 0.0
+        doc_freq = np.diff(indptr).astype(np.float64)
+        self.idf = np.log(1 + (self.num_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def arrays(self) -> dict:
+        """Index arrays for serialization (vocabulary is stored separately)
+
+        Returns:
+            Dictionary of numpy arrays
+        """
+        return {"indptr": self.indptr, "doc_ids": self.doc_ids, "tfs": self.tfs, "doc_lengths": self.doc_lengths}
+
+    @classmethod
+    def from_arrays(cls, vocabulary: Sequence, arrays: dict, k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        """Restore index from serialized arrays (may be memory-mapped)
+
+        Args:
+            vocabulary: Sorted terms
+            arrays: Arrays returned by arrays()
+            k1: Term frequency saturation
+            b: Length normalization
+
+        Returns:
+            BM25Index
+        """
+        index = cls.__new__(cls)
+        index._set_arrays(vocabulary, arrays["indptr"], arrays["doc_ids"], arrays["tfs"],
+                          arrays["doc_lengths"], k1, b)
+        return index
+
+    def term_id(self, term: str) -> int:
+        """Position of term in vocabulary (-1 if unknown)"""
+        position = bisect.bisect_left(self.vocabulary, term)
+        if position < len(self.vocabulary) and self.vocabulary[position] == term:
+            return position
+        return -1
+
+    def search(self, query: str, top_k: int = 3) -> list:
+        """Rank documents for query
+
+        Args:
+            query: Search query
+            top_k: Maximum number of results
+
+        Returns:
+            List of (doc_id, score) sorted by score descending
+        """
+        matched_docs, contributions = [], []
+        for term in set(tokenize(query)):
+            term_id = self.term_id(term)
+            if term_id < 0:
+                continue
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            docs = np.asarray(self.doc_ids[start:end])
+            tf = np.asarray(self.tfs[start:end], dtype=np.float64)
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[docs] / self.avg_doc_length)
+            matched_docs.append(docs)
+            contributions.append(self.idf[term_id] * tf * (self.k1 + 1) / (tf + norm))
+
+        if not matched_docs:
+            return []
+
+        docs, inverse = np.unique(np.concatenate(matched_docs), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(contributions))
+        top = np.lexsort((docs, -scores))[:top_k]
+        return [(int(docs[i]), float(scores[i])) for i in top]
+
+
+# Hashed feature space limit when the matrix is stored densely (no scipy)
+DENSE_MAX_FEATURES = 2 ** 12
+
+
+def hashed_features(text: str, n_features: int, char_ngram: int = 3) -> Counter:
+    """Hashed term counts: word terms plus character n-grams of each term
+
+    Character n-grams make near spellings match (agent/agents, LangGraph/graph).
+    crc32 is used because Python's hash() is salted per process.
+
+    Args:
+        text: Input text
+        n_features: Size of hashed feature space
+        char_ngram: Character n-gram length
+
+    Returns:
+        Counter {feature_index: count}
+    """
+    counts = Counter()
+    for term in tokenize(text):
+        counts.update(_term_features(term, n_features, char_ngram))
+    return counts
+
+
+@lru_cache(maxsize=65536)
+def _term_features(term: str, n_features: int, char_ngram: int) -> tuple:
+    """Hashed feature ids of one term (memoized - vocabularies repeat across texts)"""
+    features = [zlib.crc32(term.encode("utf-8")) % n_features]
+    padded = f"#{term}#"
+    for i in range(len(padded) - char_ngram + 1):
+        gram = "c:" + padded[i:i + char_ngram]
+        features.append(zlib.crc32(gram.encode("utf-8")) % n_features)
+    return tuple(features)
+
+
+class _CSRMatrix:
+    """Minimal read-only CSR matrix (matrix-vector product only) for loaded indexes without scipy"""
+
+    def __init__(self, data: np.ndarray, indices: np.ndarray, indptr: np.ndarray, shape: tuple):
+        self.data = data
+        self.indices = indices
+        self.indptr = indptr
+        self.shape = shape
+
+    def __matmul__(self, vector: np.ndarray) -> np.ndarray:
+        rows = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+        return np.bincount(rows, weights=self.data * vector[self.indices], minlength=self.shape[0])
+
+
+class VectorIndex:
+    """Hashed n-gram TF-IDF vectors with cosine similarity search
+
+    Documents are stored as one L2-normalized float32 matrix (scipy CSR
+    when available), so a query is scored against the whole corpus with
+    one matrix-vector product.
+    """
+
+    def __init__(self, documents: Iterable, n_features: int = 2 ** 18, use_sparse: bool = True):
+        """Build index
+
+        Args:
+            documents: Iterable of document texts (document id = position)
+            n_features: Size of hashed feature space
+            use_sparse: Store matrix in scipy CSR format (if scipy is installed)
+        """
+        self.use_sparse = use_sparse and sparse is not None
+        if not self.use_sparse:
+            # Dense matrix - keep rows small
+            n_features = min(n_features, DENSE_MAX_FEATURES)
+        self._build((hashed_features(text, n_features) for text in documents), n_features)
+
+    @classmethod
+    def from_features(cls, rows: np.ndarray, cols: np.ndarray, counts: np.ndarray, num_docs: int,
+                      n_features: int) -> "VectorIndex":
+        """Build index from precomputed hashed_features() counts as (doc_id, feature, count) triples
+
+        Args:
+            rows: Document id per entry (ascending)
+            cols: Feature index per entry
+            counts: Feature count per entry
+            num_docs: Number of documents
+            n_features: Size of hashed feature space the features were computed for
+
+        Returns:
+            VectorIndex
+        """
+        index = cls.__new__(cls)
+        index.use_sparse = sparse is not None
+        index._set_matrix(rows, cols, counts, num_docs, n_features)
+        return index
+
+    def _build(self, feature_counts: Iterable, n_features: int) -> None:
+        """Build normalized TF-IDF matrix from per-document feature counts"""
+        rows, cols, counts = [], [], []
+        num_docs = 0
+        for doc_id, features in enumerate(feature_counts):
+            num_docs += 1
+            rows.extend([doc_id] * len(features))
+            cols.extend(features.keys())
+            counts.extend(features.values())
+        self._set_matrix(np.asarray(rows, dtype=np.int32), np.asarray(cols, dtype=np.int32),
+                         np.asarray(counts, dtype=np.float32), num_docs, n_features)
+
+    def _set_matrix(self, rows: np.ndarray, cols: np.ndarray, counts: np.ndarray, num_docs: int,
+                    n_features: int) -> None:
+        """Weight counts with sublinear TF-IDF and store L2-normalized rows"""
+        self.n_features = n_features
+        doc_freq = np.bincount(cols, minlength=n_features).astype(np.float32)
+        self.idf = (np.log((1.0 + num_docs) / (1.0 + doc_freq)) + 1.0).astype(np.float32)
+        values = (1.0 + np.log(counts.astype(np.float32))) * self.idf[cols]
+
+        # L2-normalize document rows
+        norms = np.sqrt(np.bincount(rows, weights=values ** 2, minlength=num_docs)).astype(np.float32)
+        norms[norms == 0] = 1.0
+        values = (values / norms[rows]).astype(np.float32)
+
+        if self.use_sparse:
+            self.matrix = sparse.csr_matrix((values, (rows, cols)), shape=(num_docs, n_features), dtype=np.float32)
+        elif n_features <= DENSE_MAX_FEATURES:
+            self.matrix = np.zeros((num_docs, n_features), dtype=np.float32)
+            self.matrix[rows, cols] = values
+        else:
+            # Large feature space without scipy (rows are in document order)
+            indptr = np.zeros(num_docs + 1, dtype=np.int64)
+            indptr[1:] = np.cumsum(np.bincount(rows, minlength=num_docs))
+            self.matrix = _CSRMatrix(values, cols, indptr, (num_docs, n_features))
+
+    def arrays(self) -> dict:
+        """Index arrays for serialization (matrix in CSR form)
+
+        Returns:
+            Dictionary of numpy arrays
+        """
+        if self.use_sparse:
+            matrix = self.matrix
+            data, indices, indptr = matrix.data, matrix.indices, matrix.indptr
+        elif isinstance(self.matrix, _CSRMatrix):
+            data, indices, indptr = self.matrix.data, self.matrix.indices, self.matrix.indptr
+        else:
+            rows, indices = np.nonzero(self.matrix)
+            data = self.matrix[rows, indices]
+            indptr = np.zeros(self.matrix.shape[0] + 1, dtype=np.int64)
+            indptr[1:] = np.cumsum(np.bincount(rows, minlength=self.matrix.shape[0]))
+        return {"idf": self.idf, "data": data, "indices": indices, "indptr": indptr}
+
+    @classmethod
+    def from_arrays(cls, arrays: dict, num_docs: int) -> "VectorIndex":
+        """Restore index from serialized arrays (may be memory-mapped)
+
+        Args:
+            arrays: Arrays returned by arrays()
+            num_docs: Number of documents (matrix rows)
+
+        Returns:
+            VectorIndex
+        """
+        index = cls.__new__(cls)
+        index.idf = arrays["idf"]
+        index.n_features = len(index.idf)
+        index.use_sparse = sparse is not None
+        shape = (num_docs, index.n_features)
+        if index.use_sparse:
+            index.matrix = sparse.csr_matrix((arrays["data"], arrays["indices"], arrays["indptr"]), shape=shape)
+        else:
+            index.matrix = _CSRMatrix(arrays["data"], arrays["indices"], arrays["indptr"], shape)
+        return index
+
+    def query_vector(self, query: str) -> np.ndarray:
+        """L2-normalized TF-IDF vector of the query
+
+        Args:
+            query: Search query
+
+        Returns:
+            Dense float32 vector
+        """
+        counts = hashed_features(query, self.n_features)
+        features = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        weights = (1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts))))
+        weights *= self.idf[features]
+
+        norm = np.linalg.norm(weights)
+        vector = np.zeros(self.n_features, dtype=np.float32)
+        if norm:
+            vector[features] = weights / norm
+        return vector
+
+    def search(self, query: str, top_k: int = 3, min_score: float = 0.0) -> list:
+        """Rank documents by cosine similarity
+
+        Args:
+            query: Search query
+            top_k: Maximum number of results
+            min_score: Minimum similarity to include
+
+        Returns:
+            List of (doc_id, score) sorted by score descending
+        """
+        num_docs = self.matrix.shape[0]
+        if not num_docs:
+            return []
+
+        scores = np.asarray(self.matrix @ self.query_vector(query)).ravel()
+        k = min(top_k, num_docs)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(doc_id), float(scores[doc_id])) for doc_id in top if scores[doc_id] > min_score]
+
+
+class KBIndex:
+    """Passage corpus with its BM25 and vector indexes"""
+
+    def __init__(self, corpus, bm25: BM25Index, vectors: VectorIndex, manifest: Optional[dict] = None):
+        self.corpus = corpus
+        self.bm25 = bm25
+        self.vectors = vectors
+        self.manifest = manifest or {}
+        # Tokenized per-file segments kept for incremental rebuilds (kb_build.BuildCache)
+        self.build_cache = None
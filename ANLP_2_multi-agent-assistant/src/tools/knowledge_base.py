@@ -1,4 +1,12 @@
 # Mini Knowledge Base with tools
+import copy
+import threading
+import time
+from typing import Optional
+
+from src.config import KB_INDEX_DIR, KB_RELOAD_INTERVAL, KB_SOURCE_DIR
+from src.tools.kb_corpus import InMemoryCorpus
+from src.tools.kb_index import BM25Index, KBIndex, VectorIndex
 
 KB_DATA = {
     "MAS_patterns": {
@@ -35,24 +43,208 @@ KB_DATA = {
 }
 
 
-def query_knowledge_base(query: str) -> str:
+# Flat list of KB entries (category, key, text) - position is the document id
+KB_ENTRIES = [
+    (category, key, value)
+    for category, items in KB_DATA.items()
+    for key, value in items.items()
+]
+
+# Published index snapshot - replaced as a whole on reload, never modified in place.
+# Readers take the reference once per call, so a swap never affects a running query.
+_index = None
+_index_lock = threading.Lock()  # first load
+_reload_lock = threading.Lock()  # one rebuild at a time
+_watcher_stop = threading.Event()
+_watcher = None
+
+_metrics = {
+    "generation": 0,
+    "reloads": 0,
+    "last_reload_seconds": None,
+    "last_reload_at": None,
+    "last_error": None,
+}
+
+
+def _build_builtin_index() -> KBIndex:
+    """Index built-in KB_DATA in memory (category and key terms are indexed with the text)"""
+    corpus = InMemoryCorpus(KB_ENTRIES)
+    documents = [f"{category} {key} {value}" for category, key, value in KB_ENTRIES]
+    return KBIndex(corpus, BM25Index(documents), VectorIndex(documents))
+
+
+def _publish(index: KBIndex, seconds: float) -> None:
+    """Atomically replace the published index and update metrics"""
+    global _index
+    _index = index
+    _metrics["generation"] += 1
+    _metrics["last_reload_seconds"] = round(seconds, 4)
+    _metrics["last_reload_at"] = time.time()
+    _metrics["last_error"] = None
+
+
+def _get_index() -> KBIndex:
+    """KB index, loaded on first use
+
+    External corpus (KB_SOURCE_DIR) is served from the prebuilt mmap artifact
+    in KB_INDEX_DIR, which is rebuilt only when stale. Starts the reload
+    watcher when KB_RELOAD_INTERVAL is set.
+
+    Returns:
+        KBIndex
+    """
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                start = time.perf_counter()
+                if KB_SOURCE_DIR:
+                    # Imported here - src.tools.kb_build is also run as a script (python -m)
+                    from src.tools.kb_build import load_or_build
+                    _publish(load_or_build(KB_SOURCE_DIR, KB_INDEX_DIR, keep_cache=True),
+                             time.perf_counter() - start)
+                    if KB_RELOAD_INTERVAL > 0:
+                        start_index_watcher(KB_RELOAD_INTERVAL)
+                else:
+                    _publish(_build_builtin_index(), time.perf_counter() - start)
+    return _index
+
+
+def reload_index(force: bool = False) -> bool:
+    """Rebuild index from KB_SOURCE_DIR if the corpus changed and publish it
+
+    The new index is built incrementally (unchanged files reuse their passages
+    and counts) while queries keep using the current one.
+
+    Args:
+        force: Rebuild even if the corpus is unchanged
+
+    Returns:
+        True if a new index generation was published
+    """
+    if not KB_SOURCE_DIR:
+        return False
+
+    from src.tools.kb_build import is_stale, load_or_build
+
+    with _reload_lock:
+        current = _get_index()
+        # Checked on a copy and not written to disk: the live manifest is read by other threads,
+        # and the shared artifact is only written under artifact_lock (in load_or_build)
+        manifest = copy.deepcopy(current.manifest)
+        if not force and not is_stale(manifest, KB_SOURCE_DIR):
+            # Refreshed sizes/mtimes of touched files, so they are not hashed again next time
+            current.manifest = manifest
+            return False
+        start = time.perf_counter()
+        # Loads the shared artifact instead if another worker already rebuilt it
+        index = load_or_build(KB_SOURCE_DIR, KB_INDEX_DIR, previous=current, keep_cache=True, force=force)
+        _publish(index, time.perf_counter() - start)
+        _metrics["reloads"] += 1
+        return True
+
+
+def start_index_watcher(interval: float = KB_RELOAD_INTERVAL) -> Optional[threading.Thread]:
+    """Start background thread that polls KB_SOURCE_DIR and reloads the index
+
+    Args:
+        interval: Poll interval in seconds
+
+    Returns:
+        Watcher thread (None without external corpus or with interval <= 0)
+    """
+    global _watcher
+    if not KB_SOURCE_DIR or interval <= 0:
+        return None
+    if _watcher is not None and _watcher.is_alive():
+        return _watcher
+
+    def watch():
+        while not _watcher_stop.wait(interval):
+            try:
+                reload_index()
+            except Exception as e:
+                # Keep serving the current index
+                _metrics["last_error"] = f"{type(e).__name__}: {e}"
+
+    _watcher_stop.clear()
+    _watcher = threading.Thread(target=watch, name="kb-index-watcher", daemon=True)
+    _watcher.start()
+    return _watcher
+
+
+def stop_index_watcher() -> None:
+    """Stop background reload thread"""
+    _watcher_stop.set()
+
+
+def get_index_metrics() -> dict:
+    """Get index reload metrics
+
+    Returns:
+        Dictionary with generation, reloads, last_reload_seconds, last_reload_at,
+        last_error, num_passages and per-build file stats
+    """
+    index = _index
+    metrics = dict(_metrics)
+    if index is not None:
+        metrics["num_passages"] = len(index.corpus)
+        for key in ("reused_files", "rebuilt_files", "build_seconds"):
+            if key in index.manifest:
+                metrics[key] = index.manifest[key]
+    return metrics
+
+
+# Minimum cosine similarity for semantic matches
+SEMANTIC_MIN_SCORE = 0.1
+
+# Reciprocal rank fusion constant for hybrid mode
+RRF_K = 60
+
+
+def _rank(index: KBIndex, query: str, top_k: int, mode: str) -> list:
+    """Ranked KB document ids for query
+
+    Args:
+        index: Index snapshot
+        query: Search query
+        top_k: Maximum number of results
+        mode: "bm25", "semantic" or "hybrid" (reciprocal rank fusion of both)
+
+    Returns:
+        List of document ids
+    """
+    if mode == "bm25":
+        return [doc_id for doc_id, _ in index.bm25.search(query, top_k)]
+    if mode == "semantic":
+        return [doc_id for doc_id, _ in index.vectors.search(query, top_k, SEMANTIC_MIN_SCORE)]
+    if mode != "hybrid":
+        raise ValueError(f"Unknown retrieval mode: {mode}")
+
+    fused = {}
+    for ranking in (_rank(index, query, top_k, "bm25"), _rank(index, query, top_k, "semantic")):
+        for position, doc_id in enumerate(ranking):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (RRF_K + position + 1)
+    return sorted(fused, key=fused.get, reverse=True)[:top_k]
+
+
+def query_knowledge_base(query: str, top_k: int = 3, mode: str = "bm25") -> str:
     """Search in knowledge base
 
     Args:
         query: Search query
+        top_k: Maximum number of entries to return
+        mode: "bm25" (inverted index), "semantic" (TF-IDF vectors) or "hybrid"
 
     Returns:
         Found results or message about no data available
     """
+    index = _get_index()
     results = []
-    query_lower = query.lower()
-
-    # Search by keywords
-    for category, items in KB_DATA.items():
-        for key, value in items.items():
-            if query_lower in key.lower() or query_lower in value.lower():
-                results.append(f"[{category}/{key}]: {value}")
-    
+    for doc_id in _rank(index, query, top_k, mode):
+        category, key = index.corpus.topic(doc_id)
+        results.append(f"[{category}/{key}]: {index.corpus.text(doc_id)}")
+
     return "\n\n".join(results) if results else "Information not found in KB"
 
 
@@ -74,9 +266,10 @@ def get_all_topics() -> list:
     Returns:
         List of all categories and topics
     """
+    corpus = _get_index().corpus
     topics = []
-    for category, items in KB_DATA.items():
-        for key in items.keys():
-            topics.append(f"{category}/{key}")
+    for doc_id in range(len(corpus)):
+        category, key = corpus.topic(doc_id)
+        topics.append(f"{category}/{key}")
     return topics
 
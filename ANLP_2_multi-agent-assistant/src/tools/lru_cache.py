@@ -0,0 +1,149 @@
+# In-process LRU cache with TTL and hit/miss statistics
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe bounded LRU cache with optional time-to-live"""
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None,
+                 on_evict: Optional[Callable[[Hashable, Any], None]] = None, sliding: bool = False):
+        """Initialize cache
+
+        Args:
+            max_size: Maximum number of entries (0 disables caching)
+            ttl: Entry lifetime in seconds (None - no expiration)
+            on_evict: Called with (key, value) for entries dropped by size limit
+                or expiration (not for pop/clear); runs outside the cache lock
+            sliding: Hits restart the entry lifetime (ttl becomes an idle timeout)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.sliding = sliding
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get value and mark it as recently used
+
+        Args:
+            key: Cache key
+            default: Value returned on miss
+
+        Returns:
+            Cached value or default
+        """
+        expired = _MISSING
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                stored_at, value = entry
+                now = time.monotonic()
+                if self.ttl is None or now - stored_at < self.ttl:
+                    if self.sliding:
+                        self._data[key] = (now, value)
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                # Expired
+                del self._data[key]
+                expired = value
+            self.misses += 1
+        if expired is not _MISSING:
+            self._evicted([(key, expired)])
+        return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store value, evicting least recently used entries
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        if self.max_size <= 0:
+            return
+        evicted = []
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                old_key, (_, old_value) = self._data.popitem(last=False)
+                evicted.append((old_key, old_value))
+        self._evicted(evicted)
+
+    def expire(self) -> int:
+        """Drop all expired entries
+
+        With sliding expiration entries are ordered by last use, so the scan
+        stops at the first live one.
+
+        Returns:
+            Number of dropped entries
+        """
+        if self.ttl is None:
+            return 0
+        evicted = []
+        with self._lock:
+            deadline = time.monotonic() - self.ttl
+            for key, (stored_at, value) in self._data.items():
+                if stored_at < deadline:
+                    evicted.append((key, value))
+                elif self.sliding:
+                    break
+            for key, _ in evicted:
+                del self._data[key]
+        self._evicted(evicted)
+        return len(evicted)
+
+    def _evicted(self, entries: list) -> None:
+        """Report dropped entries to on_evict"""
+        if self.on_evict is not None:
+            for key, value in entries:
+                self.on_evict(key, value)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove entry without touching statistics
+
+        Args:
+            key: Cache key
+            default: Value returned if key is absent
+
+        Returns:
+            Removed value or default
+        """
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+            return default if entry is _MISSING else entry[1]
+
+    def clear(self) -> None:
+        """Remove all entries and reset statistics"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Get cache statistics
+
+        Returns:
+            Dictionary with hits, misses, hit_rate and size
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "size": len(self._data),
+                "max_size": self.max_size,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
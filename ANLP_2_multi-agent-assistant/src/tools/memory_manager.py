@@ -1,47 +1,176 @@
 # Session memory management
 from datetime import datetime
 from typing import Optional, Any
-import json
-import os
+import threading
 
+from src.config import (
+    MEMORY_BACKEND, MEMORY_COMPACT_EVENTS, MEMORY_FLUSH_INTERVAL, MEMORY_FLUSH_MAX_EVENTS,
+    MEMORY_IDLE_TIMEOUT, MEMORY_LOAD_WINDOW, MEMORY_MAX_NOTES, MEMORY_MAX_QUERIES, MEMORY_PATH, MEMORY_POOL_SIZE,
+    MEMORY_WRITE_BEHIND
+)
 from src.models import SessionMemory, Query
+from src.tools.lru_cache import LRUCache
+from src.tools.memory_store import MemoryStore, apply_event, create_store
 
-MEMORY_FILE = "session_memory.json"
+# Stored answer prefix per query (answers are kept for history recall, not for display)
+MAX_ANSWER_CHARS = 2000
+
+_default_store = None
+_default_store_lock = threading.Lock()
+_session_pool = None
+
+
+def get_default_store() -> MemoryStore:
+    """Process-wide store configured by MEMORY_BACKEND / MEMORY_PATH
+
+    Returns:
+        MemoryStore
+    """
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = create_store(
+                    MEMORY_BACKEND, MEMORY_PATH, MEMORY_COMPACT_EVENTS,
+                    write_behind=MEMORY_WRITE_BEHIND,
+                    flush_interval=MEMORY_FLUSH_INTERVAL,
+                    flush_max_events=MEMORY_FLUSH_MAX_EVENTS,
+                )
+    return _default_store
+
+
+def format_similar_queries(similar: list, answer_chars: int = 200) -> str:
+    """Format similar_queries() result for prompts
+
+    Args:
+        similar: List of (Query, score)
+        answer_chars: Answer prefix shown per query
+
+    Returns:
+        Formatted lines, oldest query first
+    """
+    if not similar:
+        return "No related queries in history"
+    lines = []
+    for q, _ in sorted(similar, key=lambda item: item[0].timestamp):
+        lines.append(f"- [{q.timestamp}] ({q.agent_route or 'unknown'}): {q.text}")
+        if q.answer:
+            answer = " ".join(q.answer.split())
+            lines.append(f"  Answer: {answer[:answer_chars]}{'...' if len(answer) > answer_chars else ''}")
+    return "\n".join(lines)
 
 
 class MemoryManager:
     """Session memory manager for multi-agent system"""
 
-    def __init__(self, session_id: str = "default"):
+    def __init__(self, session_id: str = "default", store: Optional[MemoryStore] = None,
+                 max_queries: int = MEMORY_MAX_QUERIES, max_notes: int = MEMORY_MAX_NOTES,
+                 load_window: int = MEMORY_LOAD_WINDOW):
         """Initialize memory manager
 
         Args:
             session_id: Session identifier
+            store: Storage backend (default: configured process-wide store)
+            max_queries: Queries kept as full records, older ones only count in the summary (0 - all)
+            max_notes: Notes kept, older ones only count in the summary (0 - all)
+            load_window: Newest queries loaded from an indexed store, older ones are
+                loaded on the first similar-history search (0 - all)
         """
         self.session_id = session_id
+        self.store = store or get_default_store()
+        self.max_queries = max_queries
+        self.max_notes = max_notes
+        self.load_window = load_window
+        self.version = None
         self.memory = self._load_memory()
+        # Pooled managers are shared between requests of the session
+        self._lock = threading.Lock()
 
     def _load_memory(self) -> SessionMemory:
-        """Load memory from file or create new
+        """Load session memory from store (and remember its version)
 
         Returns:
             SessionMemory object
         """
-        if os.path.exists(MEMORY_FILE):
-            try:
-                with open(MEMORY_FILE, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                return SessionMemory(**data)
-            except (json.JSONDecodeError, Exception):
-                return SessionMemory(session_id=self.session_id)
-        return SessionMemory(session_id=self.session_id)
+        memory, self.version = self.store.load_versioned(self.session_id, self.load_window)
+        return memory
+
+    def refresh(self) -> bool:
+        """Reload memory if the stored session changed since it was loaded (e.g. by another process)
 
-    def add_query(self, query_text: str, agent_route: Optional[str] = None) -> Query:
+        Returns:
+            True if memory was reloaded
+        """
+        with self._lock:
+            if self.version is None:
+                return False
+            current = self.store.version(self.session_id)
+            if current is None or current == self.version:
+                return False
+            self._catch_up()
+            return True
+
+    def _catch_up(self) -> None:
+        """Apply events stored since self.version - only the new ones (lock held)
+
+        Falls back to reloading the session if the store cannot list them
+        (e.g. they were compacted meanwhile).
+        """
+        events = self.store.events_since(self.session_id, self.version)
+        if events is None:
+            self.memory = self._load_memory()
+            return
+        for event in events:
+            apply_event(self.memory, event)
+            self.version = event["seq"]
+
+    def _record(self, event: dict) -> None:
+        """Apply event to memory and persist it (with a retention trim if a limit is exceeded)
+
+        Args:
+            event: Event with "op" and its fields
+        """
+        with self._lock:
+            events = [event]
+            queries = self.memory.unloaded_queries + len(self.memory.queries) + (event["op"] == "add_query")
+            notes = len(self.memory.notes) + (event["op"] == "add_note")
+            if 0 < self.max_queries < queries or 0 < self.max_notes < notes:
+                events.append({"op": "trim", "max_queries": self.max_queries, "max_notes": self.max_notes})
+            # Applied after the write, so memory follows the stored order
+            version = self.store.append(self.session_id, events)
+            if version is not None and self.version is not None and version != self.version + len(events):
+                # Optimistic check failed - other processes wrote meanwhile, apply their events and ours in order
+                self._catch_up()
+            else:
+                for stored in events:
+                    apply_event(self.memory, stored)
+                self.version = version
+
+    def recent_queries(self, n: int, agent_route: Optional[str] = None) -> list:
+        """Last n queries (optionally of one agent), oldest first
+
+        Locked - pooled sessions are read and written by concurrent requests.
+
+        Args:
+            n: Maximum number of queries
+            agent_route: Only queries processed by this agent
+
+        Returns:
+            List of Query
+        """
+        with self._lock:
+            if self.store.indexed_queries:
+                return self.store.recent_queries(self.session_id, n, agent_route)
+            return self.memory.recent_queries(n, agent_route)
+
+    def add_query(self, query_text: str, agent_route: Optional[str] = None,
+                  answer: Optional[str] = None) -> Query:
         """Add query to history
 
         Args:
             query_text: Query text
             agent_route: Agent that processed the query
+            answer: Final answer (stored truncated to MAX_ANSWER_CHARS)
 
         Returns:
             Created Query object
@@ -49,10 +178,10 @@ class MemoryManager:
         query = Query(
             text=query_text,
             timestamp=datetime.now().isoformat(),
-            agent_route=agent_route
+            agent_route=agent_route,
+            answer=answer[:MAX_ANSWER_CHARS] if answer else None
         )
-        self.memory.queries.append(query)
-        self._save_memory()
+        self._record({"op": "add_query", "query": query.model_dump()})
         return query
     
     def add_note(self, note: str) -> None:
@@ -61,8 +190,7 @@ class MemoryManager:
         Args:
             note: Note text
         """
-        self.memory.notes.append(note)
-        self._save_memory()
+        self._record({"op": "add_note", "note": note})
 
     def retrieve_history(self, last_n: int = 5) -> str:
         """Get last N queries
@@ -73,29 +201,54 @@ class MemoryManager:
         Returns:
             Formatted line with query history
         """
-        recent = self.memory.queries[-last_n:]
+        recent = self.recent_queries(last_n)
         if not recent:
             return "Query history is empty"
         return "\n".join([f"- [{q.timestamp}] ({q.agent_route or 'unknown'}): {q.text}" for q in recent])
 
+    def similar_queries(self, text: str, top_k: int = 3) -> list:
+        """Past queries most similar to text (locked - safe while other requests write the session)
+
+        Args:
+            text: Text to compare with (usually the current query)
+            top_k: Maximum number of queries
+
+        Returns:
+            List of (Query, score) sorted by score descending
+        """
+        with self._lock:
+            if self.memory.unloaded_queries:
+                # Search covers the whole history - load the older turns from the store (once)
+                self.load_window = 0
+                self.memory = self._load_memory()
+            return self.memory.similar_queries(text, top_k) if self.memory.queries else []
+
+    def search_history(self, text: str, top_k: int = 3) -> str:
+        """Get past queries most similar to text
+
+        Args:
+            text: Text to compare with (usually the current query)
+            top_k: Maximum number of queries
+
+        Returns:
+            Formatted line with similar queries (oldest first)
+        """
+        return format_similar_queries(self.similar_queries(text, top_k))
+
     def get_session_summary(self) -> dict:
         """Get session summary
 
         Returns:
             Dictionary with session information
         """
-        agent_counts = {}
-        for q in self.memory.queries:
-            route = q.agent_route or "unknown"
-            agent_counts[route] = agent_counts.get(route, 0) + 1
-        
-        return {
-            "session_id": self.memory.session_id,
-            "total_queries": len(self.memory.queries),
-            "total_notes": len(self.memory.notes),
-            "queries_by_agent": agent_counts,
-            "has_user_profile": bool(self.memory.user_profile)
-        }
+        with self._lock:
+            return {
+                "session_id": self.memory.session_id,
+                "total_queries": self.memory.archived_queries + len(self.memory.queries),
+                "total_notes": self.memory.archived_notes + len(self.memory.notes),
+                "queries_by_agent": self.memory.route_counts(),
+                "has_user_profile": bool(self.memory.user_profile)
+            }
     
     def update_user_profile(self, key: str, value: any) -> None:
         """Update user profile
@@ -104,18 +257,15 @@ class MemoryManager:
             key: Profile key
             value: Value
         """
-        self.memory.user_profile[key] = value
-        self._save_memory()
+        self._record({"op": "update_profile", "key": key, "value": value})
 
     def clear_history(self) -> None:
         """Clear query history"""
-        self.memory.queries = []
-        self._save_memory()
+        self._record({"op": "clear_history"})
 
-    def _save_memory(self) -> None:
-        """Save memory to file"""
-        with open(MEMORY_FILE, 'w', encoding='utf-8') as f:
-            json.dump(self.memory.model_dump(), f, indent=2, ensure_ascii=False)
+    def compact(self) -> None:
+        """Compact stored events of this session"""
+        self.store.compact(self.session_id)
 
     def get_context_for_agent(self, agent_name: str, max_items: int = 3) -> str:
         """Get relevant context for agent
@@ -128,8 +278,7 @@ class MemoryManager:
             Context for agent
         """
         # Get queries processed by this agent
-        agent_queries = [q for q in self.memory.queries if q.agent_route == agent_name]
-        recent = agent_queries[-max_items:] if agent_queries else []
+        recent = self.recent_queries(max_items, agent_route=agent_name)
 
         if not recent:
             return f"First interaction with agent {agent_name}"
@@ -140,3 +289,92 @@ class MemoryManager:
 
         return "\n".join(context_lines)
 
+
+
+class SessionPool:
+    """Process-wide LRU pool of loaded MemoryManager instances
+
+    Back-to-back queries of a session reuse the loaded memory instead of
+    reading it from the store again. Sessions pushed out by the size limit
+    or idle longer than idle_timeout are flushed to the store and dropped.
+    """
+
+    def __init__(self, max_sessions: int = 256, idle_timeout: Optional[float] = 600.0,
+                 store: Optional[MemoryStore] = None):
+        """Initialize pool
+
+        Args:
+            max_sessions: Maximum number of loaded sessions (0 - always load)
+            idle_timeout: Seconds since last use before a session is dropped (None - never)
+            store: Storage backend (default: configured process-wide store)
+        """
+        self.store = store
+        self._cache = LRUCache(max_sessions, ttl=idle_timeout, on_evict=self._evicted, sliding=True)
+        self._loading = {}  # session_id -> lock held while the session is loaded
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> MemoryManager:
+        """Get loaded session, loading it from the store on miss
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            MemoryManager shared by all users of the session
+        """
+        self._cache.expire()
+        manager = self._cache.get(session_id)
+        if manager is None:
+            # Loads of different sessions run concurrently, one load per session
+            with self._lock:
+                loading = self._loading.setdefault(session_id, threading.Lock())
+            with loading:
+                manager = self._cache.get(session_id)  # loaded while we waited
+                if manager is None:
+                    manager = MemoryManager(session_id, store=self.store)
+                    self._cache.put(session_id, manager)
+            with self._lock:
+                self._loading.pop(session_id, None)
+            return manager
+        # Pick up writes of other worker processes
+        manager.refresh()
+        return manager
+
+    def _evicted(self, session_id: str, manager: MemoryManager) -> None:
+        """Persist buffered writes of a dropped session"""
+        manager.store.flush()
+
+    def evict_idle(self) -> int:
+        """Flush and drop sessions idle longer than idle_timeout
+
+        Returns:
+            Number of dropped sessions
+        """
+        return self._cache.expire()
+
+    def clear(self) -> None:
+        """Flush stores and drop all sessions"""
+        self._cache.clear()
+        (self.store or get_default_store()).flush()
+
+    def stats(self) -> dict:
+        """Get pool statistics
+
+        Returns:
+            Dictionary with hits, misses, hit_rate, size and max_size
+        """
+        return self._cache.stats()
+
+
+def get_session_pool() -> SessionPool:
+    """Process-wide session pool configured by MEMORY_POOL_SIZE / MEMORY_IDLE_TIMEOUT
+
+    Returns:
+        SessionPool
+    """
+    global _session_pool
+    if _session_pool is None:
+        with _default_store_lock:
+            if _session_pool is None:
+                _session_pool = SessionPool(MEMORY_POOL_SIZE, MEMORY_IDLE_TIMEOUT or None)
+    return _session_pool
@@ -0,0 +1,789 @@
+# Storage backends for session memory
+import atexit
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from urllib.parse import quote
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows - only in-process locking is used there
+    fcntl = None
+
+from src.models import SessionMemory, Query
+
+# Single-file memory of earlier versions (imported into the JSON store on first load)
+LEGACY_MEMORY_FILE = "session_memory.json"
+
+
+def apply_event(memory: SessionMemory, event: dict) -> SessionMemory:
+    """Apply memory event to memory
+
+    Args:
+        memory: Session memory (modified in place)
+        event: Event with "op" and its fields
+
+    Returns:
+        Updated memory
+    """
+    op = event.get("op")
+    if op == "add_query":
+        memory.add_query(Query(**event["query"]))
+    elif op == "add_note":
+        memory.notes.append(event["note"])
+    elif op == "update_profile":
+        memory.user_profile[event["key"]] = event["value"]
+    elif op == "clear_history":
+        memory.queries = []
+        memory.archived_queries = 0
+        memory.archived_routes = {}
+        memory.unloaded_queries = 0
+    elif op == "trim":
+        memory.trim(event.get("max_queries", 0), event.get("max_notes", 0))
+    return memory
+
+
+@contextmanager
+def file_lock(path: str, exclusive: bool = True) -> Iterator[None]:
+    """Advisory inter-process lock on a lock file (no-op without fcntl)
+
+    Args:
+        path: Lock file (created if missing)
+        exclusive: Exclusive (write) lock, otherwise shared (read) lock
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(path, "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _file_stat(path: str) -> Optional[tuple]:
+    """(inode, size, mtime) of file, None if missing"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def _atomic_write(path: str, text: str) -> None:
+    """Replace file with text via fsynced temporary file and rename"""
+    fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+
+class MemoryStore:
+    """Storage backend interface for MemoryManager
+
+    Mutations are passed as events (see apply_event), so a backend can
+    persist them without rewriting the whole session.
+    """
+
+    # recent_queries() is an indexed lookup (otherwise MemoryManager reads its loaded copy)
+    indexed_queries = False
+
+    def load(self, session_id: str) -> SessionMemory:
+        """Load session memory
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            SessionMemory (empty for a new session)
+        """
+        raise NotImplementedError
+
+    def load_versioned(self, session_id: str, recent: int = 0) -> tuple:
+        """Load session memory together with its version
+
+        Args:
+            session_id: Session identifier
+            recent: Load only the newest queries (0 - all). Honored by indexed
+                stores only; older queries are then counted in the archive
+                aggregates and SessionMemory.unloaded_queries
+
+        Returns:
+            (SessionMemory, version) - version is None for unversioned stores
+        """
+        return self.load(session_id), None
+
+    def version(self, session_id: str) -> Optional[int]:
+        """Current session version - grows by one per stored event, whichever process wrote it
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Version, None if not tracked
+        """
+        return None
+
+    def events_since(self, session_id: str, version: int) -> Optional[list]:
+        """Stored events newer than version, in order
+
+        Lets a loaded session catch up with writes of other processes
+        without reloading it.
+
+        Args:
+            session_id: Session identifier
+            version: Version the caller's memory is at
+
+        Returns:
+            Events (with "seq" - the version after each event), None if not
+            available (the caller reloads the session)
+        """
+        return None
+
+    def append(self, session_id: str, events: list) -> Optional[int]:
+        """Persist memory events
+
+        Args:
+            session_id: Session identifier
+            events: Events in order
+
+        Returns:
+            Session version after the write (None if not tracked)
+        """
+        raise NotImplementedError
+
+    def append_batch(self, batches: dict) -> None:
+        """Persist events of several sessions
+
+        Args:
+            batches: {session_id: events in order}
+        """
+        for session_id, events in batches.items():
+            self.append(session_id, events)
+
+    def flush(self) -> None:
+        """Persist buffered writes (no-op for unbuffered stores)"""
+
+    def recent_queries(self, session_id: str, n: int, agent_route: Optional[str] = None) -> list:
+        """Last n queries of session, oldest first
+
+        Args:
+            session_id: Session identifier
+            n: Maximum number of queries
+            agent_route: Only queries processed by this agent
+
+        Returns:
+            List of Query
+        """
+        return self.load(session_id).recent_queries(n, agent_route)
+
+    def compact(self, session_id: str) -> None:
+        """Compact stored events of session (no-op if not applicable)"""
+
+    def close(self) -> None:
+        """Release resources"""
+
+
+class JSONMemoryStore(MemoryStore):
+    """One snapshot file plus append-only JSONL journal per session
+
+    Writes append one line per event; every compact_events events the
+    session is compacted into its snapshot and the journal is emptied.
+
+    Several processes can share the directory: each session has an
+    advisory lock file (shared for reads, exclusive for writes), snapshot
+    and journal are replaced atomically. Each process remembers how far it
+    has read the journal (byte offset and sequence number), so writes of
+    other processes are picked up by reading only the journal tail; the
+    whole session is re-read only after another process compacted it.
+    """
+
+    def __init__(self, directory: str = "session_memory", compact_events: int = 200, fsync: bool = False):
+        """
+        Args:
+            directory: Directory for session files
+            compact_events: Journal events before compaction (0 disables)
+            fsync: fsync journal after each append
+        """
+        self.directory = directory
+        self.compact_events = compact_events
+        self.fsync = fsync
+        # session_id -> journal position after our last access: seq (last event sequence number),
+        # base_seq (snapshot sequence number), lines (events in journal), offset (bytes read),
+        # ends ({seq: byte offset after the event}), stats (snapshot and journal stat)
+        self._state = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, session_id: str) -> tuple:
+        """Snapshot, journal and lock file of session"""
+        name = os.path.join(self.directory, quote(session_id, safe=""))
+        return f"{name}.json", f"{name}.journal.jsonl", f"{name}.lock"
+
+    def _read(self, session_id: str) -> tuple:
+        """Replay snapshot and journal (file lock held)
+
+        Returns:
+            (SessionMemory, journal position - see _state)
+        """
+        snapshot_file, journal_file, _ = self._paths(session_id)
+        memory, seq = SessionMemory(session_id=session_id), 0
+
+        if os.path.exists(snapshot_file):
+            # Snapshots are replaced atomically - a damaged one is an error, not an empty session
+            with open(snapshot_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            memory = SessionMemory(**data)
+            seq = data.get("journal_seq", 0)
+        elif not os.path.exists(journal_file):
+            memory = self._read_legacy(session_id) or memory
+
+        state = self._position(session_id, seq)
+        for event in self._read_journal(journal_file, state):
+            apply_event(memory, event)
+        return memory, state
+
+    def _position(self, session_id: str, seq: int) -> dict:
+        """Journal position at the start of the journal after snapshot sequence number seq"""
+        snapshot_file, journal_file, _ = self._paths(session_id)
+        return {"seq": seq, "base_seq": seq, "lines": 0, "offset": 0, "ends": {},
+                "stats": (_file_stat(snapshot_file), _file_stat(journal_file))}
+
+    @staticmethod
+    def _read_journal(journal_file: str, state: dict) -> list:
+        """Read journal from state["offset"] to its end and advance state (file lock held)
+
+        Args:
+            journal_file: Journal path
+            state: Journal position (see _state), updated in place
+
+        Returns:
+            Events newer than state["seq"] (as it was on entry), in order
+        """
+        events = []
+        offset = state["offset"]
+        try:
+            with open(journal_file, 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    offset += len(line)
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn last line of an interrupted write
+                        continue
+                    state["lines"] += 1
+                    # Events up to the snapshot sequence are already in it (crash during compaction)
+                    if event.get("seq", 0) > state["seq"]:
+                        events.append(event)
+                        state["seq"] = event["seq"]
+                        state["ends"][event["seq"]] = offset
+        except FileNotFoundError:
+            pass
+        state["offset"] = offset
+        return events
+
+    @staticmethod
+    def _read_legacy(session_id: str) -> Optional[SessionMemory]:
+        """Session memory from LEGACY_MEMORY_FILE, None if absent or of another session"""
+        if not os.path.exists(LEGACY_MEMORY_FILE):
+            return None
+        try:
+            with open(LEGACY_MEMORY_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("session_id") == session_id:
+                return SessionMemory(**data)
+        except (json.JSONDecodeError, Exception):
+            pass
+        return None
+
+    def _import_legacy(self, session_id: str) -> None:
+        """Persist legacy memory as the snapshot of a session without files (exclusive lock held)
+
+        Otherwise the first journal event would hide the legacy file from
+        later loads.
+        """
+        snapshot_file, journal_file, _ = self._paths(session_id)
+        if os.path.exists(snapshot_file) or os.path.exists(journal_file):
+            return
+        memory = self._read_legacy(session_id)
+        if memory is not None:
+            data = memory.model_dump()
+            data["journal_seq"] = 0
+            _atomic_write(snapshot_file, json.dumps(data, indent=2, ensure_ascii=False))
+
+    def _sync(self, session_id: str) -> dict:
+        """Journal position, caught up with writes of other processes (file lock held)
+
+        A journal that only grew since our last access is read from the
+        remembered offset; after a compaction (new snapshot or journal file)
+        the session is re-read.
+
+        Returns:
+            Journal position (see _state)
+        """
+        snapshot_file, journal_file, _ = self._paths(session_id)
+        stats = (_file_stat(snapshot_file), _file_stat(journal_file))
+        state = self._state.get(session_id)
+        if state is not None and state["stats"] != stats:
+            (old_snapshot, old_journal), journal_stat = state["stats"], stats[1]
+            if (stats[0] == old_snapshot and journal_stat is not None and old_journal is not None
+                    and journal_stat[0] == old_journal[0] and journal_stat[1] >= state["offset"]):
+                self._read_journal(journal_file, state)
+                state["stats"] = stats
+            else:
+                state = None
+        if state is None:
+            _, state = self._read(session_id)
+            self._state[session_id] = state
+        return state
+
+    def load(self, session_id: str) -> SessionMemory:
+        return self.load_versioned(session_id)[0]
+
+    def load_versioned(self, session_id: str, recent: int = 0) -> tuple:
+        with self._lock, file_lock(self._paths(session_id)[2], exclusive=False):
+            memory, state = self._read(session_id)
+            self._state[session_id] = state
+        return memory, state["seq"]
+
+    def version(self, session_id: str) -> int:
+        with self._lock, file_lock(self._paths(session_id)[2], exclusive=False):
+            return self._sync(session_id)["seq"]
+
+    def events_since(self, session_id: str, version: int) -> Optional[list]:
+        _, journal_file, lock_file = self._paths(session_id)
+        with self._lock, file_lock(lock_file, exclusive=False):
+            state = self._sync(session_id)
+            if version == state["seq"]:
+                return []
+            if not state["base_seq"] <= version < state["seq"]:
+                # Already compacted into the snapshot - the caller reloads
+                return None
+            tail = {"seq": version, "lines": 0, "offset": state["ends"].get(version, 0), "ends": {}}
+            return self._read_journal(journal_file, tail)
+
+    def append(self, session_id: str, events: list) -> int:
+        snapshot_file, journal_file, lock_file = self._paths(session_id)
+        with self._lock, file_lock(lock_file):
+            self._import_legacy(session_id)
+            state = self._sync(session_id)
+
+            lines = []
+            for event in events:
+                state["seq"] += 1
+                lines.append(json.dumps(dict(event, seq=state["seq"]), ensure_ascii=False).encode("utf-8") + b"\n")
+            with open(journal_file, 'ab') as f:
+                f.write(b"".join(lines))
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            for i, line in enumerate(lines):
+                state["offset"] += len(line)
+                state["ends"][state["seq"] - len(lines) + 1 + i] = state["offset"]
+            state["lines"] += len(lines)
+            state["stats"] = (_file_stat(snapshot_file), _file_stat(journal_file))
+
+            if 0 < self.compact_events <= state["lines"]:
+                self._compact(session_id)
+            return state["seq"]
+
+    def compact(self, session_id: str) -> None:
+        with self._lock, file_lock(self._paths(session_id)[2]):
+            self._compact(session_id)
+
+    def _compact(self, session_id: str) -> None:
+        """Write snapshot and empty journal (locks held)
+
+        Both files are replaced by renaming fsynced temporary files. If the
+        process stops in between, events already contained in the snapshot
+        are skipped on replay by their sequence number. The new journal is
+        a new file, so other processes notice the change by its stat.
+        """
+        snapshot_file, journal_file, _ = self._paths(session_id)
+        memory, state = self._read(session_id)
+        data = memory.model_dump()
+        data["journal_seq"] = state["seq"]
+        _atomic_write(snapshot_file, json.dumps(data, indent=2, ensure_ascii=False))
+        _atomic_write(journal_file, "")
+        self._state[session_id] = self._position(session_id, state["seq"])
+
+
+class SQLiteMemoryStore(MemoryStore):
+    """SQLite backend - queries, notes and profile tables keyed by session
+
+    Queries are indexed by (session_id, timestamp) and
+    (session_id, agent_route, timestamp), so history and per-agent context
+    lookups read only the requested rows. Writes take the database write
+    lock up front (BEGIN IMMEDIATE) and bump a per-session version, so
+    several processes can share one database file.
+    """
+
+    indexed_queries = True
+
+    # Ids of session queries older than the newest N (parameters: session_id, N)
+    _OLDER_QUERIES = ("SELECT id FROM queries WHERE session_id = ? "
+                      "ORDER BY timestamp DESC, id DESC LIMIT -1 OFFSET ?")
+
+    def __init__(self, path: str = "session_memory.sqlite"):
+        """Open (or create) database
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS queries ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+                "timestamp TEXT NOT NULL, text TEXT NOT NULL, agent_route TEXT, answer TEXT)"
+            )
+            # Databases created before answers were stored
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(queries)")]
+            if "answer" not in columns:
+                self._conn.execute("ALTER TABLE queries ADD COLUMN answer TEXT")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_queries_session_time ON queries (session_id, timestamp)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_queries_session_route ON queries (session_id, agent_route, timestamp)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS notes ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, note TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_notes_session ON notes (session_id)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS profile ("
+                "session_id TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "PRIMARY KEY (session_id, key))"
+            )
+            # Retention aggregates: kind "queries" (key - route) or "notes" (key "")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS archive ("
+                "session_id TEXT NOT NULL, kind TEXT NOT NULL, key TEXT NOT NULL, count INTEGER NOT NULL, "
+                "PRIMARY KEY (session_id, kind, key))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS versions (session_id TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+
+    @staticmethod
+    def _query(row: tuple) -> Query:
+        """Query from (timestamp, text, agent_route, answer) row"""
+        return Query(timestamp=row[0], text=row[1], agent_route=row[2], answer=row[3])
+
+    def load(self, session_id: str) -> SessionMemory:
+        return self.load_versioned(session_id)[0]
+
+    def load_versioned(self, session_id: str, recent: int = 0) -> tuple:
+        with self._lock:
+            # One read transaction - all tables from the same database snapshot
+            self._conn.execute("BEGIN")
+            try:
+                queries, unloaded, notes, profile, archive, version = self._select_session(session_id, recent)
+            finally:
+                self._conn.commit()
+
+        archived_routes = {key: count for kind, key, count in archive if kind == "queries"}
+        for key, count in unloaded:
+            archived_routes[key] = archived_routes.get(key, 0) + count
+        memory = SessionMemory(
+            session_id=session_id,
+            queries=[self._query(row) for row in queries],
+            notes=[row[0] for row in notes],
+            user_profile={key: json.loads(value) for key, value in profile},
+            archived_queries=sum(archived_routes.values()),
+            archived_routes=archived_routes,
+            archived_notes=sum(count for kind, _, count in archive if kind == "notes"),
+            unloaded_queries=sum(count for _, count in unloaded),
+        )
+        return memory, version
+
+    def _select_session(self, session_id: str, recent: int = 0) -> tuple:
+        """Rows of session (lock and transaction held)
+
+        With recent > 0 only the newest queries are selected; older ones
+        are returned as (route, count) pairs.
+        """
+        if recent > 0:
+            queries = self._conn.execute(
+                "SELECT timestamp, text, agent_route, answer FROM queries WHERE session_id = ? "
+                "ORDER BY timestamp DESC, id DESC LIMIT ?",
+                (session_id, recent)
+            ).fetchall()[::-1]
+            unloaded = self._conn.execute(
+                f"SELECT COALESCE(agent_route, 'unknown'), COUNT(*) FROM queries WHERE id IN ({self._OLDER_QUERIES}) "
+                "GROUP BY 1", (session_id, recent)
+            ).fetchall()
+        else:
+            queries = self._conn.execute(
+                "SELECT timestamp, text, agent_route, answer FROM queries WHERE session_id = ? ORDER BY timestamp, id",
+                (session_id,)
+            ).fetchall()
+            unloaded = []
+        notes = self._conn.execute(
+            "SELECT note FROM notes WHERE session_id = ? ORDER BY id", (session_id,)
+        ).fetchall()
+        profile = self._conn.execute(
+            "SELECT key, value FROM profile WHERE session_id = ?", (session_id,)
+        ).fetchall()
+        archive = self._conn.execute(
+            "SELECT kind, key, count FROM archive WHERE session_id = ?", (session_id,)
+        ).fetchall()
+        return queries, unloaded, notes, profile, archive, self._version(session_id)
+
+    def _version(self, session_id: str) -> int:
+        """Stored session version (lock held)"""
+        row = self._conn.execute("SELECT version FROM versions WHERE session_id = ?", (session_id,)).fetchone()
+        return row[0] if row else 0
+
+    def version(self, session_id: str) -> int:
+        with self._lock:
+            return self._version(session_id)
+
+    def append(self, session_id: str, events: list) -> int:
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._insert(session_id, events)
+            return self._version(session_id)
+
+    def append_batch(self, batches: dict) -> None:
+        # One transaction (one commit/fsync) for all sessions
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            for session_id, events in batches.items():
+                self._insert(session_id, events)
+
+    def _insert(self, session_id: str, events: list) -> None:
+        """Write events of session (lock and transaction held)"""
+        for event in events:
+            op = event.get("op")
+            if op == "add_query":
+                query = event["query"]
+                self._conn.execute(
+                    "INSERT INTO queries (session_id, timestamp, text, agent_route, answer) VALUES (?, ?, ?, ?, ?)",
+                    (session_id, query["timestamp"], query["text"], query.get("agent_route"), query.get("answer"))
+                )
+            elif op == "add_note":
+                self._conn.execute("INSERT INTO notes (session_id, note) VALUES (?, ?)", (session_id, event["note"]))
+            elif op == "update_profile":
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO profile (session_id, key, value) VALUES (?, ?, ?)",
+                    (session_id, event["key"], json.dumps(event["value"], ensure_ascii=False))
+                )
+            elif op == "clear_history":
+                self._conn.execute("DELETE FROM queries WHERE session_id = ?", (session_id,))
+                self._conn.execute("DELETE FROM archive WHERE session_id = ? AND kind = 'queries'", (session_id,))
+            elif op == "trim":
+                self._trim(session_id, event.get("max_queries", 0), event.get("max_notes", 0))
+        self._conn.execute(
+            "INSERT INTO versions (session_id, version) VALUES (?, ?) "
+            "ON CONFLICT (session_id) DO UPDATE SET version = version + excluded.version",
+            (session_id, len(events))
+        )
+
+    def _trim(self, session_id: str, max_queries: int, max_notes: int) -> None:
+        """Fold rows beyond the newest max_queries/max_notes into archive (lock and transaction held)"""
+        if max_queries > 0:
+            older = self._OLDER_QUERIES
+            counts = self._conn.execute(
+                f"SELECT COALESCE(agent_route, 'unknown'), COUNT(*) FROM queries WHERE id IN ({older}) "
+                "GROUP BY 1", (session_id, max_queries)
+            ).fetchall()
+            self._archive(session_id, "queries", counts)
+            self._conn.execute(f"DELETE FROM queries WHERE id IN ({older})", (session_id, max_queries))
+        if max_notes > 0:
+            older = "SELECT id FROM notes WHERE session_id = ? ORDER BY id DESC LIMIT -1 OFFSET ?"
+            count = self._conn.execute(
+                f"SELECT COUNT(*) FROM notes WHERE id IN ({older})", (session_id, max_notes)
+            ).fetchone()[0]
+            self._archive(session_id, "notes", [("", count)] if count else [])
+            self._conn.execute(f"DELETE FROM notes WHERE id IN ({older})", (session_id, max_notes))
+
+    def _archive(self, session_id: str, kind: str, counts: list) -> None:
+        """Add (key, count) pairs to archive aggregates"""
+        self._conn.executemany(
+            "INSERT INTO archive (session_id, kind, key, count) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (session_id, kind, key) DO UPDATE SET count = count + excluded.count",
+            [(session_id, kind, key, count) for key, count in counts]
+        )
+
+    def recent_queries(self, session_id: str, n: int, agent_route: Optional[str] = None) -> list:
+        if n <= 0:
+            return []
+        with self._lock:
+            if agent_route is None:
+                rows = self._conn.execute(
+                    "SELECT timestamp, text, agent_route, answer FROM queries WHERE session_id = ? "
+                    "ORDER BY timestamp DESC, id DESC LIMIT ?",
+                    (session_id, n)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT timestamp, text, agent_route, answer FROM queries WHERE session_id = ? AND agent_route = ? "
+                    "ORDER BY timestamp DESC, id DESC LIMIT ?",
+                    (session_id, agent_route, n)
+                ).fetchall()
+        return [self._query(row) for row in reversed(rows)]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class WriteBehindStore(MemoryStore):
+    """Buffers writes of another store and persists them from a background thread
+
+    append() only queues events. The flush thread writes the queue as one
+    batch (store.append_batch) when flush_interval seconds passed since the
+    first buffered event or max_events are queued, whichever comes first -
+    flush_interval is the durability window. Reads flush first, so they
+    always see earlier writes. The buffer is also flushed by close() and
+    at interpreter exit. Buffered writes are not versioned, so sessions
+    loaded through this store do not notice writes of other processes
+    until they are loaded again.
+    """
+
+    def __init__(self, store: MemoryStore, flush_interval: float = 1.0, max_events: int = 100):
+        """
+        Args:
+            store: Backing store
+            flush_interval: Maximum seconds an event stays buffered
+            max_events: Buffered events that trigger an immediate flush
+        """
+        self.store = store
+        self.indexed_queries = store.indexed_queries
+        self.flush_interval = flush_interval
+        self.max_events = max_events
+        self.flushes = 0
+        self.last_error = None
+        self._buffer = {}  # session_id -> events
+        self._buffered = 0
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # one batch write at a time, keeps batches ordered
+        self._wakeup = threading.Condition(self._buffer_lock)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="memory-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self) -> None:
+        """Flush loop"""
+        while True:
+            with self._wakeup:
+                while not self._buffered and not self._closed:
+                    self._wakeup.wait()
+                if self._closed:
+                    return
+                # Wait for the durability window unless the size threshold is reached
+                deadline = time.monotonic() + self.flush_interval
+                while self._buffered < self.max_events and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wakeup.wait(remaining)
+            try:
+                self.flush()
+            except Exception as e:
+                # Events were put back into the buffer - retry after the next interval
+                self.last_error = f"{type(e).__name__}: {e}"
+                time.sleep(self.flush_interval)
+
+    def append(self, session_id: str, events: list) -> None:
+        # Buffered - version unknown until flushed, so no version is returned or tracked
+        with self._wakeup:
+            self._buffer.setdefault(session_id, []).extend(events)
+            self._buffered += len(events)
+            self._wakeup.notify()
+
+    def flush(self) -> None:
+        """Write all buffered events as one batch"""
+        with self._flush_lock:
+            with self._buffer_lock:
+                batches, self._buffer, self._buffered = self._buffer, {}, 0
+            if not batches:
+                return
+            try:
+                self.store.append_batch(batches)
+            except Exception:
+                # Put events back in front of anything buffered meanwhile
+                with self._buffer_lock:
+                    for session_id, events in self._buffer.items():
+                        batches.setdefault(session_id, []).extend(events)
+                    self._buffer = batches
+                    self._buffered = sum(len(events) for events in batches.values())
+                raise
+            self.flushes += 1
+
+    def load(self, session_id: str) -> SessionMemory:
+        self.flush()
+        return self.store.load(session_id)
+
+    def load_versioned(self, session_id: str, recent: int = 0) -> tuple:
+        self.flush()
+        return self.store.load_versioned(session_id, recent)
+
+    def recent_queries(self, session_id: str, n: int, agent_route: Optional[str] = None) -> list:
+        self.flush()
+        return self.store.recent_queries(session_id, n, agent_route)
+
+    def compact(self, session_id: str) -> None:
+        self.flush()
+        self.store.compact(session_id)
+
+    def close(self) -> None:
+        """Stop flush thread and write remaining events"""
+        if self._closed:
+            return
+        with self._wakeup:
+            self._closed = True
+            self._wakeup.notify()
+        self._thread.join()
+        self.flush()
+        self.store.close()
+
+
+def create_store(backend: str, path: str, compact_events: int = 200, write_behind: bool = False,
+                 flush_interval: float = 1.0, flush_max_events: int = 100) -> MemoryStore:
+    """Create storage backend
+
+    Args:
+        backend: "json" or "sqlite"
+        path: Session directory (json) or database file (sqlite)
+        compact_events: Journal events before compaction (json)
+        write_behind: Buffer writes and flush them in batches from a background thread
+        flush_interval: Write-behind durability window in seconds
+        flush_max_events: Buffered events that trigger an immediate flush
+
+    Returns:
+        MemoryStore
+    """
+    if backend == "json":
+        # Batched writes are fsynced - one fsync per flushed session instead of none per write
+        store = JSONMemoryStore(path, compact_events, fsync=write_behind)
+    elif backend == "sqlite":
+        store = SQLiteMemoryStore(path)
+    else:
+        raise ValueError(f"Unknown memory backend: {backend}")
+
+    if write_behind:
+        return WriteBehindStore(store, flush_interval, flush_max_events)
+    return store
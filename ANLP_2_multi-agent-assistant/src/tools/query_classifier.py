@@ -0,0 +1,188 @@
+# Local query classifier - fast path in front of the LLM Router
+import math
+import re
+from collections import Counter
+
+# Agents selected for each Router category (same mapping as in ROUTER_PROMPT)
+CATEGORY_AGENTS = {
+    "research": ["research_specialist"],
+    "coding": ["coding_helper"],
+    "planning": ["planner"],
+    "general": ["supervisor"],
+}
+
+# Keyword/regex rules: (name, pattern, category, weight)
+# Weight is added to the category log-score, so 2.0 means ~7x more likely
+RULES = [
+    ("code_fence", r"```", "coding", 3.0),
+    ("def_statement", r"\bdef\s+\w+\s*\(", "coding", 2.5),
+    ("class_statement", r"\bclass\s+\w+\s*[(:]", "coding", 2.0),
+    ("import_statement", r"^\s*(?:import\s+\w+|from\s+[\w.]+\s+import)\b", "coding", 2.0),
+    ("write_code", r"\b(?:write|implement|create|fix|refactor|debug|optimi[sz]e)\b.{0,40}\b(?:function|class|script|code|method|decorator|program)\b", "coding", 2.5),
+    ("error_terms", r"\b(?:traceback|exception|error|bug|syntax|stack trace)\b", "coding", 1.0),
+    ("language_names", r"\b(?:python|javascript|typescript|sql|regex)\b", "coding", 0.5),
+    ("plan_terms", r"\b(?:plan|planning|roadmap|milestones?|schedule|timeline)\b", "planning", 2.0),
+    ("step_terms", r"\b(?:step[- ]by[- ]step|stages?|phases?|break (?:it )?down|decompos\w*|prioriti[sz]\w*)\b", "planning", 1.5),
+    ("question_terms", r"^\s*(?:what|why|explain|describe|compare)\b|\bdifference between\b|\bhow does\b", "research", 1.0),
+    ("topic_terms", r"\b(?:multi-agent|agents?|llms?|neural|machine learning|transformers?|langgraph|langchain|rag|prompt|architecture|patterns?|concepts?|theory)\b", "research", 1.0),
+    ("greeting", r"^\s*(?:hi|hello|hey|thanks|thank you)\b", "general", 2.5),
+]
+
+# If rules fire for several categories and the leader wins by less than this
+# margin, the query is treated as mixed and left to the LLM
+AMBIGUITY_MARGIN = 2.0
+AMBIGUOUS_CONFIDENCE = 0.5
+
+_COMPILED_RULES = [
+    (name, re.compile(pattern, re.IGNORECASE | re.MULTILINE), category, weight)
+    for name, pattern, category, weight in RULES
+]
+
+# Seed examples for the Naive Bayes model (ROUTER_PROMPT categories)
+TRAINING_EXAMPLES = [
+    ("What are MAS patterns?", "research"),
+    ("Explain how attention works in transformers", "research"),
+    ("What is the difference between supervised and unsupervised learning?", "research"),
+    ("How does retrieval augmented generation improve LLM answers?", "research"),
+    ("Describe the hierarchical pattern for agent coordination", "research"),
+    ("What is LangGraph and how are nodes and edges used?", "research"),
+    ("Compare microservices and layered architecture", "research"),
+    ("Why do neural networks need activation functions?", "research"),
+    ("What is chain of thought prompting?", "research"),
+    ("Explain event driven architecture concepts", "research"),
+    ("Write a sorting function", "coding"),
+    ("Fix this Python error in my loop", "coding"),
+    ("Write a function that parses JSON in Python", "coding"),
+    ("Review my code and suggest improvements", "coding"),
+    ("How do I read a file line by line in Python?", "coding"),
+    ("Implement a class for a linked list", "coding"),
+    ("Why does this code raise a TypeError?", "coding"),
+    ("Show an example of a decorator with arguments", "coding"),
+    ("Debug this script, it crashes with an exception", "coding"),
+    ("Refactor this function to use list comprehension", "coding"),
+    ("How to plan API development?", "planning"),
+    ("Create a roadmap for learning machine learning", "planning"),
+    ("Break down the migration to microservices into steps", "planning"),
+    ("Help me plan a project with milestones", "planning"),
+    ("What are the stages of building a chatbot from scratch?", "planning"),
+    ("Make a step by step plan to launch a web app", "planning"),
+    ("Prioritize tasks for the next sprint", "planning"),
+    ("Plan the timeline for a data pipeline project", "planning"),
+    ("Hello, who are you?", "general"),
+    ("Thanks for the help", "general"),
+    ("What can you do?", "general"),
+    ("Tell me a joke", "general"),
+    ("What time is it?", "general"),
+    ("Hi there", "general"),
+]
+
+_TOKEN_RE = re.compile(r"[a-z_][a-z0-9_]+")
+
+
+def tokenize(text: str) -> list:
+    """Split text into lowercase word tokens
+
+    Args:
+        text: Input text
+
+    Returns:
+        List of tokens
+    """
+    return _TOKEN_RE.findall(text.lower())
+
+
+class NaiveBayesClassifier:
+    """Multinomial Naive Bayes over word tokens (add-one smoothing)"""
+
+    def __init__(self, examples: list):
+        """Train classifier
+
+        Args:
+            examples: List of (text, category) pairs
+        """
+        self.categories = sorted({category for _, category in examples})
+        self.word_counts = {category: Counter() for category in self.categories}
+        doc_counts = Counter()
+
+        for text, category in examples:
+            self.word_counts[category].update(tokenize(text))
+            doc_counts[category] += 1
+
+        self.vocabulary = set()
+        for counts in self.word_counts.values():
+            self.vocabulary.update(counts)
+
+        self.log_priors = {
+            category: math.log(doc_counts[category] / len(examples))
+            for category in self.categories
+        }
+        self.totals = {
+            category: sum(counts.values()) + len(self.vocabulary)
+            for category, counts in self.word_counts.items()
+        }
+
+    def log_scores(self, text: str) -> dict:
+        """Unnormalized log-probability of each category
+
+        Args:
+            text: Query text
+
+        Returns:
+            Dictionary {category: log score}
+        """
+        tokens = [t for t in tokenize(text) if t in self.vocabulary]
+        scores = {}
+        for category in self.categories:
+            counts = self.word_counts[category]
+            total = self.totals[category]
+            scores[category] = self.log_priors[category] + sum(
+                math.log((counts[t] + 1) / total) for t in tokens
+            )
+        return scores
+
+
+_model = NaiveBayesClassifier(TRAINING_EXAMPLES)
+
+
+def classify_query(text: str) -> dict:
+    """Classify query locally with rules and Naive Bayes model
+
+    Args:
+        text: User query
+
+    Returns:
+        Dictionary with classification, agents, confidence (0..1) and matched rules
+    """
+    scores = _model.log_scores(text)
+    rule_weights = dict.fromkeys(scores, 0.0)
+    matched_rules = []
+
+    for name, pattern, category, weight in _COMPILED_RULES:
+        if pattern.search(text):
+            scores[category] += weight
+            rule_weights[category] += weight
+            matched_rules.append(name)
+
+    # Softmax over category scores
+    best = max(scores.values())
+    exp_scores = {category: math.exp(score - best) for category, score in scores.items()}
+    total = sum(exp_scores.values())
+    probabilities = {category: value / total for category, value in exp_scores.items()}
+
+    classification = max(probabilities, key=probabilities.get)
+    confidence = probabilities[classification]
+
+    # Mixed topics (e.g. research + coding) - let the LLM decide
+    top_weight, second_weight = sorted(rule_weights.values(), reverse=True)[:2]
+    ambiguous = second_weight > 0 and top_weight - second_weight < AMBIGUITY_MARGIN
+    if ambiguous:
+        confidence = min(confidence, AMBIGUOUS_CONFIDENCE)
+
+    return {
+        "classification": classification,
+        "agents": list(CATEGORY_AGENTS[classification]),
+        "confidence": confidence,
+        "ambiguous": ambiguous,
+        "probabilities": probabilities,
+        "matched_rules": matched_rules,
+    }